@@ -0,0 +1,175 @@
+import math
+import os
+from typing import Iterator, List, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+import events
+from geo import KM_PER_DEGREE, haversine_km
+import models
+import notifications
+
+# Cell size of the subscription grid. Cell ids are stored, so changing this
+# means rebuilding alert_subscription_cells (python alerts.py reindex).
+ALERT_GRID_DEGREES = 0.1
+ALERT_MAX_RADIUS_KM = float(os.environ.get("ALERT_MAX_RADIUS_KM", 25))
+ALERT_MAX_SUBSCRIPTIONS = int(os.environ.get("ALERT_MAX_SUBSCRIPTIONS", 20))
+_LON_CELLS = int(round(360 / ALERT_GRID_DEGREES))
+
+
+def _row(latitude: float) -> int:
+    return min(int((latitude + 90) // ALERT_GRID_DEGREES), int(round(180 / ALERT_GRID_DEGREES)) - 1)
+
+
+def _column(longitude: float) -> int:
+    return int(((longitude + 180) % 360) // ALERT_GRID_DEGREES) % _LON_CELLS
+
+
+def cell_of(latitude: float, longitude: float) -> int:
+    return _row(latitude) * _LON_CELLS + _column(longitude)
+
+
+def covering_cells(latitude: float, longitude: float, radius_km: float) -> Iterator[int]:
+    """Every cell the circle's bounding box touches (a superset of the circle)"""
+    dlat = radius_km / KM_PER_DEGREE
+    # Longitude degrees shrink towards the poles; clamp so the box stays finite
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    columns = range(_column(longitude - dlon), _column(longitude - dlon) + int(2 * dlon // ALERT_GRID_DEGREES) + 2)
+    for row in range(_row(max(latitude - dlat, -90)), _row(min(latitude + dlat, 90)) + 1):
+        seen = set()
+        for column in columns:
+            column %= _LON_CELLS
+            if column not in seen:
+                seen.add(column)
+                yield row * _LON_CELLS + column
+
+
+def subscribe(db: Session, role: models.UserRole, account_id: int, latitude: Optional[float] = None,
+              longitude: Optional[float] = None, radius_km: Optional[float] = None,
+              zone: Optional[str] = None) -> models.AlertSubscription:
+    subscription = models.AlertSubscription(
+        account_role=role, account_id=account_id, latitude=latitude, longitude=longitude,
+        radius_km=radius_km, zone=zone,
+    )
+    if zone is None:
+        subscription.cells = [
+            models.AlertSubscriptionCell(cell=cell) for cell in set(covering_cells(latitude, longitude, radius_km))
+        ]
+    db.add(subscription)
+    db.flush()
+    return subscription
+
+
+def subscription_count(db: Session, role: models.UserRole, account_id: int) -> int:
+    return db.scalar(
+        select(func.count()).select_from(models.AlertSubscription)
+        .where(models.AlertSubscription.account_role == role, models.AlertSubscription.account_id == account_id)
+    )
+
+
+def match_point(db: Session, latitude: float, longitude: float) -> List[models.AlertSubscription]:
+    """
+    Circular subscriptions containing the point: one primary-key range lookup
+    on the report's cell, then an exact distance check on those candidates.
+    """
+    candidates = db.execute(
+        select(models.AlertSubscription)
+        .join(models.AlertSubscriptionCell, models.AlertSubscriptionCell.subscription_id == models.AlertSubscription.id)
+        .where(models.AlertSubscriptionCell.cell == cell_of(latitude, longitude))
+    ).scalars().all()
+    return [
+        subscription for subscription in candidates
+        if haversine_km(latitude, longitude, subscription.latitude, subscription.longitude) <= subscription.radius_km
+    ]
+
+
+def match_zone(db: Session, zone: str) -> List[models.AlertSubscription]:
+    return db.execute(
+        select(models.AlertSubscription).where(models.AlertSubscription.zone == zone)
+    ).scalars().all()
+
+
+def _notify(db: Session, subscriptions: List[models.AlertSubscription], report: models.Report,
+            title: str, exclude: Optional[tuple] = None) -> list:
+    # One alert per account even when several of its regions match
+    recipients = sorted({
+        (subscription.account_role, subscription.account_id) for subscription in subscriptions
+    } - {exclude}, key=lambda recipient: (recipient[0].value, recipient[1]))
+    if recipients:
+        notifications.notify_accounts(db, recipients, "nearby_report", title + report.title, report.address, report.id)
+    return recipients
+
+
+def _publish(report: models.Report, recipients: list) -> None:
+    if recipients:
+        events.hub.publish(
+            "report.nearby",
+            [events.account_topic(role.value, account_id) for role, account_id in recipients],
+            report_id=report.id, latitude=report.latitude, longitude=report.longitude,
+        )
+
+
+def fan_out_new_report(db: Session, report_id: int) -> int:
+    """Alert everyone whose area contains a newly created report; runs after the response is sent"""
+    report = db.get(models.Report, report_id)
+    if report is None:
+        return 0
+    subscriptions = match_point(db, report.latitude, report.longitude)
+    recipients = _notify(db, subscriptions, report, "New report near you: ", (models.UserRole.CITIZEN, report.user_id))
+    db.commit()
+    _publish(report, recipients)
+    return len(recipients)
+
+
+def fan_out_zone(db: Session, report_ids: List[int], zone: str) -> int:
+    """Alert zone subscribers about reports just routed to `zone`"""
+    subscriptions = match_zone(db, zone)
+    if not subscriptions:
+        return 0
+    reports = db.execute(select(models.Report).where(models.Report.id.in_(report_ids))).scalars().all()
+    sent = [(report, _notify(db, subscriptions, report, f"New report in {zone}: ")) for report in reports]
+    db.commit()
+    for report, recipients in sent:
+        _publish(report, recipients)
+    return sum(len(recipients) for _, recipients in sent)
+
+
+def reindex(db: Session) -> int:
+    """Rebuild every subscription's cells, e.g. after changing ALERT_GRID_DEGREES"""
+    db.execute(delete(models.AlertSubscriptionCell))
+    circles = db.execute(
+        select(models.AlertSubscription).where(models.AlertSubscription.zone.is_(None))
+    ).scalars().all()
+    for subscription in circles:
+        db.add_all(
+            models.AlertSubscriptionCell(cell=cell, subscription_id=subscription.id)
+            for cell in set(covering_cells(subscription.latitude, subscription.longitude, subscription.radius_km))
+        )
+    db.commit()
+    return len(circles)
+
+
+def serialize(subscription: models.AlertSubscription) -> dict:
+    return {
+        "id": subscription.id,
+        "latitude": subscription.latitude,
+        "longitude": subscription.longitude,
+        "radius_km": subscription.radius_km,
+        "zone": subscription.zone,
+        "created_at": subscription.created_at.isoformat() if subscription.created_at else None,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    from database import SessionLocal
+
+    if sys.argv[1:] != ["reindex"]:
+        print("usage: python alerts.py reindex")
+        sys.exit(2)
+    db = SessionLocal()
+    try:
+        print(f"✅ Reindexed {reindex(db)} alert subscriptions")
+    finally:
+        db.close()
@@ -0,0 +1,145 @@
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session, selectinload
+
+import models
+import response_cache
+
+# Closed/resolved reports untouched for this long move to archived_reports
+ARCHIVE_AFTER_DAYS = int(os.environ.get("ARCHIVE_AFTER_DAYS", 180))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", 500))
+ARCHIVED_STATUSES = (models.ReportStatus.CLOSED, models.ReportStatus.RESOLVED)
+
+# When the report stopped changing; bulk status changes leave closed_at unset
+_finished_at = func.coalesce(
+    models.Report.closed_at, models.Report.resolved_at, models.Report.updated_at, models.Report.created_at
+)
+
+
+def _value(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return getattr(value, "value", value)
+
+
+def _row(instance, columns) -> dict:
+    return {column: _value(getattr(instance, column)) for column in columns}
+
+
+def _document(report: models.Report) -> dict:
+    """The report with its images, comments and history, shaped like the API responses"""
+    document = _row(report, [column.key for column in models.Report.__table__.columns if column.key != "search_vector"])
+    document["images"] = [
+        _row(image, [
+            "id", "filename", "file_path", "file_size", "mime_type", "display_order", "uploaded_at",
+            "phash", "duplicate_of",
+        ])
+        for image in sorted(report.images, key=lambda image: image.display_order or 0)
+    ]
+    document["comments"] = [
+        _row(comment, ["id", "user_id", "user_role", "comment", "is_internal", "created_at", "updated_at"])
+        for comment in sorted(report.comments, key=lambda comment: comment.id)
+    ]
+    document["status_history"] = [
+        _row(entry, ["id", "old_status", "new_status", "changed_by", "changed_by_role", "comment", "created_at"])
+        for entry in sorted(report.status_history, key=lambda entry: entry.id)
+    ]
+    return document
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Move one batch of reports finished before `cutoff`, with their images,
+    comments and history, into archived_reports in a single transaction.
+    Rows locked by a concurrent run are skipped. Returns reports moved.
+    """
+    report_ids = db.execute(
+        select(models.Report.id)
+        .where(models.Report.status.in_(ARCHIVED_STATUSES), _finished_at < cutoff)
+        .order_by(models.Report.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not report_ids:
+        return 0
+    reports = db.execute(
+        select(models.Report)
+        .where(models.Report.id.in_(report_ids))
+        .options(
+            selectinload(models.Report.images),
+            selectinload(models.Report.comments),
+            selectinload(models.Report.status_history),
+        )
+    ).scalars().all()
+    db.execute(insert(models.ArchivedReport), [
+        {
+            "id": report.id,
+            "user_id": report.user_id,
+            "assigned_to": report.assigned_to,
+            "assigned_zone": report.assigned_zone,
+            "status": report.status,
+            "created_at": report.created_at,
+            "closed_at": report.closed_at or report.resolved_at,
+            "data": _document(report),
+        }
+        for report in reports
+    ])
+    # Children first; votes and image hashes are removed, and notifications
+    # and duplicate links unset, by their ON DELETE rules
+    for child in (models.ReportImage, models.ReportComment, models.ReportStatusHistory):
+        db.execute(delete(child).where(child.report_id.in_(report_ids)).execution_options(synchronize_session=False))
+    db.execute(delete(models.Report).where(models.Report.id.in_(report_ids)).execution_options(synchronize_session=False))
+    db.commit()
+    return len(reports)
+
+
+def archive_reports(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                    batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Archive every eligible report, one short transaction per batch"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    archived = 0
+    while True:
+        moved = archive_batch(db, cutoff, batch_size)
+        archived += moved
+        if moved < batch_size:
+            break
+    if archived:
+        response_cache.invalidate_reports()
+    return archived
+
+
+def get_archived(db: Session, report_id: int) -> Optional[dict]:
+    archived = db.get(models.ArchivedReport, report_id)
+    if archived is None:
+        return None
+    return dict(archived.data, archived_at=_value(archived.archived_at))
+
+
+def archived_history(db: Session, report_id: int) -> Optional[List[dict]]:
+    """Status history of an archived report, newest first like the live endpoint"""
+    document = db.execute(
+        select(models.ArchivedReport.data).where(models.ArchivedReport.id == report_id)
+    ).scalar()
+    if document is None:
+        return None
+    return list(reversed(document["status_history"]))
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Move old closed/resolved reports to archived_reports")
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        print(f"✅ Archived {archive_reports(db, args.days, args.batch_size)} reports")
+    finally:
+        db.close()
@@ -1,11 +1,22 @@
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import asyncio
+import hashlib
+import json
+import secrets
+import threading
+import time
+import uuid
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import exists, func, literal, select
 from sqlalchemy.orm import Session
-from database import get_db
+from database import SessionLocal, get_db
+from cache import TTLCache, get_redis
 import models
 import os
 from dotenv import load_dotenv
@@ -14,27 +25,179 @@ load_dotenv()
 
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-change-this")
 ALGORITHM = os.environ.get("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", 15))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.environ.get("REFRESH_TOKEN_EXPIRE_DAYS", 14))
+PRINCIPAL_CACHE_SIZE = int(os.environ.get("PRINCIPAL_CACHE_SIZE", 10000))
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.environ.get("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+PRINCIPAL_INVALIDATION_CHANNEL = "roadsense:principal-invalidate"
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get("PASSWORD_HASH_QUEUE_SIZE", 32))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so a small dedicated pool keeps hashing off the
+# request threads; the semaphore caps running + queued jobs so a login burst
+# gets fast 503s instead of an ever-growing backlog
+_password_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_password_slots = threading.BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/login")
 
+# Resolved accounts keyed by (role, email, token iat), detached from any session
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def _claim_password_slot():
+    if not _password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Please try again in a moment.",
+            headers={"Retry-After": "1"},
+        )
+
+async def _run_password_job(fn, *args):
+    _claim_password_slot()
+    try:
+        return await asyncio.wrap_future(_password_pool.submit(fn, *args))
+    finally:
+        _password_slots.release()
+
+def _wait_password_job(fn, *args):
+    """Same bounded pool for sync handlers, which already run off the event loop"""
+    _claim_password_slot()
+    try:
+        return _password_pool.submit(fn, *args).result()
+    finally:
+        _password_slots.release()
+
+def hash_password_pooled(password: str) -> str:
+    return _wait_password_job(pwd_context.hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_password_job(pwd_context.verify, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    return await _run_password_job(pwd_context.hash, password)
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and, when the stored hash uses outdated settings, return a fresh hash"""
+    return await _run_password_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def access_token_claims(account) -> dict:
+    """Claims that let handlers authorize a request without loading the account"""
+    claims = {"sub": account.email, "role": account.role.value, "uid": account.id}
+    if account.role == models.UserRole.OFFICIAL:
+        claims.update({"oid": account.id, "zone": account.zone})
+    return claims
+
+def _hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _refresh_token_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def issue_refresh_token(db: Session, account, family_id: Optional[str] = None) -> str:
+    """Store the hash of a new refresh token for `account`; the caller commits"""
+    token = secrets.token_urlsafe(48)
+    db.add(models.RefreshToken(
+        token_hash=_hash_refresh_token(token),
+        family_id=family_id or str(uuid.uuid4()),
+        account_role=account.role,
+        account_id=account.id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+def issue_tokens(db: Session, account, family_id: Optional[str] = None) -> dict:
+    refresh_token = issue_refresh_token(db, account, family_id)
+    db.commit()
+    access_token = create_access_token(
+        data=access_token_claims(account),
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "role": account.role.value,
+        "account_status": account.account_status.value,
+    }
+
+def _revoke_family(db: Session, family_id: str):
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.family_id == family_id,
+        models.RefreshToken.revoked_at.is_(None)
+    ).update({"revoked_at": func.now()}, synchronize_session=False)
+
+def rotate_refresh_token(db: Session, token: str) -> dict:
+    """
+    Exchange a refresh token for a new access/refresh pair. Each refresh token
+    works once; presenting one that was already rotated means it leaked, so the
+    whole login (token family) is revoked.
+    """
+    stored = db.execute(
+        select(models.RefreshToken)
+        .where(models.RefreshToken.token_hash == _hash_refresh_token(token))
+        .with_for_update()
+    ).scalar_one_or_none()
+    if stored is None:
+        raise _refresh_token_error()
+    if stored.revoked_at is not None:
+        _revoke_family(db, stored.family_id)
+        db.commit()
+        raise _refresh_token_error()
+    if stored.expires_at <= datetime.now(stored.expires_at.tzinfo):
+        raise _refresh_token_error()
+    
+    model = models.Official if stored.account_role == models.UserRole.OFFICIAL else models.User
+    account = db.get(model, stored.account_id)
+    if account is None or account.account_status != models.AccountStatus.ACTIVE:
+        _revoke_family(db, stored.family_id)
+        db.commit()
+        raise _refresh_token_error()
+    
+    stored.revoked_at = func.now()
+    return issue_tokens(db, account, stored.family_id)
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    """Log out the session the token belongs to"""
+    family_id = db.execute(
+        select(models.RefreshToken.family_id)
+        .where(models.RefreshToken.token_hash == _hash_refresh_token(token))
+    ).scalar()
+    if family_id is None:
+        return False
+    _revoke_family(db, family_id)
+    db.commit()
+    return True
+
+def revoke_account_refresh_tokens(db: Session, role: models.UserRole, account_id: int):
+    """Sign an account out everywhere, e.g. after a password change; the caller commits"""
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.account_role == role,
+        models.RefreshToken.account_id == account_id,
+        models.RefreshToken.revoked_at.is_(None)
+    ).update({"revoked_at": func.now()}, synchronize_session=False)
+
 def detect_user_role(email: str) -> str:
     gov_domains = ['.gov.in', '.nic.in', '.gov']
     email_lower = email.lower().strip()
@@ -43,42 +206,180 @@ def detect_user_role(email: str) -> str:
             return "official"
     return "citizen"
 
-def authenticate_user(db: Session, email: str, password: str):
+def find_account(db: Session, email: str):
+    """
+    Load the citizen or official registered under `email` with a single query:
+    both tables are outer-joined against the normalized address, each side
+    hitting its lower(email) index.
+    """
     email = email.lower().strip()
-    role = detect_user_role(email)
-    if role == "official":
-        user = db.query(models.Official).filter(models.Official.email == email).first()
-    else:
-        user = db.query(models.User).filter(models.User.email == email).first()
-    if not user:
-        if role == "official":
-            user = db.query(models.User).filter(models.User.email == email).first()
-        else:
-            user = db.query(models.Official).filter(models.Official.email == email).first()
+    lookup = select(literal(email).label("email")).subquery("lookup")
+    row = db.execute(
+        select(models.User, models.Official)
+        .select_from(lookup)
+        .outerjoin(models.User, func.lower(models.User.email) == lookup.c.email)
+        .outerjoin(models.Official, func.lower(models.Official.email) == lookup.c.email)
+        .limit(1)
+    ).first()
+    if row is None:
+        return None
+    user, official = row
+    if user is not None and official is not None:
+        # Legacy rows registered in both tables: fall back to the domain heuristic
+        return official if detect_user_role(email) == "official" else user
+    return user or official
+
+def find_registration_conflicts(db: Session, email: str, employee_id: Optional[str] = None) -> Tuple[bool, bool, bool]:
+    """Return (citizen email taken, official email taken, employee ID taken) in one round trip"""
+    email = email.lower().strip()
+    employee_taken = (
+        exists().where(models.Official.employee_id == employee_id)
+        if employee_id is not None else literal(False)
+    )
+    row = db.execute(select(
+        exists().where(func.lower(models.User.email) == email),
+        exists().where(func.lower(models.Official.email) == email),
+        employee_taken,
+    )).one()
+    return tuple(row)
+
+def authenticate_user(db: Session, email: str, password: str):
+    user = find_account(db, email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    is_valid, new_hash = _wait_password_job(pwd_context.verify_and_update, password, user.password_hash)
+    if not is_valid:
         return None
+    if new_hash:
+        # Stored hash predates the current BCRYPT_ROUNDS; upgrade it transparently
+        user.password_hash = new_hash
+        db.commit()
     return user
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+@dataclass(frozen=True)
+class Principal:
+    """Who is making the request, as far as authorization needs to know"""
+    account_id: int
+    email: str
+    role: str
+    official_id: Optional[int] = None
+    zone: Optional[str] = None
+    
+    @property
+    def is_official(self) -> bool:
+        return self.role == models.UserRole.OFFICIAL.value
+    
+    @classmethod
+    def from_account(cls, account) -> "Principal":
+        if account.role == models.UserRole.OFFICIAL:
+            return cls(account.id, account.email, account.role.value, official_id=account.id, zone=account.zone)
+        return cls(account.id, account.email, account.role.value)
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        role: str = payload.get("role")
-        if email is None:
-            raise credentials_exception
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+def _principal_from_claims(payload: dict) -> Optional[Principal]:
+    if payload.get("uid") is None:
+        return None
+    return Principal(
+        account_id=payload["uid"],
+        email=payload["sub"],
+        role=payload.get("role"),
+        official_id=payload.get("oid"),
+        zone=payload.get("zone"),
+    )
+
+async def get_current_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    """
+    Resolve the caller without touching the database when the token carries
+    uid/oid/zone claims; older tokens fall back to the cached account lookup.
+    Claims are trusted until the access token expires.
+    """
+    principal = _principal_from_claims(_decode_token(token))
+    if principal is not None:
+        return principal
+    return Principal.from_account(await get_current_user(token, db))
+
+async def principal_from_token(token: str) -> Principal:
+    """
+    Same as get_current_principal, for long-lived connections (SSE,
+    WebSocket) that must not hold a request session open while they last.
+    """
+    principal = _principal_from_claims(_decode_token(token))
+    if principal is not None:
+        return principal
+    db = SessionLocal()
+    try:
+        return Principal.from_account(await get_current_user(token, db))
+    finally:
+        db.close()
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    payload = _decode_token(token)
+    email: str = payload.get("sub")
+    role: str = payload.get("role")
+    cache_key = (role, email, payload.get("iat"))
+    user = principal_cache.get(cache_key)
+    if user is not None:
+        return user
     if role == "official":
         user = db.query(models.Official).filter(models.Official.email == email).first()
     else:
         user = db.query(models.User).filter(models.User.email == email).first()
     if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+        raise _credentials_exception()
+    # Detach so the cached copy survives this session; handlers that modify
+    # the account must load their own row and call invalidate_principal
+    db.expunge(user)
+    principal_cache.set(cache_key, user)
+    return user
+
+def _evict_principal(role: str, email: str):
+    principal_cache.delete_matching(lambda key: key[0] == role and key[1] == email)
+
+def invalidate_principal(role: str, email: str):
+    _evict_principal(role, email)
+    client = get_redis()
+    if client is not None:
+        try:
+            client.publish(PRINCIPAL_INVALIDATION_CHANNEL, json.dumps([role, email]))
+        except Exception as e:
+            print(f"⚠️ Could not broadcast principal invalidation: {str(e)}")
+
+def _listen_for_invalidations(client):
+    while True:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(PRINCIPAL_INVALIDATION_CHANNEL)
+            for message in pubsub.listen():
+                role, email = json.loads(message["data"])
+                _evict_principal(role, email)
+        except Exception as e:
+            # Entries still expire after PRINCIPAL_CACHE_TTL_SECONDS while we reconnect
+            print(f"⚠️ Principal invalidation listener error: {str(e)}")
+            time.sleep(1)
+
+def start_invalidation_listener():
+    """Evict entries invalidated by other workers; a no-op without REDIS_URL"""
+    client = get_redis()
+    if client is None:
+        return
+    threading.Thread(
+        target=_listen_for_invalidations,
+        args=(client,),
+        name="principal-invalidation",
+        daemon=True
+    ).start()
\ No newline at end of file
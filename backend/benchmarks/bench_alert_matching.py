@@ -0,0 +1,77 @@
+"""
+Match new reports against alert subscriptions: grid index vs a linear scan.
+
+index:  the cell lookup alerts.match_point does in alert_subscription_cells
+        (modelled here as a dict of cell -> subscriptions), then the exact
+        distance check on the candidates
+linear: distance check against every subscription
+
+No database is needed; subscriptions are random circles around one city.
+
+    cd backend
+    python benchmarks/bench_alert_matching.py --subscriptions 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import alerts
+import geo
+
+CENTRE = (18.52, 73.85)
+SPREAD_DEGREES = 0.5
+
+
+def random_point(rng: random.Random) -> tuple:
+    return (CENTRE[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+            CENTRE[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscriptions", type=int, default=100_000)
+    parser.add_argument("--reports", type=int, default=1000)
+    parser.add_argument("--max-radius", type=float, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    subscriptions = [(*random_point(rng), rng.uniform(0.5, args.max_radius)) for _ in range(args.subscriptions)]
+    index = defaultdict(list)
+    for subscription in subscriptions:
+        for cell in set(alerts.covering_cells(*subscription)):
+            index[cell].append(subscription)
+    rows = sum(len(members) for members in index.values())
+    reports = [random_point(rng) for _ in range(args.reports)]
+
+    started = time.perf_counter()
+    indexed = [
+        sum(1 for lat, lon, radius in index.get(alerts.cell_of(*report), ())
+            if geo.haversine_km(*report, lat, lon) <= radius)
+        for report in reports
+    ]
+    index_ms = (time.perf_counter() - started) * 1000 / len(reports)
+
+    started = time.perf_counter()
+    linear = [
+        sum(1 for lat, lon, radius in subscriptions if geo.haversine_km(*report, lat, lon) <= radius)
+        for report in reports[:50]
+    ]
+    linear_ms = (time.perf_counter() - started) * 1000 / len(linear)
+
+    assert indexed[:len(linear)] == linear, "index missed a subscription"
+    print(f"{args.subscriptions:,} subscriptions -> {rows:,} cell rows "
+          f"({rows / args.subscriptions:.1f} per subscription)")
+    print(f"average matches per report: {sum(indexed) / len(indexed):.1f}\n")
+    print(f"{'path':<8}{'ms/report':>12}")
+    print(f"{'index':<8}{index_ms:>12.3f}")
+    print(f"{'linear':<8}{linear_ms:>12.3f}")
+    print(f"\nspeedup: {linear_ms / index_ms:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Find near-identical images by perceptual hash: band index vs a linear scan.
+
+index:  the lookup image_hash.find_similar does in report_image_hash_bands
+        (modelled here as a dict of (band, value) -> image ids), then the
+        Hamming distance check on every candidate, with no cap, keeping the
+        closest (oldest on ties) as the database query does
+linear: Hamming distance against every stored hash
+
+No database or Pillow is needed; hashes are random 64-bit values and each
+query is a stored hash with up to IMAGE_HASH_MAX_DISTANCE bits flipped.
+
+    cd backend
+    python benchmarks/bench_image_hash.py --images 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import image_hash
+
+
+def nearby_hash(rng: random.Random, value: int) -> int:
+    for bit in rng.sample(range(64), rng.randint(0, image_hash.IMAGE_HASH_MAX_DISTANCE)):
+        value ^= 1 << bit
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    hashes = [rng.getrandbits(64) for _ in range(args.images)]
+    index = defaultdict(list)
+    for image_id, value in enumerate(hashes):
+        for band in image_hash.bands(value):
+            index[band].append(image_id)
+    queries = [nearby_hash(rng, rng.choice(hashes)) for _ in range(args.queries)]
+    max_distance = image_hash.IMAGE_HASH_MAX_DISTANCE
+
+    started = time.perf_counter()
+    candidates = []
+    indexed = []
+    for query in queries:
+        ids = {image_id for band in image_hash.bands(query) for image_id in index.get(band, ())}
+        candidates.append(len(ids))
+        matches = [(image_hash.distance(query, hashes[i]), i) for i in ids]
+        indexed.append(min((match for match in matches if match[0] <= max_distance), default=None))
+    index_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+    started = time.perf_counter()
+    linear = [
+        min(((image_hash.distance(query, value), i) for i, value in enumerate(hashes)
+             if image_hash.distance(query, value) <= max_distance), default=None)
+        for query in queries[:10]
+    ]
+    linear_ms = (time.perf_counter() - started) * 1000 / len(linear)
+
+    assert indexed[:len(linear)] == linear, "index missed an image"
+    print(f"{args.images:,} images, matches within {max_distance} bits")
+    print(f"candidates checked per lookup: {sum(candidates) / len(queries):.1f} average, {max(candidates)} most\n")
+    print(f"{'path':<8}{'ms/lookup':>12}")
+    print(f"{'index':<8}{index_ms:>12.3f}")
+    print(f"{'linear':<8}{linear_ms:>12.3f}")
+    print(f"\nspeedup: {linear_ms / index_ms:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
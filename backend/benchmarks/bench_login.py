@@ -0,0 +1,87 @@
+"""
+Measure password-verification throughput and event-loop responsiveness during
+a login burst, with bcrypt run inline versus on the bounded auth pool.
+
+No database is needed: each simulated login is a single bcrypt verify against
+a hash generated at the configured BCRYPT_ROUNDS. While the burst runs, a
+heartbeat task ticks every 10ms; its worst delay is how long any other request
+on the same worker would have waited.
+
+    cd backend
+    BCRYPT_ROUNDS=12 python benchmarks/bench_login.py --logins 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+
+import auth
+
+PASSWORD = "correct horse battery staple"
+HEARTBEAT_SECONDS = 0.01
+
+
+async def heartbeat(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        lags.append(time.perf_counter() - started - HEARTBEAT_SECONDS)
+
+
+async def inline_login(hashed: str) -> bool:
+    return auth.verify_password(PASSWORD, hashed)
+
+
+async def pooled_login(hashed: str) -> bool:
+    return await auth.verify_password_async(PASSWORD, hashed)
+
+
+async def burst(login, hashed: str, logins: int) -> dict:
+    stop = asyncio.Event()
+    lags = []
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login(hashed) for _ in range(logins)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await beat
+    rejected = sum(1 for r in results if isinstance(r, HTTPException) and r.status_code == 503)
+    ok = sum(1 for r in results if r is True)
+    return {
+        "ok": ok,
+        "rejected": rejected,
+        "per_second": ok / elapsed if elapsed else 0,
+        "max_lag_ms": max(lags, default=0) * 1000,
+    }
+
+
+async def run(logins: int) -> None:
+    hashed = auth.get_password_hash(PASSWORD)
+    print(
+        f"bcrypt rounds={auth.BCRYPT_ROUNDS} workers={auth.PASSWORD_HASH_WORKERS} "
+        f"queue={auth.PASSWORD_HASH_QUEUE_SIZE} logins={logins}\n"
+    )
+    print(f"{'mode':<10}{'ok':>8}{'503s':>8}{'logins/s':>12}{'max loop lag ms':>18}")
+    for name, login in (("inline", inline_login), ("pooled", pooled_login)):
+        result = await burst(login, hashed, logins)
+        print(
+            f"{name:<10}{result['ok']:>8}{result['rejected']:>8}"
+            f"{result['per_second']:>12.1f}{result['max_lag_ms']:>18.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args.logins))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Compare the old ILIKE '%term%' report search with the tsvector/GIN search.
+
+Builds a throwaway copy of the reports table in its own schema, fills it with
+synthetic rows and times both query shapes. Nothing in the public schema is touched.
+
+    cd backend
+    python benchmarks/bench_search.py --rows 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+import models
+from database import engine
+
+engine.echo = False
+
+SCHEMA = "bench_search"
+WORDS = [
+    "pothole", "crack", "debris", "marking", "streetlight", "sign", "drain", "flooding",
+    "junction", "flyover", "market", "school", "hospital", "station", "bridge", "lane",
+    "sector", "nagar", "colony", "highway", "bypass", "circle", "main", "cross",
+    "deep", "broken", "missing", "faded", "blocked", "dangerous", "large", "near",
+]
+ISSUE_TYPES = [issue.name for issue in models.IssueType]
+STATUSES = [status.name for status in models.ReportStatus]
+TERMS = ["pothole", "hospital junction", "bridg", "faded marking near school"]
+
+
+def word(expr: str) -> str:
+    return f"w[1 + ({expr}) % {len(WORDS)}]"
+
+
+def setup(conn, rows: int) -> None:
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conn.execute(text(f"CREATE TABLE {SCHEMA}.reports (LIKE public.reports INCLUDING GENERATED)"))
+    words = "ARRAY[" + ",".join(f"'{w}'" for w in WORDS) + "]"
+    issues = "ARRAY[" + ",".join(f"'{i}'" for i in ISSUE_TYPES) + "]"
+    statuses = "ARRAY[" + ",".join(f"'{s}'" for s in STATUSES) + "]"
+    started = time.perf_counter()
+    conn.execute(text(f"""
+        INSERT INTO {SCHEMA}.reports
+            (id, user_id, latitude, longitude, address, issue_type, title, description,
+             status, priority, is_anonymous, upvotes, views, created_at)
+        SELECT g, 1 + g % 5000,
+               18.4 + (g % 1000) / 2000.0, 73.7 + (g % 997) / 2000.0,
+               {word('g * 3')} || ' ' || {word('g * 5')} || ' road, ' || {word('g * 11')},
+               ({issues})[1 + g % {len(ISSUE_TYPES)}]::issuetype,
+               {word('g')} || ' ' || {word('g / 7')} || ' ' || {word('g / 13')},
+               {word('g * 17')} || ' ' || {word('g * 19')} || ' ' || {word('g * 23')} || ' '
+                   || {word('g * 29')} || ' ' || {word('g * 31')} || ' reported by resident',
+               ({statuses})[1 + g % {len(STATUSES)}]::reportstatus,
+               'MEDIUM', false, 0, 0, now() - (g || ' minutes')::interval
+        FROM generate_series(1, :rows) AS g, (SELECT {words} AS w) AS vocab
+    """), {"rows": rows})
+    print(f"Loaded {rows:,} rows in {time.perf_counter() - started:.1f}s")
+    started = time.perf_counter()
+    conn.execute(text(f"CREATE INDEX ON {SCHEMA}.reports USING gin (search_vector)"))
+    conn.execute(text(f"CREATE INDEX ON {SCHEMA}.reports (created_at)"))
+    conn.execute(text(f"ANALYZE {SCHEMA}.reports"))
+    print(f"Indexed in {time.perf_counter() - started:.1f}s")
+
+
+def time_query(conn, sql: str, params: dict, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(text(sql), params).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(conn, repeat: int) -> None:
+    ilike = f"""
+        SELECT id FROM {SCHEMA}.reports
+        WHERE title ILIKE :like OR description ILIKE :like OR address ILIKE :like
+        ORDER BY created_at DESC LIMIT 50
+    """
+    fts = f"""
+        SELECT id FROM {SCHEMA}.reports
+        WHERE search_vector @@ to_tsquery('english', :tsquery)
+        ORDER BY ts_rank_cd(search_vector, to_tsquery('english', :tsquery)) DESC, created_at DESC
+        LIMIT 50
+    """
+    print(f"\n{'term':<28}{'ILIKE ms':>12}{'tsvector ms':>14}")
+    for term in TERMS:
+        tsquery = " & ".join(f"{w}:*" for w in term.split())
+        ilike_ms = time_query(conn, ilike, {"like": f"%{term}%"}, repeat)
+        fts_ms = time_query(conn, fts, {"tsquery": tsquery}, repeat)
+        print(f"{term:<28}{ilike_ms:>12.1f}{fts_ms:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark schema afterwards")
+    args = parser.parse_args()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        try:
+            setup(conn, args.rows)
+            run(conn, args.repeat)
+        finally:
+            if not args.keep:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
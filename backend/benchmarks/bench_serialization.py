@@ -0,0 +1,118 @@
+"""
+Compare the old list-endpoint serialization path with the fast one.
+
+old:  per-row `x.value if hasattr(x, 'value') else x`, then jsonable_encoder
+      and the standard JSONResponse renderer
+fast: enum lookup tables from models, rendered by serialization.FastJSONResponse
+      (orjson when installed)
+
+No database is needed; rows are synthetic objects shaped like Report rows.
+
+    cd backend
+    python benchmarks/bench_serialization.py --rows 5000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import models
+import serialization
+
+STATUSES = list(models.ReportStatus)
+PRIORITIES = list(models.ReportPriority)
+ISSUE_TYPES = list(models.IssueType)
+
+
+def make_rows(count: int) -> list:
+    now = datetime.utcnow()
+    return [
+        SimpleNamespace(
+            id=i,
+            title=f"Pothole near junction {i}",
+            description="Deep pothole in the left lane, dangerous for two-wheelers at night",
+            latitude=18.5 + (i % 1000) / 10000,
+            longitude=73.8 + (i % 997) / 10000,
+            address=f"{i} FC Road, Shivajinagar, Pune",
+            created_at=now - timedelta(minutes=i),
+            status=STATUSES[i % len(STATUSES)],
+            priority=PRIORITIES[i % len(PRIORITIES)],
+            issue_type=ISSUE_TYPES[i % len(ISSUE_TYPES)],
+        )
+        for i in range(count)
+    ]
+
+
+def old_path(rows: list) -> bytes:
+    result = []
+    for report in rows:
+        result.append({
+            "id": report.id,
+            "title": report.title,
+            "description": report.description,
+            "latitude": float(report.latitude) if report.latitude else None,
+            "longitude": float(report.longitude) if report.longitude else None,
+            "address": report.address,
+            "created_at": report.created_at.isoformat() if report.created_at else None,
+            "status": report.status.value if hasattr(report.status, 'value') else str(report.status),
+            "priority": report.priority.value if hasattr(report.priority, 'value') else str(report.priority),
+            "issue_type": report.issue_type.value if hasattr(report.issue_type, 'value') else str(report.issue_type),
+        })
+    return JSONResponse(jsonable_encoder(result)).body
+
+
+def fast_path(rows: list) -> bytes:
+    result = [
+        {
+            "id": report.id,
+            "title": report.title,
+            "description": report.description,
+            "latitude": report.latitude,
+            "longitude": report.longitude,
+            "address": report.address,
+            "created_at": report.created_at,
+            "status": models.REPORT_STATUS_VALUES[report.status],
+            "priority": models.REPORT_PRIORITY_VALUES[report.priority],
+            "issue_type": models.ISSUE_TYPE_VALUES[report.issue_type],
+        }
+        for report in rows
+    ]
+    return serialization.FastJSONResponse(result).body
+
+
+def time_path(path, rows: list, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        path(rows)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    encoder = "orjson" if serialization.orjson is not None else "json (orjson not installed)"
+    print(f"{args.rows:,} rows, median of {args.repeat} runs, fast path encoder: {encoder}\n")
+    old_ms = time_path(old_path, rows, args.repeat)
+    fast_ms = time_path(fast_path, rows, args.repeat)
+    print(f"{'path':<8}{'ms':>10}{'bytes':>12}")
+    print(f"{'old':<8}{old_ms:>10.1f}{len(old_path(rows)):>12,}")
+    print(f"{'fast':<8}{fast_ms:>10.1f}{len(fast_path(rows)):>12,}")
+    print(f"\nspeedup: {old_ms / fast_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
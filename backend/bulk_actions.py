@@ -0,0 +1,117 @@
+from typing import List, Optional
+
+from sqlalchemy import cast, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+import models
+import schemas
+
+
+def build_conditions(report_ids: Optional[List[int]], report_filter: Optional[schemas.BulkReportFilter]) -> list:
+    conditions = []
+    if report_ids:
+        conditions.append(models.Report.id.in_(report_ids))
+    if report_filter:
+        if report_filter.status:
+            conditions.append(models.Report.status == models.ReportStatus(report_filter.status.value))
+        if report_filter.issue_type:
+            conditions.append(models.Report.issue_type == models.IssueType(report_filter.issue_type.value))
+        if report_filter.priority:
+            conditions.append(models.Report.priority == models.ReportPriority(report_filter.priority.value))
+        if report_filter.assigned_zone:
+            conditions.append(models.Report.assigned_zone == report_filter.assigned_zone)
+        if report_filter.assigned_to:
+            conditions.append(models.Report.assigned_to == report_filter.assigned_to)
+    return conditions
+
+
+def apply_transition(
+    db: Session,
+    conditions: list,
+    values: dict,
+    new_status: models.ReportStatus,
+    changed_by: int,
+    changed_by_role: models.UserRole,
+    comment: Optional[str]
+) -> List[dict]:
+    """
+    Update every matching report and write its status history in a single statement:
+
+        WITH old AS (SELECT id, status FROM reports WHERE ... FOR UPDATE),
+             updated AS (UPDATE reports SET ... FROM old WHERE reports.id = old.id
+                         RETURNING reports.id, old.status)
+        INSERT INTO report_status_history (...) SELECT ... FROM updated RETURNING ...
+    """
+    old = (
+        select(models.Report.id, models.Report.status)
+        .where(*conditions)
+        .with_for_update()
+        .cte("old")
+    )
+    updated = (
+        update(models.Report)
+        .where(models.Report.id == old.c.id)
+        .values(**values)
+        .returning(models.Report.id.label("report_id"), old.c.status.label("old_status"))
+        .cte("updated")
+    )
+    history = models.ReportStatusHistory
+    stmt = (
+        insert(history)
+        .from_select(
+            ["report_id", "old_status", "new_status", "changed_by", "changed_by_role", "comment"],
+            select(
+                updated.c.report_id,
+                updated.c.old_status,
+                cast(literal(new_status, history.new_status.type), history.new_status.type),
+                literal(changed_by),
+                cast(literal(changed_by_role, history.changed_by_role.type), history.changed_by_role.type),
+                literal(comment, history.comment.type),
+            )
+        )
+        .returning(history.report_id, history.old_status)
+    )
+    rows = db.execute(stmt).all()
+    return [
+        {"report_id": report_id, "old_status": old_status.value if old_status else None}
+        for report_id, old_status in rows
+    ]
+
+
+def bulk_update_status(
+    db: Session,
+    conditions: list,
+    new_status: models.ReportStatus,
+    priority: Optional[models.ReportPriority],
+    changed_by: int,
+    changed_by_role: models.UserRole,
+    comment: Optional[str]
+) -> List[dict]:
+    values = {"status": new_status, "updated_at": func.now()}
+    if priority:
+        values["priority"] = priority
+    if new_status == models.ReportStatus.RESOLVED:
+        values["resolved_at"] = func.coalesce(models.Report.resolved_at, func.now())
+    elif new_status == models.ReportStatus.CLOSED:
+        values["closed_at"] = func.coalesce(models.Report.closed_at, func.now())
+    return apply_transition(db, conditions, values, new_status, changed_by, changed_by_role, comment)
+
+
+def bulk_assign(
+    db: Session,
+    conditions: list,
+    official: models.Official,
+    changed_by: int,
+    changed_by_role: models.UserRole,
+    comment: Optional[str]
+) -> List[dict]:
+    values = {
+        "assigned_to": official.id,
+        "assigned_zone": official.zone,
+        "status": models.ReportStatus.UNDER_REVIEW,
+        "updated_at": func.now(),
+    }
+    history_comment = f"Assigned to {official.full_name}. {comment or ''}"
+    return apply_transition(
+        db, conditions, values, models.ReportStatus.UNDER_REVIEW, changed_by, changed_by_role, history_comment
+    )
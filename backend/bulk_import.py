@@ -0,0 +1,267 @@
+import argparse
+import csv
+import io
+import json
+import mimetypes
+import os
+import shutil
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+import models
+import schemas
+
+REPORT_IMAGES_DIR = "uploads/report_images"
+# Extra directory HTTP imports may reference images from (the CLI can use any path)
+IMPORT_IMAGES_ROOT = os.environ.get("IMPORT_IMAGES_ROOT")
+ALLOWED_IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'webp'}
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(filename: Optional[str], explicit: Optional[str] = None) -> str:
+    if explicit:
+        fmt = explicit.lower()
+    else:
+        fmt = (filename or "").rsplit(".", 1)[-1].lower()
+    if fmt in ("ndjson", "jsonl"):
+        return "ndjson"
+    if fmt == "csv":
+        return "csv"
+    raise ValueError("Unsupported import format. Use ndjson or csv")
+
+
+def iter_rows(stream: io.TextIOBase, fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row_number, raw_row, parse_error) without loading the whole file"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row_number, row in enumerate(reader, start=1):
+            # Blank CSV cells mean "use the default", not an empty string
+            yield row_number, {k: v for k, v in row.items() if k and v not in (None, "")}, None
+        return
+    for row_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, row, None
+
+
+def _find_in_roots(path: str) -> Optional[str]:
+    """`path` under REPORT_IMAGES_DIR or IMPORT_IMAGES_ROOT, refusing anything resolving outside them"""
+    for root in filter(None, (REPORT_IMAGES_DIR, IMPORT_IMAGES_ROOT)):
+        root = os.path.realpath(root)
+        source = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath([source, root]) == root and os.path.isfile(source):
+            return source
+    return None
+
+
+def resolve_image(path: str, allow_any_path: bool = False) -> Tuple[dict, str]:
+    """
+    Locate an image reference and bring it into the report images directory.
+    Returns the image row and the path of the copy made for it. Unless
+    allow_any_path (the CLI), references must resolve inside REPORT_IMAGES_DIR
+    or IMPORT_IMAGES_ROOT.
+    """
+    file_extension = path.rsplit(".", 1)[-1].lower()
+    if file_extension not in ALLOWED_IMAGE_EXTENSIONS:
+        raise ValueError(f"Invalid image type for {path}. Allowed: {', '.join(ALLOWED_IMAGE_EXTENSIONS)}")
+    if allow_any_path:
+        source = path if os.path.isabs(path) or os.path.exists(path) else os.path.join(REPORT_IMAGES_DIR, path)
+    else:
+        source = _find_in_roots(path)
+    if source is None or not os.path.isfile(source):
+        raise ValueError(f"Image not found: {path}")
+    # Always a fresh copy, even of a file already in REPORT_IMAGES_DIR: image
+    # rows own their file, and deleting a report removes it
+    filename = f"import_{uuid.uuid4().hex}.{file_extension}"
+    file_path = os.path.join(REPORT_IMAGES_DIR, filename)
+    shutil.copyfile(source, file_path)
+    return {
+        "filename": filename,
+        "file_path": file_path,
+        "file_size": os.path.getsize(file_path),
+        "mime_type": mimetypes.guess_type(file_path)[0] or 'image/jpeg',
+    }, file_path
+
+
+def remove_copies(paths: List[str]) -> None:
+    """Delete images copied for a row that did not make it into the database"""
+    for file_path in paths:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+
+def prepare_row(raw: dict, default_user_id: int, allow_any_path: bool = False) -> Tuple[dict, List[dict], List[str]]:
+    row = schemas.BulkReportRow.model_validate(raw)
+    report = {
+        "user_id": row.user_id or default_user_id,
+        "latitude": row.latitude,
+        "longitude": row.longitude,
+        "address": row.address,
+        "issue_type": models.IssueType(row.issue_type.value),
+        "title": row.title,
+        "description": row.description,
+        "status": models.ReportStatus(row.status.value),
+        "priority": models.ReportPriority(row.priority.value),
+        "is_anonymous": row.is_anonymous,
+        "upvotes": 0,
+        "views": 0,
+        "created_at": row.created_at or datetime.now(timezone.utc),
+    }
+    images = []
+    copies = []
+    try:
+        for path in row.images[:5]:
+            image, copied = resolve_image(path, allow_any_path)
+            images.append(image)
+            copies.append(copied)
+    except Exception:
+        remove_copies(copies)
+        raise
+    return report, images, copies
+
+
+def insert_batch(db: Session, batch: List[Tuple[int, dict, List[dict], List[str]]]) -> List[int]:
+    """Insert reports, images and history for a batch with one executemany per table"""
+    report_ids = db.execute(
+        insert(models.Report).returning(models.Report.id, sort_by_parameter_order=True),
+        [report for _, report, _, _ in batch]
+    ).scalars().all()
+
+    image_rows = []
+    history_rows = []
+    for report_id, (_, report, images, _) in zip(report_ids, batch):
+        for order, image in enumerate(images):
+            image_rows.append({**image, "report_id": report_id, "display_order": order})
+        history_rows.append({
+            "report_id": report_id,
+            "old_status": None,
+            "new_status": report["status"],
+            "changed_by": report["user_id"],
+            "changed_by_role": models.UserRole.CITIZEN,
+            "comment": "Report imported",
+        })
+
+    if image_rows:
+        db.execute(insert(models.ReportImage), image_rows)
+    db.execute(insert(models.ReportStatusHistory), history_rows)
+    return list(report_ids)
+
+
+def flush_batch(db: Session, batch: List[Tuple[int, dict, List[dict], List[str]]], result: Dict) -> None:
+    if not batch:
+        return
+    try:
+        report_ids = insert_batch(db, batch)
+        db.commit()
+        result["report_ids"].extend(report_ids)
+        result["imported"] += len(batch)
+        return
+    except Exception:
+        db.rollback()
+    # A database error (e.g. unknown user_id) fails the whole statement, so
+    # retry row by row to pin the error on the offending rows only
+    for entry in batch:
+        try:
+            with db.begin_nested():
+                result["report_ids"].extend(insert_batch(db, [entry]))
+            result["imported"] += 1
+        except Exception as e:
+            remove_copies(entry[3])
+            record_error(result, entry[0], str(getattr(e, "orig", e)).strip())
+    db.commit()
+
+
+def record_error(result: Dict, row_number: int, message: str) -> None:
+    result["failed"] += 1
+    if len(result["errors"]) < MAX_REPORTED_ERRORS:
+        result["errors"].append({"row": row_number, "error": message})
+
+
+def import_reports(
+    db: Session,
+    stream: io.TextIOBase,
+    fmt: str,
+    default_user_id: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    allow_any_path: bool = False
+) -> Dict:
+    """
+    Stream reports from an NDJSON/CSV source into the database.
+    Invalid rows are reported and skipped, the rest of the batch still lands.
+    """
+    os.makedirs(REPORT_IMAGES_DIR, exist_ok=True)
+    result = {"total_rows": 0, "imported": 0, "failed": 0, "errors": [], "report_ids": []}
+    batch = []
+    try:
+        for row_number, raw, parse_error in iter_rows(stream, fmt):
+            result["total_rows"] += 1
+            if parse_error:
+                record_error(result, row_number, parse_error)
+                continue
+            try:
+                report, images, copies = prepare_row(raw, default_user_id, allow_any_path)
+            except ValidationError as e:
+                record_error(result, row_number, "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            except (ValueError, OSError) as e:
+                record_error(result, row_number, str(e))
+                continue
+            batch.append((row_number, report, images, copies))
+            if len(batch) >= batch_size:
+                flush_batch(db, batch, result)
+                batch = []
+    except Exception:
+        # e.g. an undecodable upload: the pending rows are never inserted
+        for entry in batch:
+            remove_copies(entry[3])
+        raise
+    flush_batch(db, batch, result)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import reports from NDJSON or CSV")
+    parser.add_argument("path", help="Path to the .ndjson/.jsonl/.csv file")
+    parser.add_argument("--user-id", type=int, required=True, help="Reporter account for rows without user_id")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default=None)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    from database import SessionLocal
+
+    fmt = detect_format(args.path, args.format)
+    db = SessionLocal()
+    started = datetime.now()
+    try:
+        with open(args.path, newline="", encoding="utf-8") as stream:
+            result = import_reports(db, stream, fmt, args.user_id, args.batch_size, allow_any_path=True)
+    finally:
+        db.close()
+    elapsed = (datetime.now() - started).total_seconds()
+
+    print(f"✅ Imported {result['imported']} of {result['total_rows']} rows in {elapsed:.1f}s")
+    if result["failed"]:
+        print(f"❌ {result['failed']} rows failed:")
+        for error in result["errors"]:
+            print(f"   Row {error['row']}: {error['error']}")
+
+
+if __name__ == "__main__":
+    main()
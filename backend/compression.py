@@ -0,0 +1,192 @@
+import gzip
+import os
+import zlib
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+
+from serialization import dumps
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+# Bodies at least this large are compressed in the threadpool, off the event loop
+COMPRESSION_OFFLOAD_SIZE = int(os.environ.get("COMPRESSION_OFFLOAD_SIZE", 64 * 1024))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", 6))
+# Quality for per-request brotli; precompressed cache entries can afford the maximum
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", 5))
+BROTLI_CACHE_QUALITY = 11
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+# Server-sent events must reach the client as written, not held in a compressor
+NEVER_COMPRESSED_TYPES = ("text/event-stream",)
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick the best encoding the client accepts: brotli over gzip, honouring q=0"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in supported_encodings():
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(NEVER_COMPRESSED_TYPES)
+
+
+def compress(body: bytes, encoding: str, brotli_quality: int = BROTLI_QUALITY) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    # mtime=0 keeps output deterministic for identical bodies
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class EncodedBody:
+    """
+    A response body held alongside its compressed variants, for cache entries.
+    Every variant is produced once, when the entry is built, so cache hits only
+    pick bytes. Entries unlikely to be hit often can pass a cheaper brotli_quality.
+    """
+
+    def __init__(self, body: bytes, media_type: str = "application/json",
+                 brotli_quality: int = BROTLI_CACHE_QUALITY):
+        self.media_type = media_type
+        self.variants: Dict[Optional[str], bytes] = {None: body}
+        if len(body) >= COMPRESSION_MIN_SIZE:
+            for encoding in supported_encodings():
+                self.variants[encoding] = compress(body, encoding, brotli_quality)
+
+    @classmethod
+    def json(cls, content, brotli_quality: int = BROTLI_CACHE_QUALITY) -> "EncodedBody":
+        return cls(dumps(content), brotli_quality=brotli_quality)
+
+    def response(self, request: Request) -> Response:
+        encoding = negotiate(request.headers.get("accept-encoding", ""))
+        if encoding not in self.variants:
+            encoding = None
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(self.variants[encoding], media_type=self.media_type, headers=headers)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        # Flush every chunk so streamed rows reach the client as they are produced
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip when the client accepts it, the
+    content type is in COMPRESSIBLE_TYPES and the body reaches
+    COMPRESSION_MIN_SIZE. Responses that already carry a Content-Encoding
+    (precompressed cache entries) pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, offload_size: int = COMPRESSION_OFFLOAD_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is not None:
+                data = compressor.chunk(body) if more_body else compressor.chunk(body) + compressor.finish()
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            eligible = (
+                "content-encoding" not in headers
+                and is_compressible(headers.get("content-type", ""))
+                and start_message["status"] not in (204, 304)
+            )
+            if not eligible or (not more_body and len(body) < self.minimum_size):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                # Streaming body: compress chunk by chunk, length unknown up front
+                del headers["Content-Length"]
+                compressor = _StreamCompressor(encoding)
+                data = compressor.chunk(body)
+            elif len(body) >= self.offload_size:
+                data = await run_in_threadpool(compress, body, encoding)
+            else:
+                data = compress(body, encoding)
+            if not more_body:
+                headers["Content-Length"] = str(len(data))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Hashable, Optional
+
+from sqlalchemy import bindparam, func, update
+
+import models
+from database import SessionLocal
+
+COUNTER_FLUSH_INTERVAL_SECONDS = float(os.environ.get("COUNTER_FLUSH_INTERVAL_SECONDS", 5))
+VIEW_DEDUP_WINDOW_SECONDS = int(os.environ.get("VIEW_DEDUP_WINDOW_SECONDS", 30 * 60))
+MAX_DEDUP_ENTRIES = 200_000
+
+
+class CounterBuffer:
+    """
+    Accumulates per-report increments in memory and writes them back with one
+    batched `UPDATE reports SET <column> = <column> + n` per flush, so reads
+    never turn into row writes.
+    """
+
+    def __init__(self, column: str, dedup_window_seconds: int = 0):
+        self.column = column
+        self.dedup_window_seconds = dedup_window_seconds
+        self._pending: Dict[int, int] = defaultdict(int)
+        self._seen: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+        table = models.Report.__table__
+        self._statement = (
+            update(table)
+            .where(table.c.id == bindparam("report_id"))
+            .values({
+                column: func.coalesce(table.c[column], 0) + bindparam("amount"),
+                # Counter bumps are not edits, so keep onupdate away from updated_at
+                "updated_at": table.c.updated_at,
+            })
+        )
+
+    def record(self, report_id: int, actor: Optional[Hashable] = None, amount: int = 1) -> bool:
+        """Buffer an increment. Repeats by the same actor within the dedup window are ignored."""
+        now = time.monotonic()
+        with self._lock:
+            if actor is not None and self.dedup_window_seconds:
+                key = (report_id, actor)
+                expires_at = self._seen.get(key)
+                if expires_at and expires_at > now:
+                    return False
+                if len(self._seen) >= MAX_DEDUP_ENTRIES:
+                    self._prune_seen(now)
+                self._seen[key] = now + self.dedup_window_seconds
+            self._pending[report_id] += amount
+        return True
+
+    def pending(self, report_id: int) -> int:
+        with self._lock:
+            return self._pending.get(report_id, 0)
+
+    def _prune_seen(self, now: float) -> None:
+        self._seen = {key: expires_at for key, expires_at in self._seen.items() if expires_at > now}
+        if len(self._seen) >= MAX_DEDUP_ENTRIES:
+            # Still full of live entries: forget the oldest half rather than grow without bound
+            oldest = sorted(self._seen.items(), key=lambda item: item[1])[:len(self._seen) // 2]
+            for key, _ in oldest:
+                del self._seen[key]
+
+    def flush(self) -> int:
+        """Write buffered increments to the database, returning the number of rows touched"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            self._prune_seen(time.monotonic())
+        if not pending:
+            return 0
+        # Sorted ids keep row lock order stable across workers flushing at the same time
+        params = [{"report_id": rid, "amount": amount} for rid, amount in sorted(pending.items()) if amount]
+        db = SessionLocal()
+        try:
+            db.execute(self._statement, params)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            # Put the increments back so the next flush retries them
+            with self._lock:
+                for rid, amount in pending.items():
+                    self._pending[rid] += amount
+            print(f"❌ Error flushing {self.column} counters: {str(e)}")
+            return 0
+        finally:
+            db.close()
+        return len(params)
+
+
+views = CounterBuffer("views", dedup_window_seconds=VIEW_DEDUP_WINDOW_SECONDS)
+upvotes = CounterBuffer("upvotes")
+
+BUFFERS = [views, upvotes]
+
+
+def flush_all() -> None:
+    for buffer in BUFFERS:
+        buffer.flush()
+
+
+async def flush_periodically(interval: float = COUNTER_FLUSH_INTERVAL_SECONDS) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(flush_all)
@@ -0,0 +1,94 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import geo
+import models
+
+DEDUP_ENABLED = os.environ.get("DEDUP_ENABLED", "true").lower() not in ("0", "false", "no")
+DEDUP_RADIUS_METERS = float(os.environ.get("DEDUP_RADIUS_METERS", 50))
+# Scores run 0..1; at LINK the new report points at the original, at MERGE it is closed into it
+DEDUP_LINK_SCORE = float(os.environ.get("DEDUP_LINK_SCORE", 0.45))
+DEDUP_MERGE_SCORE = float(os.environ.get("DEDUP_MERGE_SCORE", 0.8))
+MAX_CANDIDATES = 25
+OPEN_STATUSES = (models.ReportStatus.PENDING, models.ReportStatus.UNDER_REVIEW, models.ReportStatus.IN_PROGRESS)
+
+_WORDS = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    report_id: int
+    score: float
+    distance_m: float
+
+    @property
+    def merge(self) -> bool:
+        return self.score >= DEDUP_MERGE_SCORE
+
+
+def trigrams(value: str) -> Set[str]:
+    """Word trigrams padded the way pg_trgm pads them, so scores match similarity()"""
+    grams = set()
+    for word in _WORDS.findall((value or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(left: str, right: str) -> float:
+    a, b = trigrams(left), trigrams(right)
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def score(distance_m: float, title: str, description: str, candidate) -> float:
+    text_score = 0.6 * similarity(title, candidate.title) + 0.4 * similarity(description, candidate.description)
+    proximity = 1 - min(distance_m / DEDUP_RADIUS_METERS, 1)
+    return round(0.65 * text_score + 0.35 * proximity, 3)
+
+
+def candidates_statement(latitude: float, longitude: float, issue_type: models.IssueType):
+    """Open originals of the same type near the point; matches the ix_reports_open_dedup partial index"""
+    return (
+        select(
+            models.Report.id, models.Report.latitude, models.Report.longitude,
+            models.Report.title, models.Report.description,
+        )
+        .where(
+            *geo.within_radius(latitude, longitude, DEDUP_RADIUS_METERS / 1000),
+            models.Report.issue_type == issue_type,
+            models.Report.status.in_(OPEN_STATUSES),
+            # Always point at the original, never at another duplicate
+            models.Report.duplicate_of.is_(None),
+        )
+        .order_by(models.Report.created_at.desc())
+        .limit(MAX_CANDIDATES)
+    )
+
+
+def find_duplicate(db: Session, latitude: float, longitude: float, issue_type: models.IssueType,
+                   title: str, description: str) -> Optional[DuplicateMatch]:
+    """
+    The best-scoring open report of the same type within DEDUP_RADIUS_METERS,
+    if it scores at least DEDUP_LINK_SCORE. Candidates come from the location
+    index, so this is a handful of rows however large the table is.
+    """
+    if not DEDUP_ENABLED:
+        return None
+    candidates = db.execute(candidates_statement(latitude, longitude, issue_type)).all()
+
+    best = None
+    for candidate in candidates:
+        distance_m = geo.haversine_km(latitude, longitude, candidate.latitude, candidate.longitude) * 1000
+        if distance_m > DEDUP_RADIUS_METERS:
+            continue
+        match = DuplicateMatch(candidate.id, score(distance_m, title, description, candidate), round(distance_m, 1))
+        if best is None or match.score > best.score:
+            best = match
+    return best if best is not None and best.score >= DEDUP_LINK_SCORE else None
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import models
+from cache import get_redis
+from serialization import dumps
+
+EVENTS_CHANNEL = "roadsense:events"
+# Events a slow subscriber may fall behind by before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = int(os.environ.get("EVENT_SUBSCRIBER_QUEUE_SIZE", 100))
+KEEPALIVE_SECONDS = float(os.environ.get("EVENT_KEEPALIVE_SECONDS", 15))
+ADMIN_TOPIC = "admin"
+
+
+class Subscription:
+    """One connected client: a bounded queue fed with events for its topics"""
+
+    def __init__(self, topics: Iterable[str]):
+        self.topics = frozenset(topics)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def offer(self, event: dict) -> None:
+        # Never block the publisher on a slow client; events are change hints,
+        # so losing the oldest only costs the client a slightly later refetch
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def next(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """The next event, or None once `timeout` seconds pass without one"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalBroker:
+    """Delivers events to the subscribers connected to this worker"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(topics)
+        for topic in subscription.topics:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        for topic in subscription.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+    def deliver(self, topics: Iterable[str], event: dict) -> None:
+        # A client subscribed to several of the topics still gets the event once
+        recipients = set()
+        for topic in topics:
+            recipients.update(self._subscribers.get(topic, ()))
+        for subscription in recipients:
+            subscription.offer(event)
+
+    def __len__(self) -> int:
+        return len({s for subscribers in self._subscribers.values() for s in subscribers})
+
+
+class RedisBackend:
+    """Fans events out to every worker through a Redis channel"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def publish(self, topics: List[str], event: dict) -> None:
+        self.client.publish(EVENTS_CHANNEL, dumps({"topics": topics, "event": event}))
+
+    def listen(self, deliver) -> None:
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(EVENTS_CHANNEL)
+                for message in pubsub.listen():
+                    payload = json.loads(message["data"])
+                    deliver(payload["topics"], payload["event"])
+            except Exception as e:
+                # Clients miss events published while we reconnect; the next
+                # change or a page refresh brings them up to date
+                print(f"⚠️ Event listener error: {str(e)}")
+                time.sleep(1)
+
+
+class EventHub:
+    """
+    Publish/subscribe for report change events. Without REDIS_URL events
+    only reach clients connected to the publishing worker; with it they go
+    through Redis and every worker delivers to its own clients.
+    """
+
+    def __init__(self):
+        self.broker = LocalBroker()
+        self.backend: Optional[RedisBackend] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """Bind to the running event loop and, with REDIS_URL, start listening"""
+        self._loop = asyncio.get_running_loop()
+        client = get_redis()
+        if client is None:
+            return
+        self.backend = RedisBackend(client)
+        threading.Thread(target=self.backend.listen, args=(self._deliver_threadsafe,), daemon=True).start()
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        return self.broker.subscribe(topics)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.broker.unsubscribe(subscription)
+
+    def publish(self, event_type: str, topics: Iterable[str], **data) -> None:
+        """Send an event to every subscriber of any of `topics`; call after the commit"""
+        topics = sorted(set(topics))
+        event = {"type": event_type, "at": datetime.now(timezone.utc).isoformat(), **data}
+        if self.backend is not None:
+            try:
+                # Our own listener delivers it back to this worker's clients
+                self.backend.publish(topics, event)
+                return
+            except Exception as e:
+                print(f"⚠️ Could not publish event through Redis, delivering locally: {str(e)}")
+        self._deliver_threadsafe(topics, event)
+
+    def _deliver_threadsafe(self, topics: List[str], event: dict) -> None:
+        # Subscriber queues belong to the event loop; hop onto it when needed
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.broker.deliver(topics, event)
+        else:
+            loop.call_soon_threadsafe(self.broker.deliver, topics, event)
+
+
+hub = EventHub()
+
+
+def account_topic(role: str, account_id: int) -> str:
+    return f"{role}:{account_id}"
+
+
+def topics_for(principal) -> List[str]:
+    """The topics a signed-in account receives"""
+    topics = [account_topic(principal.role, principal.account_id)]
+    if principal.role == "admin":
+        topics.append(ADMIN_TOPIC)
+    return topics
+
+
+def report_topics(report, citizen: bool = True) -> List[str]:
+    """Who hears about a report: its citizen, the assigned official and admins"""
+    topics = [ADMIN_TOPIC]
+    if citizen and report.user_id is not None:
+        topics.append(account_topic("citizen", report.user_id))
+    if report.assigned_to is not None:
+        topics.append(account_topic("official", report.assigned_to))
+    return topics
+
+
+def publish_report(event_type: str, report, citizen: bool = True, **data) -> None:
+    hub.publish(event_type, report_topics(report, citizen), report_id=report.id, **data)
+
+
+def publish_reports(db: Session, event_type: str, changes: List[dict], **data) -> None:
+    """
+    Publish one event per bulk-updated row ({"report_id", "old_status"}), one
+    audience query for all. Runs after the commit, so a failure is logged
+    rather than raised: the change itself has already succeeded.
+    """
+    if not changes:
+        return
+    try:
+        reports = db.execute(
+            select(models.Report.id, models.Report.user_id, models.Report.assigned_to)
+            .where(models.Report.id.in_([change["report_id"] for change in changes]))
+        ).all()
+    except Exception as e:
+        print(f"⚠️ Could not publish {event_type} events: {str(e)}")
+        return
+    by_id = {report.id: report for report in reports}
+    for change in changes:
+        report = by_id.get(change["report_id"])
+        if report is not None:
+            hub.publish(event_type, report_topics(report), **change, **data)
+
+
+def format_sse(event: Optional[dict]) -> bytes:
+    """An SSE frame for `event`, or a comment line that keeps idle connections open"""
+    if event is None:
+        return b": keepalive\n\n"
+    return b"event: " + event["type"].encode() + b"\ndata: " + dumps(event) + b"\n\n"
@@ -0,0 +1,107 @@
+import math
+import os
+from typing import List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+
+import models
+
+# auto: use PostGIS when the extension can be installed; false: never try
+POSTGIS_MODE = os.environ.get("POSTGIS_ENABLED", "auto").lower()
+KM_PER_DEGREE = 111.32
+
+# Set by detect() once migrations have run
+postgis_enabled = False
+
+BBox = Tuple[float, float, float, float]  # min_lon, min_lat, max_lon, max_lat, as in GeoJSON
+
+
+def postgis_wanted() -> bool:
+    return POSTGIS_MODE not in ("0", "false", "no", "off")
+
+
+def detect(engine: Engine) -> bool:
+    """Use the geography path only if reports.location exists and PostGIS is installed"""
+    global postgis_enabled
+    postgis_enabled = False
+    if not postgis_wanted() or engine.dialect.name != "postgresql":
+        return False
+    try:
+        with engine.connect() as conn:
+            postgis_enabled = bool(conn.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'postgis') "
+                "AND EXISTS (SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = 'reports' AND column_name = 'location')"
+            )).scalar())
+    except Exception as e:
+        print(f"⚠️ Could not check for PostGIS: {str(e)}")
+    print("🌍 PostGIS geography queries enabled" if postgis_enabled else "🌍 Using lat/lon bounding-box queries")
+    return postgis_enabled
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371 * 2 * math.asin(math.sqrt(a))
+
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> BBox:
+    """A box containing every point within radius_km; cheap to test against the lat/lon index"""
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return (longitude - dlon, max(latitude - dlat, -90), longitude + dlon, min(latitude + dlat, 90))
+
+
+def _bbox_conditions(bbox: BBox) -> list:
+    min_lon, min_lat, max_lon, max_lat = bbox
+    conditions = [models.Report.latitude.between(min_lat, max_lat)]
+    # A box that wraps the antimeridian keeps only the latitude filter
+    if -180 <= min_lon and max_lon <= 180:
+        conditions.append(models.Report.longitude.between(min_lon, max_lon))
+    return conditions
+
+
+def within_radius(latitude: float, longitude: float, radius_km: float) -> List:
+    """
+    WHERE conditions for reports within radius_km of the point: ST_DWithin on
+    the GiST-indexed geography column with PostGIS, else the bounding box.
+    Both may let through points just outside the circle; callers check the
+    exact distance.
+    """
+    if postgis_enabled:
+        return [text(
+            "ST_DWithin(reports.location, ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography, :meters)"
+        ).bindparams(
+            bindparam("lon", longitude), bindparam("lat", latitude), bindparam("meters", radius_km * 1000)
+        )]
+    return _bbox_conditions(bounding_box(latitude, longitude, radius_km))
+
+
+def within_bbox(bbox: Optional[BBox]) -> List:
+    if bbox is None:
+        return []
+    if postgis_enabled:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        return [text(
+            "reports.location && ST_MakeEnvelope(:min_lon, :min_lat, :max_lon, :max_lat, 4326)::geography"
+        ).bindparams(
+            bindparam("min_lon", min_lon), bindparam("min_lat", min_lat),
+            bindparam("max_lon", max_lon), bindparam("max_lat", max_lat),
+        )]
+    return _bbox_conditions(bbox)
+
+
+def parse_bbox(value: Optional[str]) -> Optional[BBox]:
+    """
+    "min_lon,min_lat,max_lon,max_lat", widened to 3 decimals (~100 m) so
+    nearby viewports share a cache entry. Raises ValueError when malformed.
+    """
+    if not value:
+        return None
+    min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(","))
+    if not (-180 <= min_lon < max_lon <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise ValueError("bbox must be min_lon,min_lat,max_lon,max_lat within valid coordinates")
+    down = lambda v: math.floor(v * 1000) / 1000
+    up = lambda v: math.ceil(v * 1000) / 1000
+    return (down(min_lon), down(min_lat), up(max_lon), up(max_lat))
@@ -0,0 +1,154 @@
+import math
+import os
+from typing import List, Optional, Tuple
+
+from sqlalchemy import cast, func, select, tuple_
+from sqlalchemy.dialects.postgresql import BIT
+from sqlalchemy.orm import Session
+
+import models
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Four 16-bit bands: two hashes within 3 bits of each other must agree on at
+# least one band, so a lookup only reads images sharing a band value. Raising
+# the distance past BANDS - 1 would let matches slip through.
+BANDS = 4
+BAND_BITS = 64 // BANDS
+IMAGE_HASH_MAX_DISTANCE = min(int(os.environ.get("IMAGE_HASH_MAX_DISTANCE", 3)), BANDS - 1)
+
+_SIZE = 32
+_LOW = 8
+# Lowest 8 DCT-II frequencies of a 32-sample row, precomputed once
+_DCT = [[math.cos((2 * x + 1) * u * math.pi / (2 * _SIZE)) for x in range(_SIZE)] for u in range(_LOW)]
+
+
+def available() -> bool:
+    return Image is not None
+
+
+def phash_pixels(pixels: List[int]) -> int:
+    """64-bit pHash of a 32x32 greyscale image given row by row"""
+    rows = [pixels[y * _SIZE:(y + 1) * _SIZE] for y in range(_SIZE)]
+    row_freqs = [[sum(c * p for c, p in zip(basis, row)) for basis in _DCT] for row in rows]
+    low = [
+        sum(basis[y] * row_freqs[y][u] for y in range(_SIZE))
+        for basis in _DCT for u in range(_LOW)
+    ]
+    ordered = sorted(low)
+    median = (ordered[31] + ordered[32]) / 2
+    value = 0
+    for coefficient in low:
+        value = (value << 1) | (coefficient > median)
+    return value
+
+
+def hash_file(path: str) -> Optional[int]:
+    """pHash of the image at `path`, or None without Pillow or for files it cannot decode"""
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as image:
+            # JPEG decoders can scale down while decoding, which skips most of the work
+            image.draft("L", (_SIZE * 2, _SIZE * 2))
+            pixels = list(image.convert("L").resize((_SIZE, _SIZE), Image.LANCZOS).getdata())
+    except Exception as e:
+        print(f"⚠️ Could not hash image {path}: {str(e)}")
+        return None
+    return phash_pixels(pixels)
+
+
+def to_signed(value: int) -> int:
+    """Hashes are stored in a signed BIGINT"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def to_unsigned(value: int) -> int:
+    return value & ((1 << 64) - 1)
+
+
+def bands(value: int) -> List[Tuple[int, int]]:
+    value = to_unsigned(value)
+    return [(band, (value >> (band * BAND_BITS)) & ((1 << BAND_BITS) - 1)) for band in range(BANDS)]
+
+
+def distance(left: int, right: int) -> int:
+    return (to_unsigned(left) ^ to_unsigned(right)).bit_count()
+
+
+def find_similar(db: Session, value: int, max_distance: int = IMAGE_HASH_MAX_DISTANCE,
+                 before_id: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """
+    (image id, distance) of the closest stored image within max_distance
+    bits, preferring the oldest on ties. Reads only the images sharing one
+    of the hash's bands, so the cost does not grow with the corpus; every
+    one of them is checked in the database and only the best match returned.
+    """
+    Band = models.ReportImageHashBand
+    # XOR of the signed BIGINTs has the same bits as XOR of the unsigned hashes
+    bits = func.bit_count(cast(models.ReportImage.phash.op("#")(to_signed(value)), BIT(64)))
+    query = select(models.ReportImage.id, bits).where(
+        models.ReportImage.id.in_(select(Band.image_id).where(tuple_(Band.band, Band.value).in_(bands(value)))),
+        bits <= max_distance
+    )
+    if before_id is not None:
+        query = query.where(models.ReportImage.id < before_id)
+    best = db.execute(query.order_by(bits, models.ReportImage.id).limit(1)).first()
+    return (best[0], best[1]) if best else None
+
+
+def index_image(db: Session, image: models.ReportImage, value: Optional[int]) -> Optional[int]:
+    """
+    Store the hash on a new image and flag it as a copy of an earlier upload
+    when one is close enough. Returns the earlier image's id, if any.
+    """
+    if value is None:
+        return None
+    # Only earlier uploads count, including when backfilling old rows
+    match = find_similar(db, value, before_id=image.id)
+    image.phash = to_signed(value)
+    image.duplicate_of = match[0] if match else None
+    image.hash_bands = [models.ReportImageHashBand(band=band, value=band_value) for band, band_value in bands(value)]
+    return image.duplicate_of
+
+
+def backfill(db: Session, batch_size: int = 500) -> int:
+    """Hash stored images that predate hashing (or were saved without Pillow)"""
+    hashed = 0
+    last_id = 0
+    while True:
+        images = db.execute(
+            select(models.ReportImage)
+            .where(models.ReportImage.phash.is_(None), models.ReportImage.id > last_id)
+            .order_by(models.ReportImage.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not images:
+            return hashed
+        for image in images:
+            index_image(db, image, hash_file(image.file_path))
+            # Flush so later images in the batch can match this one
+            db.flush()
+            hashed += image.phash is not None
+        last_id = images[-1].id
+        db.commit()
+
+
+if __name__ == "__main__":
+    import sys
+    from database import SessionLocal
+
+    if sys.argv[1:] != ["backfill"]:
+        print("usage: python image_hash.py backfill")
+        sys.exit(2)
+    if not available():
+        print("❌ Pillow is not installed (pip install Pillow)")
+        sys.exit(1)
+    db = SessionLocal()
+    try:
+        print(f"✅ Hashed {backfill(db)} report images")
+    finally:
+        db.close()
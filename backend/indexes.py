@@ -0,0 +1,173 @@
+import json
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateIndex
+
+import dedup
+import models
+from database import Base
+
+# Composite and partial indexes for the hot queries. They are declared on the
+# models (so create_all builds them on new databases) and built here on
+# existing ones. The second name is a single-column index the new one makes
+# redundant; it is dropped once the replacement is valid, saving its upkeep
+# on every write.
+MANAGED_INDEXES: List[Tuple[str, str, Optional[str]]] = [
+    ("reports", "ix_reports_assigned_status_created", None),
+    ("reports", "ix_reports_zone_created", None),
+    ("reports", "ix_reports_user_created", "ix_reports_user_id"),
+    ("reports", "ix_reports_status_created", "ix_reports_status"),
+    ("reports", "ix_reports_open_dedup", None),
+    ("report_comments", "ix_report_comments_report_created", "ix_report_comments_report_id"),
+    ("report_status_history", "ix_report_status_history_report_created", "ix_report_status_history_report_id"),
+]
+
+_LOCK_KEY = "roadsense_indexes"
+_INDEX_NODES = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+
+def _index(table: str, name: str):
+    return next(index for index in Base.metadata.tables[table].indexes if index.name == name)
+
+
+def _valid(conn: Connection, name: str) -> Optional[bool]:
+    """True when built, False when a concurrent build was interrupted, None when missing"""
+    return conn.execute(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"), {"name": name}
+    ).scalar()
+
+
+def _partitioned(conn: Connection, table: str) -> bool:
+    return conn.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar() is True
+
+
+def ensure_indexes(engine: Engine) -> int:
+    """
+    Build missing managed indexes without blocking writes (CREATE INDEX
+    CONCURRENTLY; plain CREATE INDEX on partitioned tables, which do not
+    support it), rebuild invalid ones and drop the indexes they replace.
+    Returns the number built.
+    """
+    if engine.dialect.name != "postgresql":
+        return 0
+    built = 0
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # Workers start together; one builds while the others carry on
+        if not conn.execute(text("SELECT pg_try_advisory_lock(hashtext(:key))"), {"key": _LOCK_KEY}).scalar():
+            return 0
+        try:
+            for table, name, replaces in MANAGED_INDEXES:
+                concurrently = "" if _partitioned(conn, table) else "CONCURRENTLY "
+                state = _valid(conn, name)
+                if state is False:
+                    conn.exec_driver_sql(f"DROP INDEX {concurrently}{name}")
+                if state is not True:
+                    ddl = str(CreateIndex(_index(table, name), if_not_exists=True).compile(dialect=engine.dialect))
+                    try:
+                        conn.exec_driver_sql(ddl.replace("CREATE INDEX ", f"CREATE INDEX {concurrently}", 1))
+                    except Exception as e:
+                        print(f"⚠️ Could not build index {name}: {str(e)}")
+                        continue
+                    built += 1
+                    print(f"🗂️ Built index {name}")
+                if replaces and _valid(conn, replaces) is not None:
+                    conn.exec_driver_sql(f"DROP INDEX {concurrently}IF EXISTS {replaces}")
+                    print(f"🗂️ Dropped index {replaces} (replaced by {name})")
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(hashtext(:key))"), {"key": _LOCK_KEY})
+    return built
+
+
+# The filters and orderings of the hot endpoints, with sample values
+HOT_QUERIES: List[Tuple[str, str, Callable]] = [
+    ("official queue by status", "ix_reports_assigned_status_created", lambda: (
+        select(models.Report)
+        .where(models.Report.assigned_to == 1, models.Report.status == models.ReportStatus.PENDING)
+        .order_by(models.Report.created_at.desc()).limit(50)
+    )),
+    ("official dashboard counts", "ix_reports_assigned_status_created", lambda: (
+        select(models.Report.status, func.count())
+        .where(models.Report.assigned_to == 1)
+        .group_by(models.Report.status)
+    )),
+    ("zone reports", "ix_reports_zone_created", lambda: (
+        select(models.Report)
+        .where(models.Report.assigned_zone == "Zone A")
+        .order_by(models.Report.created_at.desc()).limit(50)
+    )),
+    ("my reports", "ix_reports_user_created", lambda: (
+        select(models.Report).where(models.Report.user_id == 1).order_by(models.Report.created_at.desc())
+    )),
+    ("map by status", "ix_reports_status_created", lambda: (
+        select(models.Report)
+        .where(models.Report.status == models.ReportStatus.PENDING)
+        .order_by(models.Report.created_at.desc()).limit(500)
+    )),
+    ("duplicate candidates", "ix_reports_open_dedup", lambda: (
+        dedup.candidates_statement(18.52, 73.85, models.IssueType.POTHOLE)
+    )),
+    ("report comments", "ix_report_comments_report_created", lambda: (
+        select(models.ReportComment)
+        .where(models.ReportComment.report_id == 1)
+        .order_by(models.ReportComment.created_at.desc())
+    )),
+    ("report history", "ix_report_status_history_report_created", lambda: (
+        select(models.ReportStatusHistory)
+        .where(models.ReportStatusHistory.report_id == 1)
+        .order_by(models.ReportStatusHistory.created_at.desc())
+    )),
+]
+
+
+def _plan_indexes(plan: dict) -> List[Tuple[str, Optional[str]]]:
+    nodes = [(plan["Node Type"], plan.get("Index Name"))]
+    for child in plan.get("Plans", []):
+        nodes += _plan_indexes(child)
+    return nodes
+
+
+def check(engine: Engine) -> List[Tuple[str, bool, List[str]]]:
+    """
+    EXPLAIN each hot query and report whether it can be answered from its
+    index. Sequential scans are disabled for the check so a small development
+    table gives the same answer as production. On a partitioned table any
+    index scan counts, since partitions name their indexes themselves.
+    """
+    results = []
+    with engine.connect() as conn:
+        for description, expected, build in HOT_QUERIES:
+            statement = build()
+            table = statement.get_final_froms()[0].name
+            sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            with conn.begin():
+                conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+                plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+                partitioned = _partitioned(conn, table)
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            nodes = _plan_indexes(plan[0]["Plan"])
+            used = sorted({name for node, name in nodes if node in _INDEX_NODES and name})
+            ok = expected in used or (partitioned and bool(used))
+            results.append((description, ok, used))
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    from database import engine
+
+    args = sys.argv[1:]
+    if args == ["ensure"]:
+        print(f"✅ Built {ensure_indexes(engine)} indexes")
+    elif args == ["check"]:
+        results = check(engine)
+        for description, ok, used in results:
+            print(f"{'✅' if ok else '❌'} {description:<28} {', '.join(used) or 'no index scan'}")
+        sys.exit(0 if all(ok for _, ok, _ in results) else 1)
+    else:
+        print("usage: python indexes.py ensure | check")
+        sys.exit(2)
@@ -1,12 +1,33 @@
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect, status, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import func, text
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, aliased, selectinload
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import IntegrityError
 from datetime import timedelta
 import schemas
 import models
 import auth
-from database import engine, get_db, Base
+import bulk_actions
+import bulk_import
+import counters
+import votes
+import text_search
+import migrations
+import rate_limit
+import response_cache
+import streaming
+import serialization
+import compression
+import events
+import notifications
+import alerts
+import geo
+import dedup
+import image_hash
+import archive
+from database import engine, get_db, Base, SessionLocal
+import io
 import os
 import shutil
 from typing import Optional
@@ -20,16 +41,32 @@ from math import radians, cos, sin, asin, sqrt
 from datetime import datetime, timedelta
 from typing import Dict
 from sqlalchemy import text
+from contextlib import asynccontextmanager
+from starlette.concurrency import run_in_threadpool
+import asyncio
 
 
 print()
 
 print("🔨 Creating all tables from models...")
 Base.metadata.create_all(bind=engine)
+migrations.run_migrations(engine)
 
 print("✅ Database setup complete!")
 
-app = FastAPI(title="RoadSense.ai API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    flush_task = asyncio.create_task(counters.flush_periodically())
+    auth.start_invalidation_listener()
+    response_cache.start_invalidation_listener()
+    events.hub.start()
+    yield
+    flush_task.cancel()
+    # Write out whatever is still buffered before the worker exits
+    await asyncio.to_thread(counters.flush_all)
+
+app = FastAPI(title="RoadSense.ai API", version="1.0.0", lifespan=lifespan,
+              default_response_class=serialization.FastJSONResponse)
 
 origins = [
     "http://localhost:3000",
@@ -40,6 +77,12 @@ origins = [
     "http://127.0.0.1:5174",
 ]
 
+# Innermost, so it sees the final body of every route
+app.add_middleware(compression.CompressionMiddleware)
+
+# Added before CORS so CORS stays outermost and 429s still carry its headers
+app.add_middleware(rate_limit.RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -73,8 +116,8 @@ def health_check(db: Session = Depends(get_db)):
 
 @app.post("/api/register/citizen", response_model=schemas.UserResponse, status_code=status.HTTP_201_CREATED)
 def register_citizen(user_data: schemas.CitizenRegister, db: Session = Depends(get_db)):
-    existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
-    if existing_user:
+    user_taken, official_taken, _ = auth.find_registration_conflicts(db, user_data.email)
+    if user_taken or official_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -83,7 +126,7 @@ def register_citizen(user_data: schemas.CitizenRegister, db: Session = Depends(g
     new_user = models.User(
         full_name=user_data.full_name,
         email=user_data.email,
-        password_hash=auth.get_password_hash(user_data.password),
+        password_hash=auth.hash_password_pooled(user_data.password),
         role=models.UserRole.CITIZEN,
         account_status=models.AccountStatus.ACTIVE,
         is_active=True
@@ -109,24 +152,20 @@ async def register_official(
     db: Session = Depends(get_db)
 ):
     
-    existing_user = db.query(models.User).filter(models.User.email == email).first()
-    if existing_user:
+    user_taken, official_taken, employee_taken = auth.find_registration_conflicts(db, email, employee_id)
+    if user_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered in users table"
         )
     
-    existing_official = db.query(models.Official).filter(models.Official.email == email).first()
-    if existing_official:
+    if official_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered as official"
         )
     
-    existing_employee = db.query(models.Official).filter(
-        models.Official.employee_id == employee_id
-    ).first()
-    if existing_employee:
+    if employee_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Employee ID already registered"
@@ -166,7 +205,11 @@ async def register_official(
             )
     
     try:
-        password_hash = auth.get_password_hash(password)
+        password_hash = await auth.hash_password_async(password)
+    except HTTPException:
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+        raise
     except Exception as e:
         if file_path and os.path.exists(file_path):
             os.remove(file_path)
@@ -245,19 +288,18 @@ def login(login_data: schemas.LoginRequest, db: Session = Depends(get_db)):
             detail="Your account is pending approval. Please wait for admin verification."
         )
     
-    # Create access token
-    access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = auth.create_access_token(
-        data={"sub": user.email, "role": user.role.value},
-        expires_delta=access_token_expires
-    )
-    
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "role": user.role.value,
-        "account_status": user.account_status.value
-    }
+    return auth.issue_tokens(db, user)
+
+@app.post("/api/token/refresh", response_model=schemas.Token)
+def refresh_access_token(request: schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Trade a refresh token for a new access token (and a new refresh token)"""
+    return auth.rotate_refresh_token(db, request.refresh_token)
+
+@app.post("/api/logout")
+def logout(request: schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Revoke the refresh token so the session cannot be renewed"""
+    auth.revoke_refresh_token(db, request.refresh_token)
+    return {"message": "Logged out successfully"}
 
 @app.get("/api/users/me", response_model=schemas.UserResponse)
 async def get_current_user_info(current_user = Depends(auth.get_current_user)):
@@ -295,7 +337,7 @@ def validate_image(file: UploadFile) -> tuple[bool, str]:
     return True, "Valid"
 
 # Helper function to save image
-def save_report_image(file: UploadFile, report_id: int, order: int) -> tuple[str, str, int]:
+def save_report_image(file: UploadFile, report_id: int, order: int) -> tuple[str, str, int, str, Optional[int]]:
     file_extension = file.filename.split(".")[-1].lower()
     unique_filename = f"report_{report_id}_{order}_{uuid.uuid4().hex}.{file_extension}"
     file_path = os.path.join(REPORT_IMAGES_DIR, unique_filename)
@@ -304,10 +346,13 @@ def save_report_image(file: UploadFile, report_id: int, order: int) -> tuple[str
         shutil.copyfileobj(file.file, buffer)
     file_size = os.path.getsize(file_path)
     mime_type = mimetypes.guess_type(file_path)[0] or 'image/jpeg'
-    return unique_filename, file_path, file_size, mime_type
+    # Perceptual hash for spotting re-used photos; None without Pillow
+    phash = image_hash.hash_file(file_path)
+    return unique_filename, file_path, file_size, mime_type, phash
 
 @app.post("/api/reports", response_model=schemas.ReportResponse, status_code=status.HTTP_201_CREATED)
 async def create_report(
+    background_tasks: BackgroundTasks,
     latitude: float = Form(...),
     longitude: float = Form(...),
     address: str = Form(...),
@@ -349,6 +394,14 @@ async def create_report(
         priority=models.ReportPriority.MEDIUM
     )
     
+    # Same issue already reported here: link to it, or close straight into it when near-identical
+    duplicate = dedup.find_duplicate(db, latitude, longitude, new_report.issue_type, title, description)
+    if duplicate:
+        new_report.duplicate_of = duplicate.report_id
+        if duplicate.merge:
+            new_report.status = models.ReportStatus.CLOSED
+            new_report.closed_at = datetime.utcnow()
+    
     try:
         db.add(new_report)
         db.commit()
@@ -358,7 +411,7 @@ async def create_report(
         saved_images = []
         for idx, image in enumerate(images):
             try:
-                filename, filepath, file_size, mime_type = save_report_image(image, new_report.id, idx)
+                filename, filepath, file_size, mime_type, phash = save_report_image(image, new_report.id, idx)
                 
                 report_image = models.ReportImage(
                     report_id=new_report.id,
@@ -368,6 +421,9 @@ async def create_report(
                     mime_type=mime_type,
                     display_order=idx
                 )
+                copied_from = image_hash.index_image(db, report_image, phash)
+                if copied_from:
+                    print(f"🖼️ Image {idx + 1} of report #{new_report.id} looks like image #{copied_from}")
                 
                 db.add(report_image)
                 saved_images.append(filepath)
@@ -390,13 +446,29 @@ async def create_report(
         status_history = models.ReportStatusHistory(
             report_id=new_report.id,
             old_status=None,
-            new_status=models.ReportStatus.PENDING,
+            new_status=new_report.status,
             changed_by=current_user.id,
             changed_by_role=current_user.role,
-            comment="Report created"
+            comment=(
+                f"Merged into report #{duplicate.report_id}" if duplicate and duplicate.merge
+                else f"Report created (possible duplicate of #{duplicate.report_id})" if duplicate
+                else "Report created"
+            )
         )
         db.add(status_history)
+        if duplicate and duplicate.merge:
+            # The merged report counts as support for the original
+            original_owner = db.scalar(select(models.Report.user_id).where(models.Report.id == duplicate.report_id))
+            if original_owner != current_user.id and votes.cast_vote(db, duplicate.report_id, current_user.id):
+                votes.apply_delta(db, duplicate.report_id, 1)
         db.commit()
+        response_cache.invalidate_reports()
+        if duplicate:
+            print(f"🔁 Report #{new_report.id} {'merged into' if duplicate.merge else 'linked to'} "
+                  f"#{duplicate.report_id} (score {duplicate.score}, {duplicate.distance_m} m)")
+        if not (duplicate and duplicate.merge):
+            # Matching subscribers and writing their alerts happens after the response
+            background_tasks.add_task(_with_session, alerts.fan_out_new_report, new_report.id)
         
         return new_report
         
@@ -431,9 +503,7 @@ async def get_reports(
     
     # Officials see all reports in their zone
     if current_user.role == models.UserRole.OFFICIAL:
-        official = db.query(models.Official).filter(models.Official.email == current_user.email).first()
-        if official:
-            query = query.filter(models.Report.assigned_zone == official.zone)
+        query = query.filter(models.Report.assigned_zone == current_user.zone)
     
     # Order by creation date (newest first)
     query = query.order_by(models.Report.created_at.desc())
@@ -449,16 +519,16 @@ async def get_reports(
             "latitude": report.latitude,
             "longitude": report.longitude,
             "address": report.address,
-            "issue_type": report.issue_type.value,
+            "issue_type": models.ISSUE_TYPE_VALUES[report.issue_type],
             "title": report.title,
-            "status": report.status.value,
-            "priority": report.priority.value,
+            "status": models.REPORT_STATUS_VALUES[report.status],
+            "priority": models.REPORT_PRIORITY_VALUES[report.priority],
             "created_at": report.created_at,
             "image_count": len(report.images)
         }
         result.append(report_dict)
     
-    return result
+    return serialization.FastJSONResponse(result)
 
 @app.get("/api/reports/my-reports", response_model=List[schemas.ReportResponse])
 async def get_my_reports(
@@ -472,6 +542,232 @@ async def get_my_reports(
     
     return reports
 
+# ==================== PUBLIC ENDPOINTS (NO AUTH REQUIRED) ====================
+# Registered ahead of /api/reports/{report_id}, which would otherwise capture these paths
+
+def _with_session(build, *args):
+    """Run `build(db, *args)` on its own session, for work that may outlive the request"""
+    db = SessionLocal()
+    try:
+        return build(db, *args)
+    finally:
+        db.close()
+
+MAP_COLUMNS = (
+    models.Report.id, models.Report.title, models.Report.description,
+    models.Report.latitude, models.Report.longitude, models.Report.address,
+    models.Report.created_at, models.Report.status, models.Report.priority,
+    models.Report.issue_type,
+)
+
+def map_reports_statement(status: str, limit: int, bbox: Optional[geo.BBox] = None):
+    query = select(*MAP_COLUMNS).where(*geo.within_bbox(bbox))
+    
+    # Filter by status if provided
+    if status and status.upper() != 'ALL':
+        status_enum = getattr(models.ReportStatus, status.upper(), None)
+        if status_enum:
+            query = query.where(models.Report.status == status_enum)
+        else:
+            print(f"⚠️ Invalid status: {status}")
+    
+    return query.order_by(models.Report.created_at.desc()).limit(limit)
+
+def serialize_map_report(report) -> dict:
+    return {
+        "id": report.id,
+        "title": report.title,
+        "description": report.description,
+        "latitude": float(report.latitude) if report.latitude else None,
+        "longitude": float(report.longitude) if report.longitude else None,
+        "address": report.address,
+        "created_at": report.created_at.isoformat() if report.created_at else None,
+        "status": models.REPORT_STATUS_VALUES[report.status],
+        "priority": models.REPORT_PRIORITY_VALUES.get(report.priority, "medium"),
+        "issue_type": models.ISSUE_TYPE_VALUES[report.issue_type],
+    }
+
+def build_map_reports(db: Session, status: str, limit: int, bbox: Optional[geo.BBox] = None) -> list:
+    reports = db.execute(map_reports_statement(status, limit, bbox)).all()
+    print(f"✅ Found {len(reports)} reports for map")
+    return [serialize_map_report(report) for report in reports]
+
+@app.get("/api/reports/map")
+async def get_public_map_reports(
+    request: Request,
+    report_status: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(1000, le=5000),
+    stream: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    bbox: Optional[str] = Query(None, description="min_lon,min_lat,max_lon,max_lat of the visible map")
+):
+    """
+    PUBLIC ENDPOINT - Get reports for map visualization
+    No authentication required; served from the public response cache.
+    With ?stream=json or ?stream=ndjson rows are streamed straight from the
+    database cursor instead, which keeps memory flat for large limits.
+    """
+    try:
+        viewport = geo.parse_bbox(bbox)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid bbox: {str(e)}"
+        )
+    try:
+        print(f"📍 Public map request - status: {report_status}, limit: {limit}")
+        if stream:
+            return streaming.stream_query(
+                map_reports_statement(report_status, limit, viewport), serialize_map_report, stream
+            )
+        # Entries hold the encoded body and its gzip/brotli variants, compressed once
+        key = response_cache.map_key(report_status, limit, viewport)
+        body = await response_cache.map_reports.get_or_compute(
+            key, lambda: compression.EncodedBody.json(_with_session(build_map_reports, *key))
+        )
+        return body.response(request)
+        
+    except Exception as e:
+        print(f"❌ Error in public map endpoint: {str(e)}")
+        import traceback
+        print(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch map data: {str(e)}"
+        )
+
+def load_nearby_candidates(db: Session, latitude: float, longitude: float, radius_km: float) -> list:
+    """
+    Reports within radius_km of a grid cell centre, serialized but not yet
+    ranked; cached per cell and shared by every point inside it
+    """
+    # Only rows inside the radius (PostGIS) or its bounding box come back;
+    # the exact distance is checked per request. Duplicates are shown via their original.
+    candidates = db.query(models.Report).options(selectinload(models.Report.images)).filter(
+        *geo.within_radius(latitude, longitude, radius_km),
+        models.Report.duplicate_of.is_(None)
+    ).all()
+    priority_map = {"low": 3, "medium": 5, "high": 7, "critical": 9}
+    serialized = []
+    for report in candidates:
+        first_image = None
+        if report.images and len(report.images) > 0:
+            first_image = f"/api/reports/images/{report.images[0].filename}"
+        serialized.append({
+            "id": report.id,
+            "latitude": float(report.latitude),
+            "longitude": float(report.longitude),
+            "address": report.address,
+            "issue_type": models.ISSUE_TYPE_VALUES.get(report.issue_type),
+            "title": report.title,
+            "description": report.description,
+            "status": models.REPORT_STATUS_VALUES.get(report.status),
+            "priority": models.REPORT_PRIORITY_VALUES.get(report.priority),
+            "created_at": report.created_at.isoformat(),
+            "upvotes": report.upvotes,
+            "image_url": first_image,
+            "base_severity": priority_map.get(models.REPORT_PRIORITY_VALUES.get(report.priority), 5)
+        })
+    return serialized
+
+def build_nearby_reports(candidates: list, latitude: float, longitude: float, radius_km: float) -> list:
+    # Haversine formula
+    def haversine(lon1, lat1, lon2, lat2):
+        lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
+        dlon, dlat = lon2 - lon1, lat2 - lat1
+        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+        return 6371 * 2 * asin(sqrt(a))
+    nearby_reports = []
+    for candidate in candidates:
+        distance = haversine(longitude, latitude, candidate['longitude'], candidate['latitude'])
+        if distance <= radius_km:
+            # Candidates are shared through the cache, so rank copies of them
+            nearby_reports.append({**candidate, "distance_km": round(distance, 2)})
+    def calculate_severity_with_clusters(reports_list):
+        result, processed = [], set()
+        for i, report in enumerate(reports_list):
+            if i in processed:
+                continue
+            cluster, cluster_indices = [report], {i}
+            for j, other_report in enumerate(reports_list):
+                if j != i and j not in processed:
+                    if haversine(report['longitude'], report['latitude'], 
+                                other_report['longitude'], other_report['latitude']) <= 0.5:
+                        cluster.append(other_report)
+                        cluster_indices.add(j)
+            cluster_size = len(cluster)
+            cluster_bonus = 1 if cluster_size >= 5 else 0.7 if cluster_size >= 3 else 0.3 if cluster_size >= 2 else 0
+            for report_item in cluster:
+                report_item['severity'] = round(min(10, report_item['base_severity'] + cluster_bonus), 1)
+                report_item['cluster_count'] = cluster_size
+                del report_item['base_severity']
+                result.append(report_item)
+            processed.update(cluster_indices)
+        return result
+    return calculate_severity_with_clusters(nearby_reports)
+
+def build_nearby_response(candidates: list, latitude: float, longitude: float, radius_km: float) -> dict:
+    reports_with_severity = build_nearby_reports(candidates, latitude, longitude, radius_km)
+    status_counts, issue_type_counts = {}, {}
+    severity_distribution = {"low": 0, "medium": 0, "high": 0, "critical": 0}
+    for report in reports_with_severity:
+        status_counts[report['status']] = status_counts.get(report['status'], 0) + 1
+        issue_type_counts[report['issue_type']] = issue_type_counts.get(report['issue_type'], 0) + 1
+        if report['severity'] >= 8:
+            severity_distribution["critical"] += 1
+        elif report['severity'] >= 6:
+            severity_distribution["high"] += 1
+        elif report['severity'] >= 4:
+            severity_distribution["medium"] += 1
+        else:
+            severity_distribution["low"] += 1
+    return {
+        "success": True,
+        "user_location": {"latitude": latitude, "longitude": longitude},
+        "radius_km": radius_km,
+        "total_reports": len(reports_with_severity),
+        "reports": reports_with_severity,
+        "statistics": {
+            "by_status": status_counts,
+            "by_issue_type": issue_type_counts,
+            "by_severity": severity_distribution
+        }
+    }
+
+@app.get("/api/reports/nearby")
+async def get_nearby_reports(
+    request: Request,
+    latitude: float = Query(..., description="User's current latitude"),
+    longitude: float = Query(..., description="User's current longitude"),
+    radius_km: float = Query(10, ge=0.1, le=100, description="Search radius in kilometers")
+):
+    try:
+        # Candidates are cached per grid cell, fetched wide enough to cover
+        # any point in the cell; distances and clusters are then measured
+        # from the caller's own point
+        key = response_cache.nearby_key(latitude, longitude, radius_km)
+        candidates = await response_cache.nearby_candidates.get_or_compute(
+            key, lambda: _with_session(load_nearby_candidates, *response_cache.nearby_fetch_area(key))
+        )
+        # The finished body echoes the caller's point, so it is precompressed
+        # and reused only for the exact same coordinates and radius
+        exact = (latitude, longitude, radius_km)
+        cached = response_cache.nearby_bodies.get(exact)
+        if cached is not None and cached[0] is candidates:
+            return cached[1].response(request)
+        body = await run_in_threadpool(lambda: compression.EncodedBody.json(
+            build_nearby_response(candidates, *exact), brotli_quality=compression.BROTLI_QUALITY
+        ))
+        response_cache.nearby_bodies.set(exact, (candidates, body))
+        return body.response(request)
+    except Exception as e:
+        print(f"❌ Error in nearby reports: {str(e)}")
+        import traceback
+        print(traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching nearby reports: {str(e)}"
+        )
+
 @app.get("/api/reports/{report_id}", response_model=schemas.ReportResponse)
 async def get_report(
     report_id: int,
@@ -482,17 +778,192 @@ async def get_report(
     report = db.query(models.Report).filter(models.Report.id == report_id).first()
     
     if not report:
+        # Old closed/resolved reports live in archived_reports
+        archived = archive.get_archived(db, report_id)
+        if archived:
+            return archived
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Report not found"
         )
     
-    # Increment view count
-    report.views += 1
-    db.commit()
+    # Views are buffered and flushed in batches so this GET stays read-only
+    counters.views.record(report.id, (current_user.role, current_user.id))
     
     return report
 
+def require_bulk_target(report_ids: Optional[List[int]], report_filter: Optional[schemas.BulkReportFilter]):
+    if not report_ids and not (report_filter and report_filter.model_dump(exclude_none=True)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide report_ids or a non-empty filter"
+        )
+
+# Registered before /api/reports/{report_id}/... so "bulk" is not parsed as a report id
+@app.patch("/api/reports/bulk/status")
+async def bulk_update_report_status(
+    bulk_update: schemas.BulkStatusUpdate,
+    current_user = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Apply one status transition to many reports at once"""
+    if current_user.role not in [models.UserRole.OFFICIAL, models.UserRole.ADMIN]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only officials can update report status"
+        )
+    require_bulk_target(bulk_update.report_ids, bulk_update.filter)
+
+    conditions = bulk_actions.build_conditions(bulk_update.report_ids, bulk_update.filter)
+    # Officials may only touch reports assigned to them; checked in the same WHERE clause
+    if current_user.role == models.UserRole.OFFICIAL:
+        conditions.append(models.Report.assigned_to == current_user.id)
+
+    try:
+        updated = bulk_actions.bulk_update_status(
+            db,
+            conditions,
+            models.ReportStatus(bulk_update.status.value),
+            models.ReportPriority(bulk_update.priority.value) if bulk_update.priority else None,
+            current_user.id,
+            current_user.role,
+            bulk_update.comment
+        )
+        notifications.notify_reports(
+            db, [row["report_id"] for row in updated], "status_update", "Status updated: ",
+            f"Now {bulk_update.status.value}", actor=(current_user.role, current_user.id)
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error in bulk status update: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update report status"
+        )
+
+    # Committed: nothing below may turn the response into an error
+    response_cache.invalidate_reports()
+    events.publish_reports(db, "report.status_changed", updated, new_status=bulk_update.status.value)
+
+    updated_ids = {row["report_id"] for row in updated}
+    return {
+        "message": f"Updated {len(updated)} reports",
+        "new_status": bulk_update.status.value,
+        "updated": updated,
+        "skipped_ids": [rid for rid in (bulk_update.report_ids or []) if rid not in updated_ids]
+    }
+
+@app.patch("/api/reports/bulk/assign")
+async def bulk_assign_reports(
+    bulk_assignment: schemas.BulkAssignment,
+    background_tasks: BackgroundTasks,
+    current_user = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Assign many reports to one official at once"""
+    if current_user.role != models.UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can assign reports"
+        )
+    require_bulk_target(bulk_assignment.report_ids, bulk_assignment.filter)
+
+    official = db.query(models.Official).filter(models.Official.id == bulk_assignment.official_id).first()
+
+    if not official:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Official not found"
+        )
+
+    conditions = bulk_actions.build_conditions(bulk_assignment.report_ids, bulk_assignment.filter)
+    try:
+        updated = bulk_actions.bulk_assign(
+            db, conditions, official, current_user.id, current_user.role, bulk_assignment.comment
+        )
+        notifications.notify_reports(
+            db, [row["report_id"] for row in updated], "report_assigned", "Report assigned: ",
+            f"Assigned to {official.full_name} ({official.zone})", actor=(current_user.role, current_user.id)
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error in bulk assignment: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to assign reports"
+        )
+
+    # Committed: nothing below may turn the response into an error
+    response_cache.invalidate_reports()
+    events.publish_reports(db, "report.assigned", updated, official_id=official.id, zone=official.zone)
+    background_tasks.add_task(_with_session, alerts.fan_out_zone, [row["report_id"] for row in updated], official.zone)
+
+    updated_ids = {row["report_id"] for row in updated}
+    return {
+        "message": f"Assigned {len(updated)} reports",
+        "assigned_to": official.full_name,
+        "zone": official.zone,
+        "updated": updated,
+        "skipped_ids": [rid for rid in (bulk_assignment.report_ids or []) if rid not in updated_ids]
+    }
+
+@app.post("/api/reports/{report_id}/upvote")
+async def upvote_report(
+    report_id: int,
+    current_user = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Upvote a report once per citizen"""
+    if current_user.role != models.UserRole.CITIZEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only citizens can upvote reports"
+        )
+    
+    try:
+        created = votes.cast_vote(db, report_id, current_user.id)
+        upvotes = votes.apply_delta(db, report_id, 1) if created else None
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report not found"
+        )
+    
+    return {
+        "message": "Report upvoted" if created else "Already upvoted",
+        "report_id": report_id,
+        "upvoted": True,
+        "upvotes": upvotes if upvotes is not None else votes.current_upvotes(db, report_id)
+    }
+
+@app.delete("/api/reports/{report_id}/upvote")
+async def remove_upvote(
+    report_id: int,
+    current_user = Depends(auth.get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Withdraw the current citizen's upvote"""
+    if current_user.role != models.UserRole.CITIZEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only citizens can remove upvotes"
+        )
+    
+    removed = votes.retract_vote(db, report_id, current_user.id)
+    upvotes = votes.apply_delta(db, report_id, -1) if removed else None
+    db.commit()
+    
+    return {
+        "message": "Upvote removed" if removed else "Report was not upvoted",
+        "report_id": report_id,
+        "upvoted": False,
+        "upvotes": upvotes if upvotes is not None else votes.current_upvotes(db, report_id)
+    }
+
 @app.patch("/api/reports/{report_id}/status")
 async def update_report_status(
     report_id: int,
@@ -542,8 +1013,16 @@ async def update_report_status(
     )
     
     db.add(status_history)
+    notifications.notify_reports(
+        db, [report_id], "status_update", "Status updated: ", f"Now {report.status.value}",
+        actor=(current_user.role, current_user.id)
+    )
     db.commit()
+    response_cache.invalidate_reports()
     db.refresh(report)
+    events.publish_report(
+        "report.status_changed", report, old_status=old_status.value, new_status=report.status.value
+    )
     
     return {
         "message": "Report status updated successfully",
@@ -556,6 +1035,7 @@ async def update_report_status(
 async def assign_report(
     report_id: int,
     assignment: schemas.ReportAssignment,
+    background_tasks: BackgroundTasks,
     current_user = Depends(auth.get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -597,7 +1077,14 @@ async def assign_report(
     )
     
     db.add(status_history)
+    notifications.notify_reports(
+        db, [report_id], "report_assigned", "Report assigned: ",
+        f"Assigned to {official.full_name} ({official.zone})", actor=(current_user.role, current_user.id)
+    )
     db.commit()
+    response_cache.invalidate_reports()
+    events.publish_report("report.assigned", report, official_id=official.id, zone=official.zone)
+    background_tasks.add_task(_with_session, alerts.fan_out_zone, [report_id], official.zone)
     
     return {
         "message": "Report assigned successfully",
@@ -644,7 +1131,14 @@ async def close_report(
     )
     
     db.add(status_history)
+    notifications.notify_reports(
+        db, [report_id], "status_update", "Report closed: ", comment, actor=(current_user.role, current_user.id)
+    )
     db.commit()
+    response_cache.invalidate_reports()
+    events.publish_report(
+        "report.status_changed", report, old_status=old_status.value, new_status=models.ReportStatus.CLOSED.value
+    )
     
     return {
         "message": "Report closed successfully",
@@ -686,6 +1180,7 @@ async def delete_report(
     # Delete report (cascade will handle related records)
     db.delete(report)
     db.commit()
+    response_cache.invalidate_reports()
     
     return {"message": "Report deleted successfully", "report_id": report_id}
 
@@ -699,6 +1194,9 @@ async def get_report_history(
     report = db.query(models.Report).filter(models.Report.id == report_id).first()
     
     if not report:
+        archived_history = archive.archived_history(db, report_id)
+        if archived_history is not None:
+            return archived_history
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Report not found"
@@ -758,105 +1256,6 @@ async def get_report_statistics(
         "by_issue_type": {issue.value: count for issue, count in issue_counts}
     }
 
-@app.get("/api/reports/nearby")
-async def get_nearby_reports(
-    latitude: float = Query(..., description="User's current latitude"),
-    longitude: float = Query(..., description="User's current longitude"),
-    radius_km: float = Query(10, ge=0.1, le=100, description="Search radius in kilometers"),
-    db: Session = Depends(get_db)
-):
-    try:
-        # Haversine formula
-        def haversine(lon1, lat1, lon2, lat2):
-            lon1, lat1, lon2, lat2 = map(radians, [lon1, lat1, lon2, lat2])
-            dlon, dlat = lon2 - lon1, lat2 - lat1
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            return 6371 * 2 * asin(sqrt(a))
-        priority_map = {"low": 3, "medium": 5, "high": 7, "critical": 9}
-        all_reports = db.query(models.Report).all()
-        nearby_reports = []
-        for report in all_reports:
-            distance = haversine(longitude, latitude, report.longitude, report.latitude)
-            if distance <= radius_km:
-                first_image = None
-                if report.images and len(report.images) > 0:
-                    first_image = f"/api/reports/images/{report.images[0].filename}"
-                base_severity = priority_map.get(
-                    report.priority.value if hasattr(report.priority, 'value') else report.priority,
-                    5
-                )
-                nearby_reports.append({
-                    "id": report.id,
-                    "latitude": float(report.latitude),
-                    "longitude": float(report.longitude),
-                    "address": report.address,
-                    "issue_type": report.issue_type.value if hasattr(report.issue_type, 'value') else report.issue_type,
-                    "title": report.title,
-                    "description": report.description,
-                    "status": report.status.value if hasattr(report.status, 'value') else report.status,
-                    "priority": report.priority.value if hasattr(report.priority, 'value') else report.priority,
-                    "created_at": report.created_at.isoformat(),
-                    "upvotes": report.upvotes,
-                    "distance_km": round(distance, 2),
-                    "image_url": first_image,
-                    "base_severity": base_severity
-                })
-        def calculate_severity_with_clusters(reports_list):
-            result, processed = [], set()
-            for i, report in enumerate(reports_list):
-                if i in processed:
-                    continue
-                cluster, cluster_indices = [report], {i}
-                for j, other_report in enumerate(reports_list):
-                    if j != i and j not in processed:
-                        if haversine(report['longitude'], report['latitude'], 
-                                    other_report['longitude'], other_report['latitude']) <= 0.5:
-                            cluster.append(other_report)
-                            cluster_indices.add(j)
-                cluster_size = len(cluster)
-                cluster_bonus = 1 if cluster_size >= 5 else 0.7 if cluster_size >= 3 else 0.3 if cluster_size >= 2 else 0
-                for report_item in cluster:
-                    report_item['severity'] = round(min(10, report_item['base_severity'] + cluster_bonus), 1)
-                    report_item['cluster_count'] = cluster_size
-                    del report_item['base_severity']
-                    result.append(report_item)
-                processed.update(cluster_indices)
-            return result
-        reports_with_severity = calculate_severity_with_clusters(nearby_reports)
-        status_counts, issue_type_counts = {}, {}
-        severity_distribution = {"low": 0, "medium": 0, "high": 0, "critical": 0}
-        for report in reports_with_severity:
-            status_counts[report['status']] = status_counts.get(report['status'], 0) + 1
-            issue_type_counts[report['issue_type']] = issue_type_counts.get(report['issue_type'], 0) + 1
-            if report['severity'] >= 8:
-                severity_distribution["critical"] += 1
-            elif report['severity'] >= 6:
-                severity_distribution["high"] += 1
-            elif report['severity'] >= 4:
-                severity_distribution["medium"] += 1
-            else:
-                severity_distribution["low"] += 1
-        return {
-            "success": True,
-            "user_location": {"latitude": latitude, "longitude": longitude},
-            "radius_km": radius_km,
-            "total_reports": len(reports_with_severity),
-            "reports": reports_with_severity,
-            "statistics": {
-                "by_status": status_counts,
-                "by_issue_type": issue_type_counts,
-                "by_severity": severity_distribution
-            }
-        }
-    except Exception as e:
-        print(f"❌ Error in nearby reports: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error fetching nearby reports: {str(e)}"
-        )
-
 @app.get("/api/citizens/dashboard/stats")
 async def get_citizen_dashboard_stats(
     current_user = Depends(auth.get_current_user),
@@ -1061,27 +1460,31 @@ async def update_user_profile(
     db: Session = Depends(get_db)
 ):
     """Update user profile"""
+    # current_user may be a cached, detached copy; write through a fresh row
+    account = db.get(type(current_user), current_user.id)
+    
     # Update allowed fields
     if "full_name" in profile_data:
-        current_user.full_name = profile_data["full_name"]
+        account.full_name = profile_data["full_name"]
     
     if "phone_number" in profile_data:
-        current_user.phone_number = profile_data.get("phone_number")
+        account.phone_number = profile_data.get("phone_number")
     
     if "profile_image_url" in profile_data:
-        current_user.profile_image_url = profile_data.get("profile_image_url")
+        account.profile_image_url = profile_data.get("profile_image_url")
     
     db.commit()
-    db.refresh(current_user)
+    db.refresh(account)
+    auth.invalidate_principal(account.role.value, account.email)
     
     return {
         "message": "Profile updated successfully",
         "data": {
-            "id": current_user.id,
-            "full_name": current_user.full_name,
-            "email": current_user.email,
-            "phone_number": getattr(current_user, 'phone_number', None),
-            "profile_image_url": getattr(current_user, 'profile_image_url', None)
+            "id": account.id,
+            "full_name": account.full_name,
+            "email": account.email,
+            "phone_number": getattr(account, 'phone_number', None),
+            "profile_image_url": getattr(account, 'profile_image_url', None)
         }
     }
 
@@ -1103,29 +1506,46 @@ async def change_password(
         )
     
     # Verify current password
-    if not auth.verify_password(current_password, current_user.password_hash):
+    if not await auth.verify_password_async(current_password, current_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
     
     # Update password
-    current_user.password_hash = auth.get_password_hash(new_password)
+    account = db.get(type(current_user), current_user.id)
+    account.password_hash = await auth.hash_password_async(new_password)
+    auth.revoke_account_refresh_tokens(db, account.role, account.id)
     db.commit()
+    auth.invalidate_principal(account.role.value, account.email)
     
     return {"message": "Password changed successfully"}
 
 
+@app.get("/api/users/notification-preferences")
+async def get_notification_preferences(
+    current_user: auth.Principal = Depends(auth.get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Which notification types the current account receives"""
+    return notifications.get_preferences(db, models.UserRole(current_user.role), current_user.account_id)
+
 @app.patch("/api/users/notification-preferences")
 async def update_notification_preferences(
     preferences: Dict,
-    current_user = Depends(auth.get_current_user),
+    current_user: auth.Principal = Depends(auth.get_current_principal),
     db: Session = Depends(get_db)
 ):
-    """Update user notification preferences"""
-    # In a real app, you'd store these in a user_preferences table
-    # For now, just return success
-    return {"message": "Notification preferences updated successfully"}
+    """Update user notification preferences ({type: true/false}); muted types are not written at all"""
+    unknown = [key for key in preferences if key not in notifications.NOTIFICATION_TYPES]
+    if unknown or not all(isinstance(value, bool) for value in preferences.values()):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Preferences map {', '.join(notifications.NOTIFICATION_TYPES)} to true or false"
+        )
+    saved = notifications.set_preferences(db, models.UserRole(current_user.role), current_user.account_id, preferences)
+    db.commit()
+    return {"message": "Notification preferences updated successfully", "preferences": saved}
 
 
 PROFILE_IMAGES_DIR = "uploads/profile_images"
@@ -1236,7 +1656,7 @@ async def admin_login(login_data: dict, db: Session = Depends(get_db)):
         print(f"   🔍 Verifying password...")
         print(f"   Stored hash (first 50 chars): {admin.password_hash[:50]}...")
         
-        is_valid = auth.verify_password(password, admin.password_hash)
+        is_valid, new_hash = await auth.verify_and_update_async(password, admin.password_hash)
         print(f"   Password verification result: {is_valid}")
         
         if not is_valid:
@@ -1248,8 +1668,10 @@ async def admin_login(login_data: dict, db: Session = Depends(get_db)):
         
         print(f"   ✅ Password verified successfully")
         
-        # Update last login timestamp
+        # Update last login timestamp (and upgrade an outdated hash)
         admin.last_login = datetime.utcnow()
+        if new_hash:
+            admin.password_hash = new_hash
         db.commit()
         
         # Create access token
@@ -1398,83 +1820,20 @@ async def get_all_users(
     No authentication - simple admin access
     """
     try:
-        all_users = []
-        
-        # Get Citizens
-        citizen_query = db.query(models.User)
-        
-        if role and role != "official":
-            if role == "citizen":
-                citizen_query = citizen_query.filter(models.User.role == models.UserRole.CITIZEN)
-            elif role == "admin":
-                citizen_query = citizen_query.filter(models.User.role == models.UserRole.ADMIN)
-        
-        if status:
-            status_enum = getattr(models.AccountStatus, status.upper(), None)
-            if status_enum:
-                citizen_query = citizen_query.filter(models.User.account_status == status_enum)
-        
-        if search:
-            citizen_query = citizen_query.filter(
-                (models.User.full_name.ilike(f"%{search}%")) |
-                (models.User.email.ilike(f"%{search}%"))
-            )
-        
-        citizens = citizen_query.all()
-        
-        # Convert citizens to dict format
-        for citizen in citizens:
-            all_users.append({
-                "id": citizen.id,
-                "full_name": citizen.full_name,
-                "email": citizen.email,
-                "role": citizen.role.value if hasattr(citizen.role, 'value') else citizen.role,
-                "account_status": citizen.account_status.value if hasattr(citizen.account_status, 'value') else citizen.account_status,
-                "is_active": citizen.is_active if hasattr(citizen, 'is_active') else True,
-                "phone_number": getattr(citizen, 'phone_number', None),
-                "created_at": str(citizen.created_at),
-                "user_type": "user"
-            })
-        
-        # Get Officials
-        if not role or role == "official":
-            official_query = db.query(models.Official)
-            
-            if status:
-                status_enum = getattr(models.AccountStatus, status.upper(), None)
-                if status_enum:
-                    official_query = official_query.filter(models.Official.account_status == status_enum)
-            
-            if search:
-                official_query = official_query.filter(
-                    (models.Official.full_name.ilike(f"%{search}%")) |
-                    (models.Official.email.ilike(f"%{search}%"))
-                )
-            
-            officials = official_query.all()
-            
-            # Convert officials to dict format
-            for official in officials:
-                all_users.append({
-                    "id": official.id,
-                    "full_name": official.full_name,
-                    "email": official.email,
-                    "role": "official",
-                    "account_status": official.account_status.value if hasattr(official.account_status, 'value') else official.account_status,
-                    "is_active": official.is_active if hasattr(official, 'is_active') else True,
-                    "phone_number": getattr(official, 'phone_number', None),
-                    "department": getattr(official, 'department', None),
-                    "designation": getattr(official, 'designation', None),
-                    "created_at": str(official.created_at),
-                    "user_type": "official"
-                })
-        
-        # Apply pagination
-        total = len(all_users)
-        paginated_users = all_users[offset:offset + limit]
+        status_enum = getattr(models.AccountStatus, status.upper(), None) if status else None
+        
+        # Citizens and officials are searched, ranked and paginated in one query
+        users, total = text_search.search_user_directory(
+            db,
+            role=role,
+            account_status=status_enum,
+            search=search,
+            limit=limit,
+            offset=offset
+        )
         
         return {
-            "users": paginated_users,
+            "users": users,
             "total": total
         }
         
@@ -1631,6 +1990,7 @@ async def update_user_status(
         
         db.commit()
         db.refresh(user)
+        auth.invalidate_principal(user.role.value, user.email)
         
         print(f"✅ Updated user {user_id}: status={new_status}, is_active={getattr(user, 'is_active', 'N/A')}")
         
@@ -1704,6 +2064,7 @@ async def verify_official(
             )
         
         db.commit()
+        auth.invalidate_principal(official.role.value, official.email)
         
         return {
             "success": True,
@@ -1758,14 +2119,10 @@ async def get_all_reports(
                 query = query.filter(models.Report.issue_type == issue_enum)
         
         if search:
-            query = query.filter(
-                (models.Report.title.ilike(f"%{search}%")) |
-                (models.Report.description.ilike(f"%{search}%")) |
-                (models.Report.address.ilike(f"%{search}%"))
-            )
+            query = text_search.filter_reports(query, search)
         
         total = query.count()
-        reports = query.order_by(models.Report.created_at.desc()).offset(offset).limit(limit).all()
+        reports = query.order_by(*text_search.report_ordering(search)).offset(offset).limit(limit).all()
         
         # Convert to dict format with user info
         reports_list = []
@@ -1800,9 +2157,9 @@ async def get_all_reports(
                 "id": report.id,
                 "title": report.title,
                 "description": report.description,
-                "issue_type": report.issue_type.value if hasattr(report.issue_type, 'value') else report.issue_type,
-                "status": report.status.value if hasattr(report.status, 'value') else report.status,
-                "priority": report.priority.value if hasattr(report.priority, 'value') else report.priority,
+                "issue_type": models.ISSUE_TYPE_VALUES.get(report.issue_type),
+                "status": models.REPORT_STATUS_VALUES.get(report.status),
+                "priority": models.REPORT_PRIORITY_VALUES.get(report.priority),
                 "address": report.address,
                 "latitude": float(report.latitude) if report.latitude else None,
                 "longitude": float(report.longitude) if report.longitude else None,
@@ -1827,10 +2184,10 @@ async def get_all_reports(
                 "comments_count": comments_count
             })
         
-        return {
+        return serialization.FastJSONResponse({
             "reports": reports_list,
             "total": total
-        }
+        })
         
     except Exception as e:
         print(f"❌ Error fetching reports: {str(e)}")
@@ -1839,6 +2196,125 @@ async def get_all_reports(
         return {"reports": [], "total": 0}
 
 
+def export_reports_statement(status: Optional[str], priority: Optional[str], issue_type: Optional[str]):
+    citizen = aliased(models.User)
+    official = aliased(models.Official)
+    query = (
+        select(
+            models.Report.id, models.Report.title, models.Report.description,
+            models.Report.issue_type, models.Report.status, models.Report.priority,
+            models.Report.address, models.Report.latitude, models.Report.longitude,
+            models.Report.is_anonymous, models.Report.upvotes, models.Report.views,
+            models.Report.created_at, models.Report.updated_at, models.Report.resolved_at,
+            models.Report.assigned_zone,
+            citizen.id.label("user_id"), citizen.full_name.label("user_full_name"), citizen.email.label("user_email"),
+            official.id.label("official_id"), official.full_name.label("official_full_name"),
+            official.department.label("official_department"),
+        )
+        .outerjoin(citizen, citizen.id == models.Report.user_id)
+        .outerjoin(official, official.id == models.Report.assigned_to)
+    )
+    for value, enum_type, column in (
+        (status, models.ReportStatus, models.Report.status),
+        (priority, models.ReportPriority, models.Report.priority),
+        (issue_type, models.IssueType, models.Report.issue_type),
+    ):
+        enum_value = getattr(enum_type, value.upper(), None) if value else None
+        if enum_value:
+            query = query.where(column == enum_value)
+    # id order keeps the export stable while new reports keep arriving
+    return query.order_by(models.Report.id)
+
+def serialize_export_report(row) -> dict:
+    anonymous = row.is_anonymous or row.user_id is None
+    return {
+        "id": row.id,
+        "title": row.title,
+        "description": row.description,
+        "issue_type": models.ISSUE_TYPE_VALUES[row.issue_type],
+        "status": models.REPORT_STATUS_VALUES[row.status],
+        "priority": models.REPORT_PRIORITY_VALUES.get(row.priority),
+        "address": row.address,
+        "latitude": row.latitude,
+        "longitude": row.longitude,
+        "is_anonymous": row.is_anonymous,
+        "upvotes": row.upvotes,
+        "views": row.views,
+        "created_at": str(row.created_at),
+        "updated_at": str(row.updated_at) if row.updated_at else None,
+        "resolved_at": str(row.resolved_at) if row.resolved_at else None,
+        "user": {"id": None, "full_name": "Anonymous", "email": "N/A"} if anonymous else {
+            "id": row.user_id,
+            "full_name": row.user_full_name,
+            "email": row.user_email
+        },
+        "assigned_official": {
+            "id": row.official_id,
+            "full_name": row.official_full_name,
+            "department": row.official_department
+        } if row.official_id else None,
+        "assigned_zone": row.assigned_zone
+    }
+
+@app.get("/api/admin/reports/export")
+def export_reports(
+    format: str = Query("ndjson", pattern="^(json|ndjson)$"),
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    issue_type: Optional[str] = None
+):
+    """
+    Export every matching report as a streamed JSON array or NDJSON file
+    No authentication - simple admin access
+    """
+    return streaming.stream_query(
+        export_reports_statement(status, priority, issue_type),
+        serialize_export_report,
+        format,
+        filename=f"reports-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    )
+
+@app.post("/api/admin/reports/import")
+def import_reports(
+    file: UploadFile = File(...),
+    user_id: int = Form(...),
+    format: Optional[str] = Form(None),
+    batch_size: int = Form(bulk_import.DEFAULT_BATCH_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import reports from an NDJSON or CSV upload.
+    Rows without a user_id are attributed to the given user_id.
+    """
+    try:
+        fmt = bulk_import.detect_format(file.filename, format)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        result = bulk_import.import_reports(db, stream, fmt, user_id, batch_size)
+        if result["imported"]:
+            response_cache.invalidate_reports()
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import file must be UTF-8 encoded"
+        )
+    finally:
+        stream.detach()
+
+    print(f"✅ Bulk import: {result['imported']} imported, {result['failed']} failed")
+
+    return {
+        "success": True,
+        **result
+    }
+
+
 @app.get("/api/admin/reports/{report_id}")
 async def get_report_details(
     report_id: int,
@@ -2012,9 +2488,14 @@ async def update_report_status(
                     comment=comment
                 )
                 db.add(status_history)
+                notifications.notify_reports(db, [report_id], "status_update", "Status updated: ", f"Now {status_enum.value}")
                 
                 db.commit()
+                response_cache.invalidate_reports()
                 db.refresh(report)
+                events.publish_report(
+                    "report.status_changed", report, old_status=old_status.value, new_status=status_enum.value
+                )
                 
                 print(f"✅ Updated report {report_id} status from {old_status} to {new_status}")
                 
@@ -2066,6 +2547,7 @@ async def delete_report(
         # Delete the report (cascade will delete images, comments, status_history)
         db.delete(report)
         db.commit()
+        response_cache.invalidate_reports()
         
         print(f"✅ Deleted report {report_id}")
         
@@ -2118,6 +2600,7 @@ async def update_report_priority(
                 report.updated_at = datetime.utcnow()
                 
                 db.commit()
+                response_cache.invalidate_reports()
                 db.refresh(report)
                 
                 return {
@@ -2140,143 +2623,44 @@ async def update_report_priority(
             detail="Failed to update report priority"
         )
 
-# ==================== PUBLIC ENDPOINTS (NO AUTH REQUIRED) ====================
-
-@app.get("/api/reports/map")
-async def get_public_map_reports(
-    status: Optional[str] = Query(None),
-    limit: int = Query(1000, le=5000),
-    db: Session = Depends(get_db)
-):
-    """
-    PUBLIC ENDPOINT - Get reports for map visualization
-    No authentication required
-    """
-    try:
-        print(f"📍 Public map request - status: {status}, limit: {limit}")
-        
-        # Build query
-        query = db.query(models.Report)
-        
-        # Filter by status if provided
-        if status and status.upper() != 'ALL':
-            try:
-                status_enum = models.ReportStatus(status.upper())
-                query = query.filter(models.Report.status == status_enum)
-            except ValueError:
-                print(f"⚠️ Invalid status: {status}")
-        
-        # Get reports
-        reports = query.order_by(models.Report.created_at.desc()).limit(limit).all()
-        
-        print(f"✅ Found {len(reports)} reports for map")
-        
-        # Format response
-        result = []
-        for report in reports:
-            try:
-                report_data = {
-                    "id": report.id,
-                    "title": report.title,
-                    "description": report.description,
-                    "latitude": float(report.latitude) if report.latitude else None,
-                    "longitude": float(report.longitude) if report.longitude else None,
-                    "address": report.address,
-                    "created_at": report.created_at.isoformat() if report.created_at else None,
-                }
-                
-                # Add status safely
-                if hasattr(report.status, 'value'):
-                    report_data["status"] = report.status.value
-                else:
-                    report_data["status"] = str(report.status)
-                
-                # Add priority safely
-                if hasattr(report, 'priority'):
-                    if hasattr(report.priority, 'value'):
-                        report_data["priority"] = report.priority.value
-                    else:
-                        report_data["priority"] = str(report.priority) if report.priority else "MEDIUM"
-                else:
-                    report_data["priority"] = "MEDIUM"
-                
-                # Add issue_type safely
-                if hasattr(report.issue_type, 'value'):
-                    report_data["issue_type"] = report.issue_type.value
-                else:
-                    report_data["issue_type"] = str(report.issue_type)
-                
-                result.append(report_data)
-            except Exception as e:
-                print(f"⚠️ Error formatting report {report.id}: {str(e)}")
-                continue
-        
-        return result
-        
-    except Exception as e:
-        print(f"❌ Error in public map endpoint: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch map data: {str(e)}"
-        )
-
 # ===== OFFICIAL DASHBOARD ENDPOINTS =====
 
 @app.get("/api/official/dashboard/stats")
 async def get_official_dashboard_stats(
-    current_user: dict = Depends(get_current_user),
+    current_user: auth.Principal = Depends(auth.get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get dashboard statistics for officials"""
     try:
-        if current_user["role"] != "official":
+        if not current_user.is_official:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. Officials only."
             )
         
-        print(f"🔍 Looking for official with email: {current_user['sub']}")
-        
-        # Get official by email from JWT token
-        official = db.query(models.Official).filter(
-            models.Official.email == current_user["sub"]
-        ).first()
-        
-        if not official:
-            print(f"❌ No official found with email: {current_user['sub']}")
-            print(f"   Current user data: {current_user}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Official profile not found. Please contact administrator."
-            )
-        
-        print(f"✅ Official found: ID={official.id}, Email={official.email}")
-        
         # Get report statistics using DOT NOTATION (not bracket notation)
         total_assigned = db.query(models.Report).filter(
-            models.Report.assigned_to == official.id
+            models.Report.assigned_to == current_user.official_id
         ).count()
         
         pending = db.query(models.Report).filter(
-            models.Report.assigned_to == official.id,
+            models.Report.assigned_to == current_user.official_id,
             models.Report.status == models.ReportStatus.PENDING
         ).count()
         
         in_progress = db.query(models.Report).filter(
-            models.Report.assigned_to == official.id,
+            models.Report.assigned_to == current_user.official_id,
             models.Report.status == models.ReportStatus.IN_PROGRESS
         ).count()
         
         resolved = db.query(models.Report).filter(
-            models.Report.assigned_to == official.id,
+            models.Report.assigned_to == current_user.official_id,
             models.Report.status == models.ReportStatus.RESOLVED
         ).count()
         
         # Get zone-based statistics using DOT NOTATION
         zone_reports = db.query(models.Report).filter(
-            models.Report.assigned_zone == official.zone
+            models.Report.assigned_zone == current_user.zone
         ).count()
         
         stats = {
@@ -2311,31 +2695,20 @@ async def get_assigned_reports(
     search: Optional[str] = None,
     skip: int = 0,
     limit: int = 50,
-    current_user: dict = Depends(get_current_user),
+    current_user: auth.Principal = Depends(auth.get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get reports assigned to the current official"""
     try:
-        if current_user["role"] != "official":
+        if not current_user.is_official:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. Officials only."
             )
         
-        # Get official by email
-        official = db.query(models.Official).filter(
-            models.Official.email == current_user["sub"]
-        ).first()
-        
-        if not official:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Official profile not found"
-            )
-        
         # Base query - using DOT NOTATION
         query = db.query(models.Report).filter(
-            models.Report.assigned_to == official.id
+            models.Report.assigned_to == current_user.official_id
         )
         
         # Apply filters
@@ -2351,18 +2724,14 @@ async def get_assigned_reports(
                 query = query.filter(models.Report.priority == priority_enum)
         
         if search:
-            query = query.filter(
-                (models.Report.title.ilike(f"%{search}%")) |
-                (models.Report.description.ilike(f"%{search}%")) |
-                (models.Report.address.ilike(f"%{search}%"))
-            )
-        
-        # Order by created_at descending
-        query = query.order_by(models.Report.created_at.desc())
+            query = text_search.filter_reports(query, search)
         
         # Get total count
         total = query.count()
         
+        # Best matches first when searching, otherwise newest first
+        query = query.order_by(*text_search.report_ordering(search))
+        
         # Apply pagination
         reports = query.offset(skip).limit(limit).all()
         
@@ -2377,12 +2746,12 @@ async def get_assigned_reports(
                 "id": report.id,
                 "title": report.title,
                 "description": report.description,
-                "status": report.status.value,
-                "priority": report.priority.value,
+                "status": models.REPORT_STATUS_VALUES[report.status],
+                "priority": models.REPORT_PRIORITY_VALUES.get(report.priority),
                 "address": report.address,
                 "latitude": report.latitude,
                 "longitude": report.longitude,
-                "issue_type": report.issue_type.value,
+                "issue_type": models.ISSUE_TYPE_VALUES[report.issue_type],
                 "created_at": report.created_at.isoformat(),
                 "updated_at": report.updated_at.isoformat() if report.updated_at else None,
                 "citizen_name": citizen.full_name if citizen else "Unknown",
@@ -2391,12 +2760,12 @@ async def get_assigned_reports(
                 "views": report.views
             })
         
-        return {
+        return serialization.FastJSONResponse({
             "reports": reports_data,
             "total": total,
             "skip": skip,
             "limit": limit
-        }
+        })
         
     except HTTPException:
         raise
@@ -2412,21 +2781,17 @@ async def get_assigned_reports(
 @app.get("/api/official/reports/{report_id}")
 async def get_report_detail(
     report_id: int,
-    current_user: dict = Depends(get_current_user),
+    current_user: auth.Principal = Depends(auth.get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get detailed information about a specific report"""
     try:
-        if current_user["role"] != "official":
+        if not current_user.is_official:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. Officials only."
             )
         
-        official = db.query(models.Official).filter(
-            models.Official.user_id == current_user["id"]
-        ).first()
-        
         report = db.query(models.Report).filter(
             models.Report.id == report_id
         ).first()
@@ -2438,15 +2803,13 @@ async def get_report_detail(
             )
         
         # Verify the report is assigned to this official
-        if report.assigned_to != official.id:
+        if report.assigned_to != current_user.official_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have access to this report"
             )
         
-        # Increment view count
-        report.views += 1
-        db.commit()
+        counters.views.record(report.id, (models.UserRole.OFFICIAL, current_user.official_id))
         
         # Get citizen information
         citizen = db.query(models.User).filter(
@@ -2527,21 +2890,17 @@ async def get_report_detail(
 async def update_report_status(
     report_id: int,
     status_data: dict,
-    current_user: dict = Depends(get_current_user),
+    current_user: auth.Principal = Depends(auth.get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Update the status of a report"""
     try:
-        if current_user["role"] != "official":
+        if not current_user.is_official:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. Officials only."
             )
         
-        official = db.query(models.Official).filter(
-            models.Official.user_id == current_user["id"]
-        ).first()
-        
         report = db.query(models.Report).filter(
             models.Report.id == report_id
         ).first()
@@ -2552,7 +2911,7 @@ async def update_report_status(
                 detail="Report not found"
             )
         
-        if report.assigned_to != official.id:
+        if report.assigned_to != current_user.official_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have access to this report"
@@ -2575,7 +2934,7 @@ async def update_report_status(
             report_id=report_id,
             old_status=report.status,
             new_status=new_status_enum,
-            changed_by=official.id,
+            changed_by=current_user.official_id,
             changed_by_role=models.UserRole.OFFICIAL,
             comment=comment
         )
@@ -2591,7 +2950,15 @@ async def update_report_status(
         elif new_status_enum == models.ReportStatus.CLOSED and not report.closed_at:
             report.closed_at = datetime.utcnow()
         
+        notifications.notify_reports(
+            db, [report_id], "status_update", "Status updated: ", f"Now {new_status_enum.value}",
+            actor=(models.UserRole.OFFICIAL, current_user.official_id)
+        )
         db.commit()
+        response_cache.invalidate_reports()
+        events.publish_report(
+            "report.status_changed", report, old_status=old_status.value, new_status=new_status_enum.value
+        )
         
         return {
             "message": "Status updated successfully",
@@ -2613,21 +2980,17 @@ async def update_report_status(
 async def add_report_comment(
     report_id: int,
     comment_data: dict,
-    current_user: dict = Depends(get_current_user),
+    current_user: auth.Principal = Depends(auth.get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Add a comment to a report"""
     try:
-        if current_user["role"] != "official":
+        if not current_user.is_official:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. Officials only."
             )
         
-        official = db.query(models.Official).filter(
-            models.Official.user_id == current_user["id"]
-        ).first()
-        
         report = db.query(models.Report).filter(
             models.Report.id == report_id
         ).first()
@@ -2638,7 +3001,7 @@ async def add_report_comment(
                 detail="Report not found"
             )
         
-        if report.assigned_to != official.id:
+        if report.assigned_to != current_user.official_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="You don't have access to this report"
@@ -2646,15 +3009,22 @@ async def add_report_comment(
         
         comment = models.ReportComment(
             report_id=report_id,
-            user_id=official.id,
+            user_id=current_user.official_id,
             user_role=models.UserRole.OFFICIAL,
             comment=comment_data.get("comment"),
             is_internal=comment_data.get("is_internal", False)
         )
         
         db.add(comment)
+        db.flush()
+        notifications.notify_reports(
+            db, [report_id], "comment", "New comment: ", comment.comment,
+            citizen=not comment.is_internal, actor=(models.UserRole.OFFICIAL, current_user.official_id)
+        )
         db.commit()
         db.refresh(comment)
+        # Internal notes stay between officials and admins
+        events.publish_report("report.comment", report, citizen=not comment.is_internal, comment_id=comment.id)
         
         return {
             "message": "Comment added successfully",
@@ -2680,21 +3050,18 @@ async def add_report_comment(
 
 @app.get("/api/official/profile")
 async def get_official_profile(
-    current_user: dict = Depends(get_current_user),
+    current_user: auth.Principal = Depends(auth.get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get official profile information"""
     try:
-        if current_user["role"] != "official":
+        if not current_user.is_official:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. Officials only."
             )
         
-        # Get official by email from JWT
-        official = db.query(models.Official).filter(
-            models.Official.email == current_user["sub"]
-        ).first()
+        official = db.get(models.Official, current_user.official_id)
         
         if not official:
             raise HTTPException(
@@ -2731,34 +3098,23 @@ async def get_official_profile(
 
 @app.get("/api/official/analytics")
 async def get_official_analytics(
-    current_user: dict = Depends(get_current_user),
+    current_user: auth.Principal = Depends(auth.get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get analytics data for officials"""
     try:
-        if current_user["role"] != "official":
+        if not current_user.is_official:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied. Officials only."
             )
         
-        # Get official by email
-        official = db.query(models.Official).filter(
-            models.Official.email == current_user["sub"]
-        ).first()
-        
-        if not official:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Official profile not found"
-            )
-        
         # Get reports by status - using DOT NOTATION
         reports_by_status = db.query(
             models.Report.status,
             func.count(models.Report.id)
         ).filter(
-            models.Report.assigned_to == official.id
+            models.Report.assigned_to == current_user.official_id
         ).group_by(models.Report.status).all()
         
         # Get reports by priority
@@ -2766,7 +3122,7 @@ async def get_official_analytics(
             models.Report.priority,
             func.count(models.Report.id)
         ).filter(
-            models.Report.assigned_to == official.id
+            models.Report.assigned_to == current_user.official_id
         ).group_by(models.Report.priority).all()
         
         # Get reports by issue type
@@ -2774,12 +3130,12 @@ async def get_official_analytics(
             models.Report.issue_type,
             func.count(models.Report.id)
         ).filter(
-            models.Report.assigned_to == official.id
+            models.Report.assigned_to == current_user.official_id
         ).group_by(models.Report.issue_type).all()
         
         # Calculate average resolution time
         resolved_reports = db.query(models.Report).filter(
-            models.Report.assigned_to == official.id,
+            models.Report.assigned_to == current_user.official_id,
             models.Report.status == models.ReportStatus.RESOLVED,
             models.Report.resolved_at.isnot(None)
         ).all()
@@ -2819,53 +3175,181 @@ async def get_official_analytics(
 
 @app.get("/api/official/notifications")
 async def get_official_notifications(
-    skip: int = 0,
-    limit: int = 20,
-    current_user: dict = Depends(get_current_user),
+    cursor: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: auth.Principal = Depends(auth.get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Get notifications for officials"""
-    try:
-        if current_user["role"] != "official":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied. Officials only."
-            )
-        
-        official = db.query(models.Official).filter(
-            models.Official.user_id == current_user["id"]
-        ).first()
-        
-        # Get recent reports assigned
-        recent_assignments = db.query(models.Report).filter(
-            models.Report.assigned_to == official.id
-        ).order_by(models.Report.created_at.desc()).limit(limit).all()
-        
-        notifications = []
-        for report in recent_assignments:
-            notifications.append({
-                "id": report.id,
-                "type": "new_assignment",
-                "title": f"New report assigned: {report.title}",
-                "description": f"Priority: {report.priority.value}",
-                "created_at": report.created_at.isoformat(),
-                "read": False
-            })
-        
-        return {
-            "notifications": notifications,
-            "total": len(notifications),
-            "unread": len(notifications)
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error fetching notifications: {str(e)}")
+    if not current_user.is_official:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied. Officials only."
+        )
+    return list_notifications(current_user, db, cursor, limit)
+
+# ==================== NOTIFICATIONS ====================
+
+def list_notifications(principal: auth.Principal, db: Session, cursor: Optional[int], limit: int,
+                       unread_only: bool = False) -> dict:
+    role = models.UserRole(principal.role)
+    rows, next_cursor = notifications.list_notifications(
+        db, role, principal.account_id, cursor, limit, unread_only
+    )
+    return {
+        "notifications": [notifications.serialize(row) for row in rows],
+        "next_cursor": next_cursor,
+        "unread": notifications.unread_count(db, role, principal.account_id)
+    }
+
+@app.get("/api/notifications")
+async def get_notifications(
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    unread_only: bool = False,
+    current_user: auth.Principal = Depends(auth.get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """The current account's notifications, newest first"""
+    return list_notifications(current_user, db, cursor, limit, unread_only)
+
+@app.get("/api/notifications/unread-count")
+async def get_unread_notification_count(
+    current_user: auth.Principal = Depends(auth.get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Read from the per-account counter; no scan of the notifications table"""
+    return {"unread": notifications.unread_count(db, models.UserRole(current_user.role), current_user.account_id)}
+
+@app.post("/api/notifications/mark-read")
+async def mark_notifications_read(
+    request: schemas.MarkNotificationsRead,
+    current_user: auth.Principal = Depends(auth.get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Mark the listed notifications, or all of them with {"all": true}, as read"""
+    if not request.all and request.ids is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide ids or set all to true"
         )
+    role = models.UserRole(current_user.role)
+    marked = notifications.mark_read(db, role, current_user.account_id, None if request.all else request.ids)
+    db.commit()
+    return {"marked": marked, "unread": notifications.unread_count(db, role, current_user.account_id)}
+
+@app.get("/api/alerts/subscriptions")
+async def get_alert_subscriptions(
+    current_user: auth.Principal = Depends(auth.get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Areas the current account gets new-report alerts for"""
+    subscriptions = db.query(models.AlertSubscription).filter(
+        models.AlertSubscription.account_role == models.UserRole(current_user.role),
+        models.AlertSubscription.account_id == current_user.account_id
+    ).order_by(models.AlertSubscription.id).all()
+    return [alerts.serialize(subscription) for subscription in subscriptions]
+
+@app.post("/api/alerts/subscriptions", status_code=status.HTTP_201_CREATED)
+async def create_alert_subscription(
+    subscription: schemas.AlertSubscriptionCreate,
+    current_user: auth.Principal = Depends(auth.get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Get a notification whenever a report is filed inside a circle, or routed to a zone"""
+    role = models.UserRole(current_user.role)
+    if subscription.radius_km is not None and subscription.radius_km > alerts.ALERT_MAX_RADIUS_KM:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"radius_km can be at most {alerts.ALERT_MAX_RADIUS_KM:g}"
+        )
+    if alerts.subscription_count(db, role, current_user.account_id) >= alerts.ALERT_MAX_SUBSCRIPTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {alerts.ALERT_MAX_SUBSCRIPTIONS} alert areas per account"
+        )
+    created = alerts.subscribe(
+        db, role, current_user.account_id, subscription.latitude, subscription.longitude,
+        subscription.radius_km, subscription.zone
+    )
+    db.commit()
+    db.refresh(created)
+    return alerts.serialize(created)
+
+@app.delete("/api/alerts/subscriptions/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_alert_subscription(
+    subscription_id: int,
+    current_user: auth.Principal = Depends(auth.get_current_principal),
+    db: Session = Depends(get_db)
+):
+    subscription = db.get(models.AlertSubscription, subscription_id)
+    if (subscription is None or subscription.account_role != models.UserRole(current_user.role)
+            or subscription.account_id != current_user.account_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert subscription not found"
+        )
+    db.delete(subscription)
+    db.commit()
+
+# ==================== REAL-TIME EVENTS ====================
+# Browsers can't set headers on EventSource or WebSocket, so these take the
+# access token in the query string.
+
+@app.get("/api/events/stream")
+async def stream_events(token: str = Query(...)):
+    """
+    Server-sent events for changes to reports the caller can see: status
+    changes, assignments and comments. Clients refetch what the event names.
+    """
+    principal = await auth.principal_from_token(token)
+    subscription = events.hub.subscribe(events.topics_for(principal))
+
+    async def body():
+        try:
+            yield b"retry: 5000\n\n"
+            while True:
+                yield events.format_sse(await subscription.next(events.KEEPALIVE_SECONDS))
+        finally:
+            events.hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.websocket("/api/events/ws")
+async def events_websocket(websocket: WebSocket, token: str = Query(...)):
+    """The same events as /api/events/stream, one JSON message each"""
+    try:
+        principal = await auth.principal_from_token(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    subscription = events.hub.subscribe(events.topics_for(principal))
+
+    async def forward():
+        while True:
+            event = await subscription.next()
+            await websocket.send_text(serialization.dumps(event).decode())
+
+    async def drain():
+        # Nothing is expected from the client; reading is how we notice it left
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.ensure_future(forward()), asyncio.ensure_future(drain())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not isinstance(task.exception(), WebSocketDisconnect):
+                print(f"⚠️ Event socket closed: {str(task.exception())}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        events.hub.unsubscribe(subscription)
 
 if __name__ == "__main__":
     import uvicorn
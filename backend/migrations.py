@@ -0,0 +1,144 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+import geo
+import indexes
+import models
+import partitioning
+
+# Base.metadata.create_all only creates missing tables, so changes to existing
+# tables are applied here. Every statement must be idempotent: they run on
+# every startup.
+MIGRATIONS = [
+    (
+        "reports.search_vector",
+        "ALTER TABLE reports ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({models.REPORT_SEARCH_DOCUMENT}) STORED",
+    ),
+    (
+        "ix_reports_search_vector",
+        "CREATE INDEX IF NOT EXISTS ix_reports_search_vector ON reports USING gin (search_vector)",
+    ),
+    ("pg_trgm", "CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+    (
+        "ix_users_full_name_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_users_full_name_trgm ON users USING gin (full_name gin_trgm_ops)",
+    ),
+    (
+        "ix_users_email_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_users_email_trgm ON users USING gin (email gin_trgm_ops)",
+    ),
+    (
+        "ix_officials_full_name_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_officials_full_name_trgm ON officials USING gin (full_name gin_trgm_ops)",
+    ),
+    (
+        "ix_officials_email_trgm",
+        "CREATE INDEX IF NOT EXISTS ix_officials_email_trgm ON officials USING gin (email gin_trgm_ops)",
+    ),
+    (
+        "ix_users_email_lower",
+        "CREATE INDEX IF NOT EXISTS ix_users_email_lower ON users (lower(email))",
+    ),
+    (
+        "ix_officials_email_lower",
+        "CREATE INDEX IF NOT EXISTS ix_officials_email_lower ON officials (lower(email))",
+    ),
+    (
+        "ix_reports_lat_lon",
+        "CREATE INDEX IF NOT EXISTS ix_reports_lat_lon ON reports (latitude, longitude)",
+    ),
+    (
+        "reports.duplicate_of",
+        "ALTER TABLE reports ADD COLUMN IF NOT EXISTS duplicate_of INTEGER "
+        "REFERENCES reports(id) ON DELETE SET NULL",
+    ),
+    (
+        "ix_reports_duplicate_of",
+        "CREATE INDEX IF NOT EXISTS ix_reports_duplicate_of ON reports (duplicate_of)",
+    ),
+    ("report_images.phash", "ALTER TABLE report_images ADD COLUMN IF NOT EXISTS phash BIGINT"),
+    (
+        "report_images.duplicate_of",
+        "ALTER TABLE report_images ADD COLUMN IF NOT EXISTS duplicate_of INTEGER "
+        "REFERENCES report_images(id) ON DELETE SET NULL",
+    ),
+    (
+        "ix_report_images_duplicate_of",
+        "CREATE INDEX IF NOT EXISTS ix_report_images_duplicate_of ON report_images (duplicate_of)",
+    ),
+]
+
+# Applied only when the postgis extension can be created. reports.location is
+# kept in step with latitude/longitude by a trigger, so the ORM never writes it.
+POSTGIS_MIGRATIONS = [
+    (
+        "reports.location",
+        "ALTER TABLE reports ADD COLUMN IF NOT EXISTS location geography(Point, 4326)",
+    ),
+    (
+        "reports_set_location()",
+        """
+        CREATE OR REPLACE FUNCTION reports_set_location() RETURNS trigger AS $$
+        BEGIN
+            NEW.location := CASE
+                WHEN NEW.latitude IS NULL OR NEW.longitude IS NULL THEN NULL
+                ELSE ST_SetSRID(ST_MakePoint(NEW.longitude, NEW.latitude), 4326)::geography
+            END;
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+    ),
+    (
+        "trg_reports_location",
+        """
+        DO $$ BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_reports_location') THEN
+                CREATE TRIGGER trg_reports_location
+                    BEFORE INSERT OR UPDATE OF latitude, longitude ON reports
+                    FOR EACH ROW EXECUTE FUNCTION reports_set_location();
+            END IF;
+        END $$
+        """,
+    ),
+    (
+        "ix_reports_location",
+        "CREATE INDEX IF NOT EXISTS ix_reports_location ON reports USING gist (location)",
+    ),
+    (
+        "reports.location backfill",
+        "UPDATE reports SET location = ST_SetSRID(ST_MakePoint(longitude, latitude), 4326)::geography "
+        "WHERE location IS NULL AND latitude IS NOT NULL AND longitude IS NOT NULL",
+    ),
+]
+
+
+def _apply(engine: Engine, name: str, statement: str, quiet: bool = False) -> bool:
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(statement))
+        return True
+    except Exception as e:
+        if not quiet:
+            print(f"⚠️ Migration {name} failed: {str(e)}")
+        return False
+
+
+def run_migrations(engine: Engine) -> None:
+    for name, statement in MIGRATIONS:
+        _apply(engine, name, statement)
+    # PostGIS is optional: without it nearby/map queries use the lat/lon index
+    if geo.postgis_wanted() and _apply(engine, "postgis", "CREATE EXTENSION IF NOT EXISTS postgis", quiet=True):
+        for name, statement in POSTGIS_MIGRATIONS:
+            _apply(engine, name, statement)
+    geo.detect(engine)
+    # New zones and months get their partitions when reports is partitioned
+    partitioning.maintain(engine)
+    indexes.ensure_indexes(engine)
+
+
+if __name__ == "__main__":
+    from database import engine
+    run_migrations(engine)
+    print("✅ Migrations applied")
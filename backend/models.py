@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum, Boolean, Float, Text, ForeignKey
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, DateTime, Enum as SQLEnum, Boolean, Float, Text, ForeignKey, UniqueConstraint, Computed, Index, JSON
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.sql import func, text
 from database import Base
 import enum
 
@@ -17,6 +18,10 @@ class UserRole(str, enum.Enum):
     
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Logins match on the normalized address
+        Index("ix_users_email_lower", text("lower(email)")),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     full_name = Column(String(255), nullable=False)
@@ -32,6 +37,9 @@ class User(Base):
 
 class Official(Base):
     __tablename__ = "officials"
+    __table_args__ = (
+        Index("ix_officials_email_lower", text("lower(email)")),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, nullable=False, unique=True)  # Reference to users table
@@ -75,19 +83,47 @@ class IssueType(str, enum.Enum):
     DRAINAGE = "drainage"
     OTHER = "other"
 
+# Wire value for each member, computed once instead of per row. Members hash
+# and compare like their values, so plain strings resolve through these too.
+REPORT_STATUS_VALUES = {member: member.value for member in ReportStatus}
+REPORT_PRIORITY_VALUES = {member: member.value for member in ReportPriority}
+ISSUE_TYPE_VALUES = {member: member.value for member in IssueType}
+
+# Weighted search document: title ranks above description, description above address
+REPORT_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(address, '')), 'C')"
+)
+
 # Report Model
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        Index("ix_reports_search_vector", "search_vector", postgresql_using="gin"),
+        # Bounding-box prefilter for nearby/map queries when PostGIS is not installed
+        Index("ix_reports_lat_lon", "latitude", "longitude"),
+        # Hot query shapes; built on existing databases by indexes.py
+        Index("ix_reports_assigned_status_created", "assigned_to", "status", "created_at"),
+        Index("ix_reports_zone_created", "assigned_zone", "created_at"),
+        Index("ix_reports_user_created", "user_id", "created_at"),
+        Index("ix_reports_status_created", "status", "created_at"),
+        # Duplicate candidates: only open originals, a small slice of the table
+        Index(
+            "ix_reports_open_dedup", "issue_type", "latitude", "longitude",
+            postgresql_where=text("status IN ('PENDING', 'UNDER_REVIEW', 'IN_PROGRESS') AND duplicate_of IS NULL"),
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
     address = Column(Text, nullable=False)
     issue_type = Column(SQLEnum(IssueType), nullable=False, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
-    status = Column(SQLEnum(ReportStatus), nullable=False, default=ReportStatus.PENDING, index=True)
+    status = Column(SQLEnum(ReportStatus), nullable=False, default=ReportStatus.PENDING)
     priority = Column(SQLEnum(ReportPriority), default=ReportPriority.MEDIUM)
     assigned_to = Column(Integer, ForeignKey("officials.id"), nullable=True)
     assigned_zone = Column(String(255), nullable=True)
@@ -98,6 +134,10 @@ class Report(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     resolved_at = Column(DateTime(timezone=True), nullable=True)
     closed_at = Column(DateTime(timezone=True), nullable=True)
+    # The original report when this one was filed as a duplicate of it
+    duplicate_of = Column(Integer, ForeignKey("reports.id", ondelete="SET NULL"), nullable=True, index=True)
+    # Generated by PostgreSQL from title/description/address; never loaded unless asked for
+    search_vector = deferred(Column(TSVECTOR, Computed(REPORT_SEARCH_DOCUMENT, persisted=True)))
     user = relationship("User", backref="reports")
     official = relationship("Official", backref="assigned_reports", foreign_keys=[assigned_to])
     images = relationship("ReportImage", back_populates="report", cascade="all, delete-orphan")
@@ -116,13 +156,29 @@ class ReportImage(Base):
     mime_type = Column(String(100), nullable=False)
     display_order = Column(Integer, default=0)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    # 64-bit perceptual hash (image_hash.py); NULL when Pillow is not installed
+    phash = Column(BigInteger, nullable=True)
+    # An earlier upload of (almost) the same picture
+    duplicate_of = Column(Integer, ForeignKey("report_images.id", ondelete="SET NULL"), nullable=True, index=True)
     report = relationship("Report", back_populates="images")
+    hash_bands = relationship("ReportImageHashBand", cascade="all, delete-orphan", passive_deletes=True)
+
+class ReportImageHashBand(Base):
+    """16-bit slices of ReportImage.phash; the index used to find near-identical images"""
+    __tablename__ = "report_image_hash_bands"
+    
+    band = Column(SmallInteger, primary_key=True)
+    value = Column(Integer, primary_key=True)
+    image_id = Column(Integer, ForeignKey("report_images.id", ondelete="CASCADE"), primary_key=True)
 
 class ReportStatusHistory(Base):
     __tablename__ = "report_status_history"
+    __table_args__ = (
+        Index("ix_report_status_history_report_created", "report_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    report_id = Column(Integer, ForeignKey("reports.id"), nullable=False, index=True)
+    report_id = Column(Integer, ForeignKey("reports.id"), nullable=False)
     old_status = Column(SQLEnum(ReportStatus), nullable=True)
     new_status = Column(SQLEnum(ReportStatus), nullable=False)
     changed_by = Column(Integer, nullable=False)  
@@ -133,9 +189,12 @@ class ReportStatusHistory(Base):
 
 class ReportComment(Base):
     __tablename__ = "report_comments"
+    __table_args__ = (
+        Index("ix_report_comments_report_created", "report_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    report_id = Column(Integer, ForeignKey("reports.id"), nullable=False, index=True)
+    report_id = Column(Integer, ForeignKey("reports.id"), nullable=False)
     user_id = Column(Integer, nullable=False) 
     user_role = Column(SQLEnum(UserRole), nullable=False)
     
@@ -145,7 +204,94 @@ class ReportComment(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     report = relationship("Report", back_populates="comments")
+
+class ReportVote(Base):
+    __tablename__ = "report_votes"
+    __table_args__ = (
+        UniqueConstraint("report_id", "user_id", name="uq_report_votes_report_user"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    token_hash = Column(String(64), unique=True, nullable=False, index=True)  # sha256 of the token, never the token itself
+    family_id = Column(String(36), nullable=False, index=True)  # shared by every rotation of one login
+    account_role = Column(SQLEnum(UserRole), nullable=False)
+    account_id = Column(Integer, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+class Notification(Base):
+    __tablename__ = "notifications"
+    __table_args__ = (
+        # Inbox pages are read newest first per recipient, keyed on id
+        Index("ix_notifications_recipient", "recipient_role", "recipient_id", "id"),
+    )
     
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    recipient_role = Column(SQLEnum(UserRole), nullable=False)
+    recipient_id = Column(Integer, nullable=False)  # users.id or officials.id, depending on the role
+    type = Column(String(32), nullable=False)
+    title = Column(String(255), nullable=False)
+    body = Column(Text, nullable=True)
+    # Rows are never deleted, so removing a report only unlinks its notifications
+    report_id = Column(Integer, ForeignKey("reports.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    read_at = Column(DateTime(timezone=True), nullable=True)
+
+class NotificationInbox(Base):
+    __tablename__ = "notification_inboxes"
+    
+    recipient_role = Column(SQLEnum(UserRole), primary_key=True)
+    recipient_id = Column(Integer, primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)  # maintained alongside notifications writes
+    preferences = Column(JSON, nullable=False, default=dict)  # notification type -> false to mute it
+    
+class AlertSubscription(Base):
+    __tablename__ = "alert_subscriptions"
+    __table_args__ = (
+        Index("ix_alert_subscriptions_account", "account_role", "account_id"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    account_role = Column(SQLEnum(UserRole), nullable=False)
+    account_id = Column(Integer, nullable=False)
+    # Either a circle (latitude, longitude, radius_km) or a zone name
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    radius_km = Column(Float, nullable=True)
+    zone = Column(String(255), nullable=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    cells = relationship("AlertSubscriptionCell", cascade="all, delete-orphan", passive_deletes=True)
+
+class AlertSubscriptionCell(Base):
+    """Grid cells a circular subscription overlaps; the spatial index used to match new reports"""
+    __tablename__ = "alert_subscription_cells"
+    
+    cell = Column(Integer, primary_key=True)
+    subscription_id = Column(Integer, ForeignKey("alert_subscriptions.id", ondelete="CASCADE"), primary_key=True)
+    
+class ArchivedReport(Base):
+    """A closed/resolved report moved out of `reports` by archive.py, with its images, comments and history in `data`"""
+    __tablename__ = "archived_reports"
+    
+    id = Column(Integer, primary_key=True, autoincrement=False)  # the original report id
+    user_id = Column(Integer, nullable=False, index=True)
+    assigned_to = Column(Integer, nullable=True, index=True)
+    assigned_zone = Column(String(255), nullable=True)
+    status = Column(SQLEnum(ReportStatus), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    closed_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+    data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+
 class Admin(Base):
     __tablename__ = "admins"
     
@@ -0,0 +1,191 @@
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, exists, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+import models
+
+NOTIFICATION_TYPES = ("report_assigned", "status_update", "comment", "nearby_report")
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+Notification = models.Notification
+Inbox = models.NotificationInbox
+
+
+def _recipient(role: models.UserRole, recipient_id: int):
+    return and_(Notification.recipient_role == role, Notification.recipient_id == recipient_id)
+
+
+def _not_muted(role: models.UserRole, recipient_column, notification_type: str):
+    return ~exists().where(
+        Inbox.recipient_role == role,
+        Inbox.recipient_id == recipient_column,
+        Inbox.preferences[notification_type].as_boolean().is_(False),
+    )
+
+
+def notify_reports(
+    db: Session,
+    report_ids: Iterable[int],
+    notification_type: str,
+    title: str,
+    body: Optional[str] = None,
+    citizen: bool = True,
+    actor: Optional[Tuple[models.UserRole, int]] = None,
+) -> int:
+    """
+    Fan a notification out to the citizen and assigned official of each report,
+    in the caller's transaction. `title` is prefixed to the report title. The
+    actor and recipients who muted the type are skipped. Returns rows written.
+    """
+    report_ids = list(report_ids)
+    if not report_ids:
+        return 0
+    audiences = [(models.UserRole.OFFICIAL, models.Report.assigned_to)]
+    if citizen:
+        audiences.insert(0, (models.UserRole.CITIZEN, models.Report.user_id))
+
+    recipients = []
+    for role, column in audiences:
+        conditions = [models.Report.id.in_(report_ids), column.isnot(None), _not_muted(role, column, notification_type)]
+        if actor is not None and actor[0] == role:
+            conditions.append(column != actor[1])
+        rows = select(
+            literal(role, models.Notification.recipient_role.type), column, literal(notification_type),
+            func.substr(literal(title) + models.Report.title, 1, 255), literal(body), models.Report.id,
+        ).where(*conditions)
+        recipients += db.execute(
+            insert(Notification)
+            .from_select(["recipient_role", "recipient_id", "type", "title", "body", "report_id"], rows)
+            .returning(Notification.recipient_role, Notification.recipient_id)
+        ).all()
+    _add_unread(db, recipients)
+    return len(recipients)
+
+
+def notify_accounts(
+    db: Session,
+    recipients: List[Tuple[models.UserRole, int]],
+    notification_type: str,
+    title: str,
+    body: Optional[str] = None,
+    report_id: Optional[int] = None,
+) -> int:
+    """Write the same notification to each of `recipients`, skipping those who muted the type"""
+    muted = set()
+    for role in {role for role, _ in recipients}:
+        muted.update((role, recipient_id) for recipient_id in db.execute(
+            select(Inbox.recipient_id).where(
+                Inbox.recipient_role == role,
+                Inbox.recipient_id.in_([recipient_id for r, recipient_id in recipients if r == role]),
+                Inbox.preferences[notification_type].as_boolean().is_(False),
+            )
+        ).scalars())
+    recipients = [recipient for recipient in recipients if recipient not in muted]
+    if not recipients:
+        return 0
+    db.execute(insert(Notification), [
+        {
+            "recipient_role": role, "recipient_id": recipient_id, "type": notification_type,
+            "title": title[:255], "body": body, "report_id": report_id,
+        }
+        for role, recipient_id in recipients
+    ])
+    _add_unread(db, recipients)
+    return len(recipients)
+
+
+def _add_unread(db: Session, recipients: List[Tuple[models.UserRole, int]]) -> None:
+    """One upsert bumps every recipient's counter by the rows just written for them"""
+    counts = {}
+    for recipient in recipients:
+        counts[tuple(recipient)] = counts.get(tuple(recipient), 0) + 1
+    if not counts:
+        return
+    stmt = pg_insert(Inbox).values([
+        {"recipient_role": role, "recipient_id": recipient_id, "unread": count, "preferences": {}}
+        for (role, recipient_id), count in sorted(counts.items(), key=lambda item: (item[0][0].value, item[0][1]))
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[Inbox.recipient_role, Inbox.recipient_id],
+        set_={"unread": Inbox.unread + stmt.excluded.unread},
+    ))
+
+
+def unread_count(db: Session, role: models.UserRole, recipient_id: int) -> int:
+    inbox = db.get(Inbox, (role, recipient_id))
+    return inbox.unread if inbox else 0
+
+
+def list_notifications(
+    db: Session,
+    role: models.UserRole,
+    recipient_id: int,
+    cursor: Optional[int] = None,
+    limit: int = PAGE_SIZE,
+    unread_only: bool = False,
+) -> Tuple[List[models.Notification], Optional[int]]:
+    """Newest first; pass the returned cursor back to get the next page (None when done)"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = select(Notification).where(_recipient(role, recipient_id))
+    if cursor is not None:
+        query = query.where(Notification.id < cursor)
+    if unread_only:
+        query = query.where(Notification.read_at.is_(None))
+    rows = db.execute(query.order_by(Notification.id.desc()).limit(limit + 1)).scalars().all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def mark_read(db: Session, role: models.UserRole, recipient_id: int, ids: Optional[List[int]] = None) -> int:
+    """
+    Mark the given notifications (all of them when `ids` is None) read and
+    take exactly that many off the counter. Rows already read are not
+    counted twice, however many requests race.
+    """
+    stmt = update(Notification).where(_recipient(role, recipient_id), Notification.read_at.is_(None))
+    if ids is not None:
+        if not ids:
+            return 0
+        stmt = stmt.where(Notification.id.in_(ids))
+    marked = db.execute(stmt.values(read_at=func.now())).rowcount
+    if marked:
+        db.execute(
+            update(Inbox)
+            .where(Inbox.recipient_role == role, Inbox.recipient_id == recipient_id)
+            .values(unread=case((Inbox.unread > marked, Inbox.unread - marked), else_=0))
+        )
+    return marked
+
+
+def _with_defaults(preferences: dict) -> dict:
+    return {notification_type: preferences.get(notification_type, True) for notification_type in NOTIFICATION_TYPES}
+
+
+def get_preferences(db: Session, role: models.UserRole, recipient_id: int) -> dict:
+    inbox = db.get(Inbox, (role, recipient_id))
+    return _with_defaults(inbox.preferences if inbox else {})
+
+
+def set_preferences(db: Session, role: models.UserRole, recipient_id: int, preferences: dict) -> dict:
+    """Replace the recipient's preferences ({type: bool}); types left out are enabled"""
+    stmt = pg_insert(Inbox).values(recipient_role=role, recipient_id=recipient_id, unread=0, preferences=preferences)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[Inbox.recipient_role, Inbox.recipient_id],
+        set_={"preferences": stmt.excluded.preferences},
+    ))
+    return _with_defaults(preferences)
+
+
+def serialize(notification: models.Notification) -> dict:
+    return {
+        "id": notification.id,
+        "type": notification.type,
+        "title": notification.title,
+        "description": notification.body,
+        "report_id": notification.report_id,
+        "created_at": notification.created_at.isoformat() if notification.created_at else None,
+        "is_read": notification.read_at is not None,
+    }
@@ -0,0 +1,263 @@
+import hashlib
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# Optional PostgreSQL declarative partitioning of `reports`: LIST by
+# assigned_zone (zone dashboards read one partition) or RANGE by created_at
+# month (old months can be detached whole). The table keeps its name and
+# columns, so the ORM and every query are unchanged; rows that match no
+# partition, including unassigned reports, land in reports_default.
+#
+# A partitioned table can only have unique keys that include the partition
+# key, so reports(id) can no longer be referenced by foreign keys. Converting
+# drops them and a delete trigger keeps their ON DELETE CASCADE / SET NULL
+# behaviour; NO ACTION keys were already handled by the ORM cascades. Ids stay
+# unique through the sequence.
+STRATEGIES = {"zone": "l", "month": "r"}
+PARTITION_MONTHS_AHEAD = int(os.environ.get("REPORT_PARTITION_MONTHS_AHEAD", 3))
+DEFAULT_PARTITION = "reports_default"
+
+
+def strategy(conn: Connection) -> Optional[str]:
+    """"zone", "month", or None while reports is a plain table"""
+    code = conn.execute(text(
+        "SELECT partstrat FROM pg_partitioned_table WHERE partrelid = to_regclass('reports')"
+    )).scalar()
+    return next((name for name, value in STRATEGIES.items() if value == code), None)
+
+
+def _literal(value: str) -> str:
+    # DDL cannot take bind parameters; colons are escaped for text()
+    return "'" + value.replace("'", "''").replace(":", "\\:") + "'"
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(by: str, key) -> str:
+    if by == "month":
+        return f"reports_{key:%Y_%m}"
+    slug = re.sub(r"[^a-z0-9]+", "_", key.lower()).strip("_")[:32]
+    return f"reports_zone_{slug}_{hashlib.md5(key.encode()).hexdigest()[:6]}"
+
+
+def _bounds(by: str, key) -> Tuple[str, str]:
+    """The partition's FOR VALUES clause and the WHERE condition matching its rows"""
+    if by == "zone":
+        return f"FOR VALUES IN ({_literal(key)})", f"assigned_zone = {_literal(key)}"
+    start, end = f"'{key:%Y-%m-%d} 00:00:00+00'", f"'{_next_month(key):%Y-%m-%d} 00:00:00+00'"
+    return f"FOR VALUES FROM ({start}) TO ({end})", f"created_at >= {start} AND created_at < {end}"
+
+
+def _wanted(conn: Connection, by: str) -> list:
+    """Every zone in use, or every month from the oldest report to PARTITION_MONTHS_AHEAD from now"""
+    if by == "zone":
+        return conn.execute(text(
+            "SELECT zone FROM officials WHERE zone IS NOT NULL "
+            "UNION SELECT assigned_zone FROM reports WHERE assigned_zone IS NOT NULL"
+        )).scalars().all()
+    now = datetime.now(timezone.utc)
+    first = conn.execute(text("SELECT min(created_at) FROM reports")).scalar() or now
+    if first.tzinfo is not None:
+        first = first.astimezone(timezone.utc)
+    month, last = date(first.year, first.month, 1), date(now.year, now.month, 1)
+    for _ in range(PARTITION_MONTHS_AHEAD):
+        last = _next_month(last)
+    months = []
+    while month <= last:
+        months.append(month)
+        month = _next_month(month)
+    return months
+
+
+def _columns(conn: Connection, table: str) -> str:
+    """Writable columns in table order (generated ones are recomputed on insert)"""
+    return ", ".join(conn.execute(text(
+        "SELECT quote_ident(column_name) FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table AND is_generated = 'NEVER' "
+        "ORDER BY ordinal_position"
+    ), {"table": table}).scalars())
+
+
+def _drop_foreign_keys(conn: Connection) -> List[Tuple[str, str, str]]:
+    references = conn.execute(text(
+        "SELECT c.conrelid::regclass::text, c.conname, quote_ident(a.attname), c.confdeltype "
+        "FROM pg_constraint c JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1] "
+        "WHERE c.contype = 'f' AND c.confrelid = 'reports'::regclass"
+    )).all()
+    for table, name, _, _ in references:
+        conn.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT {_quote(name)}"))
+    return [(table, column, action) for table, _, column, action in references]
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _create_reference_trigger(conn: Connection, references: List[Tuple[str, str, str]]) -> None:
+    actions = []
+    for table, column, action in references:
+        if action == "c":
+            actions.append(f"DELETE FROM {table} WHERE {column} = OLD.id;")
+        elif action == "n":
+            actions.append(f"UPDATE {table} SET {column} = NULL WHERE {column} = OLD.id;")
+    if not actions:
+        return
+    body = "\n            ".join(actions)
+    conn.execute(text(f"""
+        CREATE OR REPLACE FUNCTION reports_delete_references() RETURNS trigger AS $$
+        BEGIN
+            -- Moving to another partition is a delete plus an insert; the report still exists
+            IF EXISTS (SELECT 1 FROM reports WHERE id = OLD.id) THEN
+                RETURN NULL;
+            END IF;
+            {body}
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """))
+    conn.execute(text(
+        "CREATE TRIGGER trg_reports_delete_references AFTER DELETE ON reports "
+        "FOR EACH ROW EXECUTE FUNCTION reports_delete_references()"
+    ))
+
+
+def convert(engine: Engine, by: str) -> int:
+    """
+    Rebuild reports as a partitioned table in one transaction, copying every
+    row. Takes an exclusive lock on reports for the duration, so run it in a
+    maintenance window. Returns the number of partitions created.
+    """
+    if by not in STRATEGIES:
+        raise ValueError(f"partition by one of: {', '.join(STRATEGIES)}")
+    if engine.dialect.name != "postgresql":
+        raise RuntimeError("partitioning needs PostgreSQL")
+    with engine.begin() as conn:
+        current = strategy(conn)
+        if current:
+            raise RuntimeError(f"reports is already partitioned by {current}")
+        conn.execute(text("LOCK TABLE reports IN ACCESS EXCLUSIVE MODE"))
+        keys = _wanted(conn, by)
+        indexes = conn.execute(text(
+            "SELECT quote_ident(i.relname), pg_get_indexdef(x.indexrelid), x.indisunique "
+            "FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid "
+            "WHERE x.indrelid = 'reports'::regclass AND NOT x.indisprimary"
+        )).all()
+        triggers = conn.execute(text(
+            "SELECT pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = 'reports'::regclass AND NOT tgisinternal"
+        )).scalars().all()
+        references = _drop_foreign_keys(conn)
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence('reports', 'id')")).scalar()
+
+        conn.execute(text("ALTER TABLE reports RENAME TO reports_unpartitioned"))
+        for name, _, unique in indexes:
+            if unique:
+                print(f"⚠️ Skipping unique index {name}: it would have to include the partition key")
+            else:
+                conn.execute(text(f"DROP INDEX {name}"))
+        key = "assigned_zone" if by == "zone" else "created_at"
+        conn.execute(text(
+            "CREATE TABLE reports (LIKE reports_unpartitioned INCLUDING DEFAULTS INCLUDING GENERATED "
+            f"INCLUDING STORAGE) PARTITION BY {'LIST' if by == 'zone' else 'RANGE'} ({key})"
+        ))
+        if by == "month":
+            conn.execute(text("ALTER TABLE reports ALTER COLUMN created_at SET NOT NULL"))
+        for partition_key in keys:
+            bound, _ = _bounds(by, partition_key)
+            conn.execute(text(f"CREATE TABLE {partition_name(by, partition_key)} PARTITION OF reports {bound}"))
+        conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF reports DEFAULT"))
+
+        columns = _columns(conn, "reports_unpartitioned")
+        conn.execute(text(f"INSERT INTO reports ({columns}) SELECT {columns} FROM reports_unpartitioned"))
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY reports.id"))
+        conn.execute(text("DROP TABLE reports_unpartitioned"))
+
+        if by == "month":
+            conn.execute(text("ALTER TABLE reports ADD PRIMARY KEY (id, created_at)"))
+        for _, definition, unique in indexes:
+            if not unique:
+                conn.execute(text(definition))
+        for definition in triggers:
+            conn.execute(text(definition))
+        _create_reference_trigger(conn, references)
+    return len(keys) + 1
+
+
+def _add_partitions(conn: Connection, by: str, keys: list) -> int:
+    missing = [
+        key for key in keys
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": partition_name(by, key)}).scalar() is None
+    ]
+    if not missing:
+        return 0
+    columns = _columns(conn, "reports")
+    # A new partition may not overlap rows already sitting in the default one,
+    # so those are moved across while the default is detached
+    conn.execute(text(f"ALTER TABLE reports DETACH PARTITION {DEFAULT_PARTITION}"))
+    for key in missing:
+        bound, condition = _bounds(by, key)
+        conn.execute(text(f"CREATE TABLE {partition_name(by, key)} PARTITION OF reports {bound}"))
+        conn.execute(text(f"INSERT INTO reports ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} WHERE {condition}"))
+        conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {condition}"))
+    conn.execute(text(f"ALTER TABLE reports ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    return len(missing)
+
+
+def maintain(engine: Engine) -> int:
+    """
+    Add partitions for new zones and upcoming months; a no-op unless reports
+    is partitioned. Runs with the migrations on startup.
+    """
+    if engine.dialect.name != "postgresql":
+        return 0
+    try:
+        with engine.begin() as conn:
+            by = strategy(conn)
+            if by is None:
+                return 0
+            # Several workers start at once; one of them does the work
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('reports_partitions'))"))
+            added = _add_partitions(conn, by, _wanted(conn, by))
+    except Exception as e:
+        print(f"⚠️ Could not add report partitions: {str(e)}")
+        return 0
+    if added:
+        print(f"🗂️ Added {added} report partitions")
+    return added
+
+
+def describe(engine: Engine) -> List[Tuple[str, str, int]]:
+    """(partition, bounds, estimated rows) for each partition of reports"""
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass('reports') ORDER BY c.relname"
+        )).all()
+
+
+if __name__ == "__main__":
+    import sys
+    from database import engine
+
+    args = sys.argv[1:]
+    if args == ["status"]:
+        with engine.connect() as conn:
+            by = strategy(conn)
+        print(f"reports partitioned by {by}" if by else "reports is not partitioned")
+        for name, bounds, rows in describe(engine):
+            print(f"  {name:<40} {bounds:<70} ~{max(rows, 0)} rows")
+    elif len(args) == 2 and args[0] == "convert" and args[1] in STRATEGIES:
+        print(f"✅ Partitioned reports by {args[1]} into {convert(engine, args[1])} partitions")
+    elif args == ["maintain"]:
+        print(f"✅ Added {maintain(engine)} report partitions")
+    else:
+        print("usage: python partitioning.py status | convert zone|month | maintain")
+        sys.exit(2)
@@ -0,0 +1,169 @@
+import math
+import os
+import re
+import threading
+import time
+from typing import Tuple
+
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+
+import auth
+from cache import get_redis
+
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() not in ("0", "false", "no")
+# Every client gets a bucket of RATE_LIMIT_BURST tokens refilled at
+# RATE_LIMIT_PER_MINUTE; a request spends its route's cost
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", 120))
+RATE_LIMIT_PER_MINUTE = float(os.environ.get("RATE_LIMIT_PER_MINUTE", 300))
+# Honour X-Forwarded-For only when the API sits behind a proxy that sets it
+RATE_LIMIT_TRUST_PROXY = os.environ.get("RATE_LIMIT_TRUST_PROXY", "false").lower() in ("1", "true", "yes")
+MAX_MEMORY_BUCKETS = 100_000
+EXEMPT_PATHS = {"/", "/api/health"}
+
+# (method, path pattern, cost). First match wins; anything else costs 1.
+ROUTE_COSTS = [
+    ("POST", r"/api/login", 10),
+    ("POST", r"/api/admin/login", 10),
+    ("POST", r"/api/register/.+", 10),
+    ("POST", r"/api/users/change-password", 10),
+    ("POST", r"/api/token/refresh", 2),
+    ("POST", r"/api/reports", 10),
+    ("POST", r"/api/upload/profile-image", 5),
+    ("POST", r"/api/admin/reports/import", 30),
+    ("GET", r"/api/reports/map", 5),
+    ("GET", r"/api/reports/nearby", 5),
+    ("GET", r"/api/admin/reports", 3),
+]
+_COMPILED_COSTS = [(method, re.compile(pattern + r"/?"), cost) for method, pattern, cost in ROUTE_COSTS]
+
+
+def route_cost(method: str, path: str) -> int:
+    for route_method, pattern, cost in _COMPILED_COSTS:
+        if route_method == method and pattern.fullmatch(path):
+            return cost
+    return 1
+
+
+class MemoryBackend:
+    """Token buckets in this process only; each worker enforces its own limit"""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, cost: float, capacity: float, rate: float) -> Tuple[bool, float]:
+        """Spend `cost` tokens; returns (allowed, seconds until enough tokens are available)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                allowed, retry_after = True, 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                allowed, retry_after = False, (cost - tokens) / rate
+            if len(self._buckets) > MAX_MEMORY_BUCKETS:
+                self._prune(now, capacity, rate)
+        return allowed, retry_after
+
+    def _prune(self, now: float, capacity: float, rate: float) -> None:
+        # A bucket that has refilled completely carries no state worth keeping
+        self._buckets = {
+            key: (tokens, updated) for key, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * rate < capacity
+        }
+
+
+class RedisBackend:
+    """Token buckets shared by every worker, updated atomically by a Lua script"""
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    local allowed = 0
+    local retry_after = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    else
+        retry_after = (cost - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+    return {allowed, tostring(retry_after)}
+    """
+
+    def __init__(self, client):
+        self._take = client.register_script(self.SCRIPT)
+
+    def take(self, key: str, cost: float, capacity: float, rate: float) -> Tuple[bool, float]:
+        allowed, retry_after = self._take(keys=[f"roadsense:ratelimit:{key}"], args=[capacity, rate, cost])
+        return bool(int(allowed)), float(retry_after)
+
+
+def client_key(scope: dict, headers: dict) -> str:
+    """Authenticated callers are limited per account, everyone else per IP"""
+    authorization = headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        try:
+            payload = jwt.decode(authorization[7:], auth.SECRET_KEY, algorithms=[auth.ALGORITHM])
+            return f"user:{payload.get('role')}:{payload.get('uid') or payload.get('sub')}"
+        except JWTError:
+            pass
+    if RATE_LIMIT_TRUST_PROXY and headers.get("x-forwarded-for"):
+        return "ip:" + headers["x-forwarded-for"].split(",")[0].strip()
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware that answers 429 with Retry-After once a client's token
+    bucket is empty. Uses Redis when REDIS_URL is set so the budget holds
+    across workers; if Redis is unreachable it degrades to per-worker buckets
+    rather than failing requests.
+    """
+
+    def __init__(self, app, burst: float = RATE_LIMIT_BURST, per_minute: float = RATE_LIMIT_PER_MINUTE):
+        self.app = app
+        self.capacity = burst
+        self.rate = per_minute / 60
+        self.memory = MemoryBackend()
+        client = get_redis()
+        self.redis = RedisBackend(client) if client is not None else None
+
+    async def take(self, key: str, cost: float) -> Tuple[bool, float]:
+        if self.redis is not None:
+            try:
+                return await run_in_threadpool(self.redis.take, key, cost, self.capacity, self.rate)
+            except Exception as e:
+                print(f"⚠️ Redis rate limiter unavailable, using local buckets: {str(e)}")
+        return self.memory.take(key, cost, self.capacity, self.rate)
+
+    async def __call__(self, scope, receive, send):
+        if not RATE_LIMIT_ENABLED or scope["type"] != "http" or scope["method"] == "OPTIONS" \
+                or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+        headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        cost = min(route_cost(scope["method"], scope["path"]), self.capacity)
+        allowed, retry_after = await self.take(client_key(scope, headers), cost)
+        if not allowed:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": "Too many requests. Please slow down and try again shortly."},
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
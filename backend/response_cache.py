@@ -0,0 +1,152 @@
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from cache import TTLCache, get_redis
+from geo import KM_PER_DEGREE
+
+PUBLIC_CACHE_TTL_SECONDS = float(os.environ.get("PUBLIC_CACHE_TTL_SECONDS", 30))
+PUBLIC_CACHE_STALE_SECONDS = float(os.environ.get("PUBLIC_CACHE_STALE_SECONDS", 120))
+PUBLIC_CACHE_SIZE = int(os.environ.get("PUBLIC_CACHE_SIZE", 2048))
+# ~550 m of latitude; nearby lookups from the same neighbourhood share candidates
+NEARBY_GRID_DEGREES = float(os.environ.get("NEARBY_GRID_DEGREES", 0.005))
+NEARBY_RADIUS_STEP_KM = 0.1
+INVALIDATION_CHANNEL = "roadsense:public-cache-invalidate"
+
+
+class ResponseCache:
+    """
+    Cache for idempotent, anonymous responses. Entries are fresh for `ttl`
+    seconds and then served stale for up to `stale_ttl` more while a single
+    background refresh runs. Concurrent misses for the same key share one
+    computation instead of each querying the database.
+    """
+
+    def __init__(self, name: str, ttl: float = PUBLIC_CACHE_TTL_SECONDS,
+                 stale_ttl: float = PUBLIC_CACHE_STALE_SECONDS, maxsize: int = PUBLIC_CACHE_SIZE):
+        self.name = name
+        self.ttl = ttl
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl + stale_ttl)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, running the blocking `compute` in
+        the threadpool when needed. `compute` must open its own database
+        session: background refreshes outlive the request that triggered them.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            fresh_until, value = entry
+            if fresh_until <= time.monotonic() and key not in self._inflight:
+                self._start(key, compute)
+            return value
+        future = self._inflight.get(key) or self._start(key, compute)
+        return await asyncio.shield(future)
+
+    def _start(self, key: Hashable, compute: Callable[[], Any]) -> asyncio.Future:
+        future = asyncio.ensure_future(self._compute(key, compute, self._generation))
+        self._inflight[key] = future
+        # Refreshes nobody awaits must not log "exception never retrieved"
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return future
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Any], generation: int) -> Any:
+        try:
+            value = await run_in_threadpool(compute)
+            # Don't store a result computed from data an invalidation has since superseded
+            if generation == self._generation:
+                self._entries.set(key, (time.monotonic() + self.ttl, value))
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+map_reports = ResponseCache("map")
+nearby_candidates = ResponseCache("nearby")
+
+CACHES = [map_reports, nearby_candidates]
+
+# Finished nearby bodies keyed on the caller's exact point and radius, each
+# stored with the candidate list it was ranked from; an entry only counts
+# while that list is still the one cached for its cell
+nearby_bodies = TTLCache(maxsize=PUBLIC_CACHE_SIZE, ttl=PUBLIC_CACHE_TTL_SECONDS + PUBLIC_CACHE_STALE_SECONDS)
+
+
+# Map entries hold finished, precompressed response bodies, so a key has to
+# determine the response exactly: no trimming or re-encoding after a hit.
+
+def map_key(status: str, limit: int, bbox: Optional[tuple] = None) -> tuple:
+    """`bbox` should already be widened by geo.parse_bbox so viewports share entries"""
+    return ((status or "ALL").upper(), limit, bbox)
+
+
+def nearby_key(latitude: float, longitude: float, radius_km: float) -> tuple:
+    """Snap the point to the grid cell centre and round the radius up to NEARBY_RADIUS_STEP_KM"""
+    snap = lambda value: round(round(value / NEARBY_GRID_DEGREES) * NEARBY_GRID_DEGREES, 6)
+    radius = round(math.ceil(round(radius_km / NEARBY_RADIUS_STEP_KM, 6)) * NEARBY_RADIUS_STEP_KM, 1)
+    return (snap(latitude), snap(longitude), radius)
+
+
+def nearby_fetch_area(key: tuple) -> tuple:
+    """
+    Centre and radius that cover the key's radius around every point of its
+    cell: a point is at most half the cell diagonal from the centre (a
+    degree of longitude is never longer than one of latitude)
+    """
+    latitude, longitude, radius_km = key
+    return latitude, longitude, radius_km + NEARBY_GRID_DEGREES / 2 * math.sqrt(2) * KM_PER_DEGREE
+
+
+def _clear_local() -> None:
+    for response_cache in CACHES:
+        response_cache.clear()
+    nearby_bodies.clear()
+
+
+def invalidate_reports() -> None:
+    """Drop cached public report data; call after any report is created, changed or deleted"""
+    _clear_local()
+    client = get_redis()
+    if client is not None:
+        try:
+            client.publish(INVALIDATION_CHANNEL, json.dumps({"at": time.time()}))
+        except Exception as e:
+            print(f"⚠️ Could not broadcast public cache invalidation: {str(e)}")
+
+
+def _listen_for_invalidations(client, loop: asyncio.AbstractEventLoop) -> None:
+    while True:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            for _ in pubsub.listen():
+                # The caches are driven from the event loop, so clear them there
+                loop.call_soon_threadsafe(_clear_local)
+        except Exception as e:
+            # Entries still expire after the TTL while we reconnect
+            print(f"⚠️ Public cache invalidation listener error: {str(e)}")
+            time.sleep(1)
+
+
+def start_invalidation_listener() -> None:
+    """Clear this worker's caches when another worker invalidates; a no-op without REDIS_URL"""
+    client = get_redis()
+    if client is None:
+        return
+    loop = asyncio.get_running_loop()
+    threading.Thread(target=_listen_for_invalidations, args=(client, loop), daemon=True).start()
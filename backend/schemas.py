@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 from typing import Optional, List
 from datetime import datetime
 import re
@@ -59,10 +59,14 @@ class LoginRequest(BaseModel):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str
     role: str
     account_status: str
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
 class UserResponse(BaseModel):
     id: int
     full_name: str
@@ -111,6 +115,7 @@ class ReportImageResponse(BaseModel):
     mime_type: str
     display_order: int
     uploaded_at: datetime
+    duplicate_of: Optional[int] = None
     
     class Config:
         from_attributes = True
@@ -144,6 +149,7 @@ class ReportResponse(BaseModel):
     updated_at: Optional[datetime] = None
     resolved_at: Optional[datetime] = None
     closed_at: Optional[datetime] = None
+    duplicate_of: Optional[int] = None
     images: List[ReportImageResponse] = []
     
     class Config:
@@ -201,3 +207,62 @@ class StatusHistoryResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class BulkReportRow(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    address: str = Field(..., min_length=5)
+    issue_type: IssueTypeEnum
+    title: str = Field(..., min_length=5, max_length=255)
+    description: str = Field(..., min_length=10)
+    is_anonymous: bool = False
+    status: ReportStatusEnum = ReportStatusEnum.PENDING
+    priority: ReportPriorityEnum = ReportPriorityEnum.MEDIUM
+    user_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    images: List[str] = []
+
+    @field_validator('images', mode='before')
+    @classmethod
+    def split_images(cls, v):
+        if isinstance(v, str):
+            return [path.strip() for path in v.split(';') if path.strip()]
+        return v
+
+class BulkReportFilter(BaseModel):
+    status: Optional[ReportStatusEnum] = None
+    issue_type: Optional[IssueTypeEnum] = None
+    priority: Optional[ReportPriorityEnum] = None
+    assigned_zone: Optional[str] = None
+    assigned_to: Optional[int] = None
+
+class BulkStatusUpdate(BaseModel):
+    report_ids: Optional[List[int]] = Field(None, max_length=5000)
+    filter: Optional[BulkReportFilter] = None
+    status: ReportStatusEnum
+    comment: Optional[str] = None
+    priority: Optional[ReportPriorityEnum] = None
+
+class BulkAssignment(BaseModel):
+    report_ids: Optional[List[int]] = Field(None, max_length=5000)
+    filter: Optional[BulkReportFilter] = None
+    official_id: int
+    comment: Optional[str] = None
+
+class MarkNotificationsRead(BaseModel):
+    ids: Optional[List[int]] = Field(None, max_length=500)
+    all: bool = False
+
+class AlertSubscriptionCreate(BaseModel):
+    """Either a point and radius, or a zone"""
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    radius_km: Optional[float] = Field(None, gt=0)
+    zone: Optional[str] = Field(None, min_length=1, max_length=255)
+
+    @model_validator(mode="after")
+    def check_region(self):
+        has_circle = None not in (self.latitude, self.longitude, self.radius_km)
+        if has_circle == (self.zone is not None):
+            raise ValueError("Provide latitude, longitude and radius_km, or a zone")
+        return self
@@ -0,0 +1,66 @@
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from fastapi.responses import StreamingResponse
+
+from database import SessionLocal
+from serialization import dumps
+
+STREAM_BATCH_SIZE = 500
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def iter_rows(statement, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[Any]:
+    """
+    Yield rows from a server-side cursor, `batch_size` at a time. The session
+    is opened here rather than taken from the request because the response
+    body is produced after the endpoint has returned.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield from partition
+    finally:
+        db.close()
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[list]:
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def encode_rows(rows: Iterable[dict], fmt: str, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[bytes]:
+    """Encode rows as a JSON array or NDJSON, one network write per batch of rows"""
+    if fmt == "ndjson":
+        for chunk in _chunks(rows, batch_size):
+            yield b"".join(dumps(row) + b"\n" for row in chunk)
+        return
+    yield b"["
+    separator = b""
+    for chunk in _chunks(rows, batch_size):
+        yield separator + b",".join(dumps(row) for row in chunk)
+        separator = b","
+    yield b"]"
+
+
+def stream_query(statement, serialize: Callable[[Any], dict], fmt: str = "json",
+                 filename: Optional[str] = None, batch_size: int = STREAM_BATCH_SIZE) -> StreamingResponse:
+    """
+    Stream the rows of `statement` as they come off the cursor, so memory use
+    stays flat however many rows match. Errors after the first byte can't
+    change the status code any more; they end the body early instead.
+    """
+    def body() -> Iterator[bytes]:
+        try:
+            yield from encode_rows((serialize(row) for row in iter_rows(statement, batch_size)), fmt, batch_size)
+        except Exception as e:
+            print(f"❌ Error while streaming response: {str(e)}")
+            raise
+
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return StreamingResponse(body(), media_type=MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,134 @@
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import case, func, literal, null, or_, select, union_all
+
+import models
+
+SEARCH_CONFIG = "english"
+MAX_SEARCH_TERMS = 8
+
+
+def build_tsquery(term: Optional[str]):
+    """
+    Turn free text into a prefix-matching tsquery ("main ro" -> main:* & ro:*),
+    so partially typed words still match. Returns None when nothing searchable is left.
+    """
+    words = re.findall(r"\w+", (term or "").lower())[:MAX_SEARCH_TERMS]
+    if not words:
+        return None
+    return func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{word}:*" for word in words))
+
+
+def filter_reports(query, term: Optional[str]):
+    """Restrict a Report query to rows whose title, description or address match"""
+    ts_query = build_tsquery(term)
+    if ts_query is None:
+        return query
+    return query.filter(models.Report.search_vector.op("@@")(ts_query))
+
+
+def report_ordering(term: Optional[str]) -> List:
+    """Best matches first when searching, newest first otherwise"""
+    ts_query = build_tsquery(term)
+    if ts_query is None:
+        return [models.Report.created_at.desc()]
+    return [
+        func.ts_rank_cd(models.Report.search_vector, ts_query).desc(),
+        models.Report.created_at.desc(),
+    ]
+
+
+def _directory_select(model, search: Optional[str], extra_conditions: list):
+    is_official = model is models.Official
+    columns = [
+        model.id.label("id"),
+        model.full_name.label("full_name"),
+        model.email.label("email"),
+        model.role.label("role"),
+        model.account_status.label("account_status"),
+        model.is_active.label("is_active"),
+        model.phone_number.label("phone_number"),
+        (model.department if is_official else null()).label("department"),
+        (model.designation if is_official else null()).label("designation"),
+        model.created_at.label("created_at"),
+        literal("official" if is_official else "user").label("user_type"),
+    ]
+    conditions = list(extra_conditions)
+    if search:
+        pattern = f"%{search}%"
+        prefix = f"{search}%"
+        # Substring and fuzzy matches are both answered by the gin_trgm_ops indexes
+        conditions.append(or_(
+            model.full_name.ilike(pattern),
+            model.email.ilike(pattern),
+            literal(search).op("<%")(model.full_name),
+        ))
+        score = (
+            case((or_(model.full_name.ilike(prefix), model.email.ilike(prefix)), 1.0), else_=0.0)
+            + func.greatest(
+                func.similarity(model.full_name, search),
+                func.word_similarity(search, model.full_name),
+                func.similarity(model.email, search),
+            )
+        )
+    else:
+        score = literal(0.0)
+    columns.append(score.label("score"))
+    return select(*columns).where(*conditions)
+
+
+def search_user_directory(
+    db,
+    role: Optional[str] = None,
+    account_status: Optional[models.AccountStatus] = None,
+    search: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0
+) -> Tuple[List[dict], int]:
+    """
+    Search citizens and officials together in one query, ranked and paginated
+    by the database: prefix matches first, then by trigram similarity.
+    """
+    search = (search or "").strip() or None
+    selects = []
+    if role != "official":
+        conditions = []
+        if role == "citizen":
+            conditions.append(models.User.role == models.UserRole.CITIZEN)
+        elif role == "admin":
+            conditions.append(models.User.role == models.UserRole.ADMIN)
+        if account_status:
+            conditions.append(models.User.account_status == account_status)
+        selects.append(_directory_select(models.User, search, conditions))
+    if not role or role == "official":
+        conditions = []
+        if account_status:
+            conditions.append(models.Official.account_status == account_status)
+        selects.append(_directory_select(models.Official, search, conditions))
+
+    directory = union_all(*selects).subquery("directory")
+    rows = db.execute(
+        select(directory, func.count().over().label("total"))
+        .order_by(directory.c.score.desc(), directory.c.created_at.desc(), directory.c.id)
+        .limit(limit)
+        .offset(offset)
+    ).mappings().all()
+
+    total = rows[0]["total"] if rows else 0
+    if not rows and offset:
+        # Past the last page: the window count is gone, ask for it separately
+        total = db.execute(select(func.count()).select_from(directory)).scalar()
+    users = [{
+        "id": row["id"],
+        "full_name": row["full_name"],
+        "email": row["email"],
+        "role": row["role"].value if row["role"] else None,
+        "account_status": row["account_status"].value if row["account_status"] else None,
+        "is_active": row["is_active"] if row["is_active"] is not None else True,
+        "phone_number": row["phone_number"],
+        **({"department": row["department"], "designation": row["designation"]} if row["user_type"] == "official" else {}),
+        "created_at": str(row["created_at"]),
+        "user_type": row["user_type"],
+    } for row in rows]
+    return users, total
@@ -0,0 +1,123 @@
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+import counters
+import models
+
+HOT_REPORT_VOTES_PER_MINUTE = int(os.environ.get("HOT_REPORT_VOTES_PER_MINUTE", 60))
+
+
+class HotReportDetector:
+    """Tracks recent vote timestamps per report to spot reports that are going viral"""
+
+    def __init__(self, threshold_per_minute: int = HOT_REPORT_VOTES_PER_MINUTE, window_seconds: float = 60):
+        self.threshold = threshold_per_minute
+        self.window_seconds = window_seconds
+        self._events: Dict[int, Deque[float]] = defaultdict(deque)
+        self._lock = threading.Lock()
+
+    def hit(self, report_id: int) -> bool:
+        """Record a vote and return True if the report is currently hot"""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events[report_id]
+            events.append(now)
+            while events and events[0] < now - self.window_seconds:
+                events.popleft()
+            hot = len(events) >= self.threshold
+            if len(self._events) > 10_000:
+                self._events = defaultdict(deque, {
+                    rid: ev for rid, ev in self._events.items() if ev and ev[-1] >= now - self.window_seconds
+                })
+            return hot
+
+
+detector = HotReportDetector()
+
+
+def apply_delta(db: Session, report_id: int, delta: int) -> Optional[int]:
+    """
+    Apply a vote delta to reports.upvotes. Cold reports get an atomic
+    `upvotes = upvotes + delta` in the caller's transaction; hot reports have
+    the delta buffered and batched so thousands of voters don't queue on one
+    row lock. Returns the new count when it was written directly.
+    """
+    if detector.hit(report_id):
+        counters.upvotes.record(report_id, amount=delta)
+        return None
+    return db.execute(
+        update(models.Report)
+        .where(models.Report.id == report_id)
+        .values(
+            upvotes=func.coalesce(models.Report.upvotes, 0) + delta,
+            # Keep onupdate from touching updated_at: a vote is not an edit
+            updated_at=models.Report.updated_at
+        )
+        .returning(models.Report.upvotes)
+    ).scalar()
+
+
+def cast_vote(db: Session, report_id: int, user_id: int) -> bool:
+    """Insert the (report, user) vote; returns False if the user already voted"""
+    vote_id = db.execute(
+        pg_insert(models.ReportVote)
+        .values(report_id=report_id, user_id=user_id)
+        .on_conflict_do_nothing(constraint="uq_report_votes_report_user")
+        .returning(models.ReportVote.id)
+    ).scalar()
+    return vote_id is not None
+
+
+def retract_vote(db: Session, report_id: int, user_id: int) -> bool:
+    vote_id = db.execute(
+        delete(models.ReportVote)
+        .where(models.ReportVote.report_id == report_id, models.ReportVote.user_id == user_id)
+        .returning(models.ReportVote.id)
+    ).scalar()
+    return vote_id is not None
+
+
+def current_upvotes(db: Session, report_id: int) -> int:
+    stored = db.execute(select(models.Report.upvotes).where(models.Report.id == report_id)).scalar() or 0
+    return stored + counters.upvotes.pending(report_id)
+
+
+def reconcile_upvotes(db: Session) -> int:
+    """
+    Reset reports.upvotes to the number of rows in report_votes wherever they
+    have drifted. Run it off-peak: deltas still buffered in running workers
+    land after the reset and are corrected by the next run.
+    """
+    actual = (
+        select(func.count(models.ReportVote.id))
+        .where(models.ReportVote.report_id == models.Report.id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(models.Report)
+        .where(func.coalesce(models.Report.upvotes, 0) != actual)
+        .values(upvotes=actual, updated_at=models.Report.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["reconcile"]:
+        print("Usage: python votes.py reconcile")
+        sys.exit(1)
+    from database import SessionLocal
+    db = SessionLocal()
+    try:
+        print(f"✅ Reconciled upvotes on {reconcile_upvotes(db)} reports")
+    finally:
+        db.close()
@@ -16,10 +16,7 @@ const OfficialVerification = () => {
 
   const fetchPendingOfficials = async () => {
     try {
-      const token = localStorage.getItem('token');
-      const response = await axios.get('/api/admin/officials/pending', {
-        headers: { Authorization: `Bearer ${token}` },
-      });
+      const response = await axios.get('/api/admin/officials/pending');
       setOfficials(response.data);
     } catch (error) {
       console.error('Error fetching officials:', error);
@@ -31,12 +28,7 @@ const OfficialVerification = () => {
   const handleVerify = async (officialId, action) => {
     setProcessing(officialId);
     try {
-      const token = localStorage.getItem('token');
-      await axios.patch(
-        `/api/admin/officials/${officialId}/verify`,
-        { action },
-        { headers: { Authorization: `Bearer ${token}` } }
-      );
+      await axios.patch(`/api/admin/officials/${officialId}/verify`, { action });
       
       // Remove from list
       setOfficials(officials.filter((o) => o.id !== officialId));
@@ -69,7 +69,7 @@ export default function LoginPage() {
       console.log("✅ Login successful");
       console.log("🔍 Response keys:", Object.keys(data));
 
-      // The backend returns: { access_token, token_type, role, account_status }
+      // The backend returns: { access_token, refresh_token, token_type, role, account_status }
       // But NOT user details, so we need to fetch them or use what we have
 
       // Create user data from the response
@@ -84,7 +84,7 @@ export default function LoginPage() {
 
       // Call login with validated data
       console.log("🔄 Calling AuthContext login function...");
-      login(data.access_token, userData);
+      login(data.access_token, userData, data.refresh_token);
 
       console.log("✅ AuthContext updated");
 
@@ -3,10 +3,12 @@ import { Search, Bell, HelpCircle, Menu } from 'lucide-react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '@/context/AuthContext';
 import axios from '@/api/axios';
+import { useReportEvents } from '@/hooks/use-report-events';
 
 const CitizenTopbar = () => {
   const [searchQuery, setSearchQuery] = useState('');
   const [notifications, setNotifications] = useState([]);
+  const [unreadCount, setUnreadCount] = useState(0);
   const [showNotifications, setShowNotifications] = useState(false);
   const { user } = useAuth();
 
@@ -14,17 +16,18 @@ const CitizenTopbar = () => {
     fetchNotifications();
   }, []);
 
+  useReportEvents(() => fetchNotifications());
+
   const fetchNotifications = async () => {
     try {
-      const response = await axios.get('/notifications?limit=5');
-      setNotifications(response.data.data || []);
+      const response = await axios.get('/api/notifications?limit=5');
+      setNotifications(response.data.notifications || []);
+      setUnreadCount(response.data.unread || 0);
     } catch (error) {
       console.error('Error fetching notifications:', error);
     }
   };
 
-  const unreadCount = notifications.filter(n => !n.isread).length;
-
   const handleSearch = (e) => {
     e.preventDefault();
     if (searchQuery.trim()) {
@@ -110,25 +113,25 @@ const CitizenTopbar = () => {
                         {notifications.map((notification) => (
                           <Link
                             key={notification.id}
-                            to={notification.actionurl || '/citizen/notifications'}
+                            to={notification.report_id ? `/citizen/reports/${notification.report_id}` : '/citizen/notifications'}
                             className={`block p-4 hover:bg-gray-50 transition-colors ${
-                              !notification.isread ? 'bg-blue-50/50' : ''
+                              !notification.is_read ? 'bg-blue-50/50' : ''
                             }`}
                             onClick={() => setShowNotifications(false)}
                           >
                             <div className="flex items-start space-x-3">
                               <div className={`w-2 h-2 rounded-full mt-2 ${
-                                !notification.isread ? 'bg-blue-600' : 'bg-gray-300'
+                                !notification.is_read ? 'bg-blue-600' : 'bg-gray-300'
                               }`}></div>
                               <div className="flex-1 min-w-0">
                                 <p className="font-semibold text-sm text-gray-900 line-clamp-1">
                                   {notification.title}
                                 </p>
                                 <p className="text-xs text-gray-600 mt-1 line-clamp-2">
-                                  {notification.message}
+                                  {notification.description}
                                 </p>
                                 <p className="text-xs text-gray-400 mt-2">
-                                  {new Date(notification.createdat).toLocaleDateString()}
+                                  {new Date(notification.created_at).toLocaleDateString()}
                                 </p>
                               </div>
                             </div>
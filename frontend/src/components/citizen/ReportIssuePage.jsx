@@ -21,12 +21,9 @@ import {
   Upload,
   Crosshair,
 } from "lucide-react";
-import axios from "axios";
+import axios from "@/api/axios";
 import { useAuth } from "@/context/AuthContext";
 
-// API URL from environment or default
-const API_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
-
 // Fix Leaflet default marker icon
 delete L.Icon.Default.prototype._getIconUrl;
 L.Icon.Default.mergeOptions({
@@ -304,17 +301,14 @@ const ReportIssuePage = () => {
         formDataToSend.append("images", file);
       });
 
-      // Make API request with token in Authorization header
-      const response = await axios.post(
-        `${API_URL}/api/reports`,
-        formDataToSend,
-        {
-          headers: {
-            "Authorization": `Bearer ${token}`,
-            // Don't set Content-Type - let browser set it with boundary
-          },
-        }
-      );
+      // The shared client attaches the token and renews it if it has expired
+      const response = await axios.post("/api/reports", formDataToSend, {
+        headers: {
+          "Content-Type": "multipart/form-data",
+        },
+        // Several photos can take longer to upload than the default timeout
+        timeout: 0,
+      });
 
       console.log("Report submitted successfully:", response.data);
       setSuccessMessage("Report submitted successfully!");
@@ -26,10 +26,7 @@ import {
   AlertCircle,
   Calendar,
 } from 'lucide-react';
-import { useAuth } from '@/context/AuthContext';
-import axios from 'axios';
-
-const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+import axios from '@/api/axios';
 
 // Dummy analytics data
 const DUMMY_ANALYTICS = {
@@ -86,7 +83,6 @@ const COLORS = {
 };
 
 const AnalyticsPage = () => {
-  const { token } = useAuth();
   const [analytics, setAnalytics] = useState(DUMMY_ANALYTICS);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -102,11 +98,7 @@ const AnalyticsPage = () => {
       setError(null);
       setUsingDummyData(false);
 
-      const response = await axios.get(`${API_URL}/api/official/analytics`, {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
+      const response = await axios.get('/api/official/analytics');
 
       const hasData = Object.values(response.data.reports_by_status || {}).some(
         (val) => val > 0
@@ -17,10 +17,7 @@ import { Card } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
-import { useAuth } from '@/context/AuthContext';
-import axios from 'axios';
-
-const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+import axios from '@/api/axios';
 
 // Dummy reports data with Indian locations
 const DUMMY_REPORTS = [
@@ -102,7 +99,6 @@ const DUMMY_REPORTS = [
 ];
 
 const AssignedReportsPage = () => {
-  const { token } = useAuth();
   const [reports, setReports] = useState([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
@@ -129,11 +125,7 @@ const AssignedReportsPage = () => {
       if (filters.priority !== 'all') params.append('priority', filters.priority);
       if (filters.search) params.append('search', filters.search);
 
-      const response = await axios.get(`${API_URL}/api/official/reports?${params.toString()}`, {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
+      const response = await axios.get(`/api/official/reports?${params.toString()}`);
 
       if (response.data.reports && response.data.reports.length > 0) {
         setReports(response.data.reports);
@@ -14,10 +14,8 @@ import {
   Clock,
   BellOff,
 } from 'lucide-react';
-import { useAuth } from '@/context/AuthContext';
-import axios from 'axios';
-
-const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+import { useReportEvents } from '@/hooks/use-report-events';
+import axios from '@/api/axios';
 
 // Dummy notifications with Indian context
 const DUMMY_NOTIFICATIONS = [
@@ -60,7 +58,6 @@ const DUMMY_NOTIFICATIONS = [
 ];
 
 const NotificationsPage = () => {
-  const { token } = useAuth();
   const [notifications, setNotifications] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -70,17 +67,16 @@ const NotificationsPage = () => {
     fetchNotifications();
   }, []);
 
+  // Refresh when one of our reports changes instead of polling
+  useReportEvents(() => fetchNotifications());
+
   const fetchNotifications = async () => {
     try {
       setLoading(true);
       setError(null);
       setUsingDummyData(false);
 
-      const response = await axios.get(`${API_URL}/api/official/notifications`, {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
+      const response = await axios.get('/api/official/notifications');
 
       if (response.data.notifications && response.data.notifications.length > 0) {
         setNotifications(response.data.notifications);
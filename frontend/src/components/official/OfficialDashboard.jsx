@@ -12,9 +12,8 @@ import {
   AlertCircle,
 } from 'lucide-react';
 import { useAuth } from '@/context/AuthContext';
-import axios from 'axios';
-
-const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+import { useReportEvents } from '@/hooks/use-report-events';
+import axios from '@/api/axios';
 
 // Dummy data for demonstration
 const DUMMY_STATS = {
@@ -27,7 +26,7 @@ const DUMMY_STATS = {
 };
 
 const OfficialDashboard = () => {
-  const { user, token } = useAuth();
+  const { user } = useAuth();
   const [stats, setStats] = useState(DUMMY_STATS);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -37,17 +36,16 @@ const OfficialDashboard = () => {
     fetchDashboardStats();
   }, []);
 
+  // Refresh when one of our reports changes instead of polling
+  useReportEvents(() => fetchDashboardStats());
+
   const fetchDashboardStats = async () => {
     try {
       setLoading(true);
       setError(null);
       setUsingDummyData(false);
 
-      const response = await axios.get(`${API_URL}/api/official/dashboard/stats`, {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
+      const response = await axios.get('/api/official/dashboard/stats');
 
       // Check if data is empty
       const hasData = Object.values(response.data).some(val => val > 0);
@@ -17,17 +17,29 @@ import {
   Briefcase,
 } from 'lucide-react';
 import { useAuth } from '@/context/AuthContext';
+import axios from '@/api/axios';
+import { useReportEvents } from '@/hooks/use-report-events';
 
 const OfficialSidebar = ({ isCollapsed, setIsCollapsed }) => {
   const location = useLocation();
   const { logout, user } = useAuth();
   const [notifications, setNotifications] = useState(0);
 
+  const fetchUnreadCount = async () => {
+    try {
+      const response = await axios.get('/api/notifications/unread-count');
+      setNotifications(response.data.unread);
+    } catch (error) {
+      console.error('Error fetching unread notifications:', error);
+    }
+  };
+
   useEffect(() => {
-    // Fetch unread notifications count
-    setNotifications(user?.unreadNotifications || 5);
+    fetchUnreadCount();
   }, [user]);
 
+  useReportEvents(() => fetchUnreadCount());
+
   const menuItems = [
     {
       path: '/official/dashboard',
@@ -17,9 +17,7 @@ import {
 import { Button } from '@/components/ui/button';
 import { Input } from '@/components/ui/input';
 import { useAuth } from '@/context/AuthContext';
-import axios from 'axios';
-
-const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+import axios from '@/api/axios';
 
 // Dummy profile data
 const DUMMY_PROFILE = {
@@ -37,7 +35,7 @@ const DUMMY_PROFILE = {
 };
 
 const ProfilePage = () => {
-  const { token, user } = useAuth();
+  const { user } = useAuth();
   const [profile, setProfile] = useState(null);
   const [loading, setLoading] = useState(true);
   const [editing, setEditing] = useState(false);
@@ -60,11 +58,7 @@ const ProfilePage = () => {
       setUsingDummyData(false);
 
       // Try fetching from user profile endpoint first
-      const response = await axios.get(`${API_URL}/api/users/me/profile`, {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
+      const response = await axios.get('/api/users/me/profile');
 
       if (response.data) {
         setProfile(response.data);
@@ -113,15 +107,10 @@ const ProfilePage = () => {
       setSaving(true);
       
       const response = await axios.put(
-        `${API_URL}/api/users/me/profile`,
+        '/api/users/me/profile',
         {
           full_name: formData.full_name,
           phone_number: formData.phone_number,
-        },
-        {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
         }
       );
 
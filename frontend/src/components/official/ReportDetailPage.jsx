@@ -6,15 +6,13 @@ import { Card } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { Button } from '@/components/ui/button';
 import { Textarea } from '@/components/ui/textarea';
-import { useAuth } from '@/context/AuthContext';
-import axios from 'axios';
+import axios from '@/api/axios';
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
 const ReportDetailPage = () => {
   const { id } = useParams();
   const navigate = useNavigate();
-  const { token } = useAuth();
   const [report, setReport] = useState(null);
   const [loading, setLoading] = useState(true);
   const [updating, setUpdating] = useState(false);
@@ -31,11 +29,7 @@ const ReportDetailPage = () => {
       setLoading(true);
       setError(null);
 
-      const response = await axios.get(`${API_URL}/api/official/reports/${id}`, {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
+      const response = await axios.get(`/api/official/reports/${id}`);
 
       setReport(response.data);
     } catch (err) {
@@ -51,15 +45,10 @@ const ReportDetailPage = () => {
       setUpdating(true);
 
       await axios.put(
-        `${API_URL}/api/official/reports/${id}/status`,
+        `/api/official/reports/${id}/status`,
         {
           status: newStatus,
           comment: statusComment,
-        },
-        {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
         }
       );
 
@@ -78,15 +67,10 @@ const ReportDetailPage = () => {
 
     try {
       await axios.post(
-        `${API_URL}/api/official/reports/${id}/comments`,
+        `/api/official/reports/${id}/comments`,
         {
           comment: comment,
           is_internal: false,
-        },
-        {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
         }
       );
 
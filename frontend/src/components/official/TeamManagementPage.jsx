@@ -15,10 +15,7 @@ import {
   UserPlus,
   Shield,
 } from 'lucide-react';
-import { useAuth } from '@/context/AuthContext';
-import axios from 'axios';
-
-const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+import axios from '@/api/axios';
 
 // Dummy team data with Indian names and locations
 const DUMMY_TEAM_MEMBERS = [
@@ -113,7 +110,6 @@ const DUMMY_TEAM_MEMBERS = [
 ];
 
 const TeamManagementPage = () => {
-  const { token } = useAuth();
   const [teamMembers, setTeamMembers] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -130,11 +126,7 @@ const TeamManagementPage = () => {
       setError(null);
       setUsingDummyData(false);
 
-      const response = await axios.get(`${API_URL}/api/official/team`, {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
+      const response = await axios.get('/api/official/team');
 
       if (response.data.team_members && response.data.team_members.length > 0) {
         setTeamMembers(response.data.team_members);
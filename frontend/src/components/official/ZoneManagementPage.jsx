@@ -13,10 +13,7 @@ import {
   Map,
   Plus,
 } from 'lucide-react';
-import { useAuth } from '@/context/AuthContext';
-import axios from 'axios';
-
-const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+import axios from '@/api/axios';
 
 // Dummy zones data for Indian cities
 const DUMMY_ZONES = [
@@ -98,7 +95,6 @@ const DUMMY_ZONES = [
 ];
 
 const ZoneManagementPage = () => {
-  const { token } = useAuth();
   const [zones, setZones] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -114,11 +110,7 @@ const ZoneManagementPage = () => {
       setError(null);
       setUsingDummyData(false);
 
-      const response = await axios.get(`${API_URL}/api/official/zones`, {
-        headers: {
-          Authorization: `Bearer ${token}`,
-        },
-      });
+      const response = await axios.get('/api/official/zones');
 
       if (response.data.zones && response.data.zones.length > 0) {
         setZones(response.data.zones);
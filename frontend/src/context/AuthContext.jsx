@@ -1,5 +1,6 @@
 // src/context/AuthContext.jsx
 import React, { createContext, useState, useContext, useEffect } from 'react';
+import api, { TOKEN_REFRESHED_EVENT } from '../api/axios';
 
 const AuthContext = createContext();
 
@@ -50,6 +51,13 @@ export const AuthProvider = ({ children }) => {
     console.log('✅ AuthContext initialized');
   }, []);
 
+  // Follow silent refreshes done by the shared api client
+  useEffect(() => {
+    const handleRefresh = (event) => setToken(event.detail);
+    window.addEventListener(TOKEN_REFRESHED_EVENT, handleRefresh);
+    return () => window.removeEventListener(TOKEN_REFRESHED_EVENT, handleRefresh);
+  }, []);
+
   // Log state changes for debugging
   useEffect(() => {
     console.log('🔒 AuthContext state updated:', {
@@ -60,7 +68,7 @@ export const AuthProvider = ({ children }) => {
     });
   }, [isAuthenticated, user, token, loading]);
 
-  const login = (accessToken, userData) => {
+  const login = (accessToken, userData, refreshToken = null) => {
     console.log('🔐 Login function called');
     console.log('   Token:', accessToken ? 'provided' : 'missing');
     console.log('   User data:', userData);
@@ -84,6 +92,11 @@ export const AuthProvider = ({ children }) => {
     // Store in localStorage
     localStorage.setItem('token', accessToken);
     localStorage.setItem('user', JSON.stringify(userData));
+    if (refreshToken) {
+      localStorage.setItem('refresh_token', refreshToken);
+    } else {
+      localStorage.removeItem('refresh_token');
+    }
     
     // Update context state
     setToken(accessToken);
@@ -98,8 +111,17 @@ export const AuthProvider = ({ children }) => {
   const logout = () => {
     console.log('🚪 Logout function called');
     
+    // Revoke the refresh token server-side; local state is cleared regardless
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (refreshToken) {
+      api.post('/api/logout', { refresh_token: refreshToken }).catch((error) => {
+        console.error('⚠️ Could not revoke refresh token:', error);
+      });
+    }
+    
     // Clear localStorage
     localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
     localStorage.removeItem('user');
     
     // Clear all legacy keys that might exist
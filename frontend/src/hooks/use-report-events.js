@@ -0,0 +1,39 @@
+import { useEffect, useRef } from "react"
+
+const baseURL = import.meta.env.VITE_API_URL || "http://localhost:8000"
+const RECONNECT_DELAY = 5000
+
+// Subscribe to report change events pushed by the API (server-sent events).
+// `onEvent` receives the parsed event, e.g. { type: "report.status_changed", report_id, ... }.
+export function useReportEvents(onEvent) {
+  const handler = useRef(onEvent)
+  handler.current = onEvent
+
+  useEffect(() => {
+    let source = null
+    let timer = null
+    let closed = false
+
+    const connect = () => {
+      const token = localStorage.getItem("token")
+      if (!token || closed) return
+      source = new EventSource(`${baseURL}/api/events/stream?token=${encodeURIComponent(token)}`)
+      const dispatch = (message) => handler.current?.(JSON.parse(message.data))
+      ;["report.status_changed", "report.assigned", "report.comment"].forEach((type) =>
+        source.addEventListener(type, dispatch)
+      )
+      source.onerror = () => {
+        // Reconnect ourselves so a refreshed access token is picked up
+        source.close()
+        timer = setTimeout(connect, RECONNECT_DELAY)
+      }
+    }
+
+    connect()
+    return () => {
+      closed = true
+      clearTimeout(timer)
+      source?.close()
+    }
+  }, [])
+}